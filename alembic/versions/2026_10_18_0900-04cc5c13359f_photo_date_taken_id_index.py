@@ -0,0 +1,30 @@
+"""photo (date_taken, id) index for keyset pagination
+
+Revision ID: 04cc5c13359f
+Revises: 0a83d0e2059a
+Create Date: 2026-10-18 09:00:12.415208
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "04cc5c13359f"
+down_revision: Union[str, Sequence[str], None] = "0a83d0e2059a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_photo_date_taken_id", "photo", ["date_taken", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_photo_date_taken_id", table_name="photo")
@@ -0,0 +1,53 @@
+"""Create user_photo_stats table
+
+Revision ID: b7e21c4f9a06
+Revises: 04cc5c13359f
+Create Date: 2026-10-18 09:30:41.208311
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e21c4f9a06"
+down_revision: Union[str, Sequence[str], None] = "04cc5c13359f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_photo_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("live_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("deleted_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("total_bytes", sa.BigInteger(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO user_photo_stats (user_id, live_count, deleted_count, total_bytes)
+        SELECT
+            user_photo.user_id,
+            count(*) FILTER (WHERE NOT photo.is_deleted),
+            count(*) FILTER (WHERE photo.is_deleted),
+            coalesce(sum(photo.size), 0)
+        FROM user_photo
+        JOIN photo ON photo.id = user_photo.photo_id
+        GROUP BY user_photo.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_photo_stats")
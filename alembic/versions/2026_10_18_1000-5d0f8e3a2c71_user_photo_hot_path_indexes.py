@@ -0,0 +1,72 @@
+"""user_photo and photo indexes for the listing/ownership hot path
+
+Revision ID: 5d0f8e3a2c71
+Revises: b7e21c4f9a06
+Create Date: 2026-10-18 10:00:03.771950
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5d0f8e3a2c71"
+down_revision: Union[str, Sequence[str], None] = "b7e21c4f9a06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The unique index cannot be built while duplicated links exist, keep the oldest.
+    # b7e21c4f9a06 counted the duplicates in user_photo_stats, so the counters of
+    # their users are recomputed from the links that are kept.
+    op.execute("""
+        WITH removed AS (
+            DELETE FROM user_photo a
+            USING user_photo b
+            WHERE a.user_id = b.user_id AND a.photo_id = b.photo_id AND a.id > b.id
+            RETURNING a.id, a.user_id
+        )
+        UPDATE user_photo_stats
+        SET
+            live_count = actual.live_count,
+            deleted_count = actual.deleted_count,
+            total_bytes = actual.total_bytes
+        FROM (
+            SELECT
+                user_photo.user_id,
+                count(*) FILTER (WHERE NOT photo.is_deleted) AS live_count,
+                count(*) FILTER (WHERE photo.is_deleted) AS deleted_count,
+                coalesce(sum(photo.size), 0) AS total_bytes
+            FROM user_photo
+            JOIN photo ON photo.id = user_photo.photo_id
+            WHERE user_photo.user_id IN (SELECT user_id FROM removed)
+            AND user_photo.id NOT IN (SELECT id FROM removed)
+            GROUP BY user_photo.user_id
+        ) AS actual
+        WHERE user_photo_stats.user_id = actual.user_id
+        """)
+    op.create_index(
+        "ux_user_photo_user_id_photo_id",
+        "user_photo",
+        ["user_id", "photo_id"],
+        unique=True,
+    )
+    op.create_index("ix_user_photo_photo_id", "user_photo", ["photo_id"], unique=False)
+    op.create_index(
+        "ix_photo_id_not_deleted",
+        "photo",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("NOT is_deleted"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_photo_id_not_deleted", table_name="photo")
+    op.drop_index("ix_user_photo_photo_id", table_name="user_photo")
+    op.drop_index("ux_user_photo_user_id_photo_id", table_name="user_photo")
@@ -0,0 +1,47 @@
+"""is_pending and created_at columns added to photo table
+
+Revision ID: 9a4c6e1b7d52
+Revises: 5d0f8e3a2c71
+Create Date: 2026-10-18 10:30:27.016482
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4c6e1b7d52"
+down_revision: Union[str, Sequence[str], None] = "5d0f8e3a2c71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "photo",
+        sa.Column("is_pending", sa.Boolean(), server_default="false", nullable=False),
+    )
+    op.add_column(
+        "photo",
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    # The sweeper only looks at pending rows, keep that scan small
+    op.create_index(
+        "ix_photo_pending_created_at",
+        "photo",
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("is_pending"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_photo_pending_created_at", table_name="photo")
+    op.drop_column("photo", "created_at")
+    op.drop_column("photo", "is_pending")
@@ -0,0 +1,48 @@
+"""create photo_rendition table
+
+Revision ID: 3f1d7b9c2e84
+Revises: 9a4c6e1b7d52
+Create Date: 2026-10-18 11:00:42.118305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1d7b9c2e84"
+down_revision: Union[str, Sequence[str], None] = "9a4c6e1b7d52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "photo_rendition",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("photo_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=32), nullable=False),
+        sa.Column("s3_key", sa.String(length=320), nullable=False),
+        sa.Column("content_type", sa.String(length=32), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=False),
+        sa.Column("height", sa.Integer(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["photo_id"], ["photo.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Also serves the photo_id lookups of listings and the ON DELETE CASCADE
+    op.create_index(
+        "ux_photo_rendition_photo_id_name",
+        "photo_rendition",
+        ["photo_id", "name"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ux_photo_rendition_photo_id_name", table_name="photo_rendition")
+    op.drop_table("photo_rendition")
@@ -0,0 +1,47 @@
+"""create s3_object_deletion table and s3_key indexes
+
+Revision ID: e2b74d6a1c58
+Revises: c8e5a1f04b93
+Create Date: 2026-10-18 12:00:51.730264
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b74d6a1c58"
+down_revision: Union[str, Sequence[str], None] = "c8e5a1f04b93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "s3_object_deletion",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("s3_key", sa.String(length=320), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ux_s3_object_deletion_s3_key", "s3_object_deletion", ["s3_key"], unique=True
+    )
+    # The collector and the orphan scanner check batches of keys against these
+    op.create_index("ix_photo_s3_key", "photo", ["s3_key"], unique=False)
+    op.create_index(
+        "ix_photo_rendition_s3_key", "photo_rendition", ["s3_key"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_photo_rendition_s3_key", table_name="photo_rendition")
+    op.drop_index("ix_photo_s3_key", table_name="photo")
+    op.drop_index("ux_s3_object_deletion_s3_key", table_name="s3_object_deletion")
+    op.drop_table("s3_object_deletion")
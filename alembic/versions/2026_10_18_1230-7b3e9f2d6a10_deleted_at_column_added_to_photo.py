@@ -0,0 +1,38 @@
+"""deleted_at column added to photo table
+
+Revision ID: 7b3e9f2d6a10
+Revises: e2b74d6a1c58
+Create Date: 2026-10-18 12:30:19.364027
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7b3e9f2d6a10"
+down_revision: Union[str, Sequence[str], None] = "e2b74d6a1c58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("photo", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    # When existing photos were deleted is unknown, start their retention now
+    op.execute("UPDATE photo SET deleted_at = now() WHERE is_deleted")
+    op.create_index(
+        "ix_photo_deleted_at",
+        "photo",
+        ["deleted_at"],
+        unique=False,
+        postgresql_where=sa.text("is_deleted"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_photo_deleted_at", table_name="photo")
+    op.drop_column("photo", "deleted_at")
@@ -0,0 +1,41 @@
+"""content_hash columns added to photo and user_photo tables
+
+Revision ID: 4d8a2f6c1e37
+Revises: 7b3e9f2d6a10
+Create Date: 2026-10-18 13:00:42.118305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4d8a2f6c1e37"
+down_revision: Union[str, Sequence[str], None] = "7b3e9f2d6a10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing photos are left unhashed, they are never matched as duplicates
+    op.add_column("photo", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.add_column("user_photo", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.create_index("ix_photo_content_hash", "photo", ["content_hash"], unique=False)
+    op.create_index(
+        "ux_user_photo_user_id_content_hash",
+        "user_photo",
+        ["user_id", "content_hash"],
+        unique=True,
+        postgresql_where=sa.text("content_hash IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ux_user_photo_user_id_content_hash", table_name="user_photo")
+    op.drop_index("ix_photo_content_hash", table_name="photo")
+    op.drop_column("user_photo", "content_hash")
+    op.drop_column("photo", "content_hash")
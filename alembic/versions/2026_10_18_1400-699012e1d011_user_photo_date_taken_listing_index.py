@@ -0,0 +1,45 @@
+"""date_taken copied to user_photo, indexed for the per-user listing
+
+Revision ID: 699012e1d011
+Revises: 4d8a2f6c1e37
+Create Date: 2026-10-18 14:00:27.503916
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "699012e1d011"
+down_revision: Union[str, Sequence[str], None] = "4d8a2f6c1e37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("user_photo", sa.Column("date_taken", sa.DateTime(), nullable=True))
+    op.execute("""
+        UPDATE user_photo SET date_taken = photo.date_taken
+        FROM photo WHERE photo.id = user_photo.photo_id
+        """)
+    op.alter_column("user_photo", "date_taken", nullable=False)
+    op.create_index(
+        "ix_user_photo_user_id_date_taken_photo_id",
+        "user_photo",
+        ["user_id", sa.text("date_taken DESC"), sa.text("photo_id DESC")],
+        unique=False,
+    )
+    # photo has no user column, this index could not serve the listing
+    op.drop_index("ix_photo_date_taken_id", table_name="photo")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "ix_photo_date_taken_id", "photo", ["date_taken", "id"], unique=False
+    )
+    op.drop_index("ix_user_photo_user_id_date_taken_photo_id", table_name="user_photo")
+    op.drop_column("user_photo", "date_taken")
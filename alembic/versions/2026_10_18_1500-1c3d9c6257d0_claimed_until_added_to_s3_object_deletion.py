@@ -0,0 +1,30 @@
+"""claimed_until added to s3_object_deletion
+
+Revision ID: 1c3d9c6257d0
+Revises: 699012e1d011
+Create Date: 2026-10-18 15:00:12.418203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "1c3d9c6257d0"
+down_revision: Union[str, Sequence[str], None] = "699012e1d011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "s3_object_deletion", sa.Column("claimed_until", sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("s3_object_deletion", "claimed_until")
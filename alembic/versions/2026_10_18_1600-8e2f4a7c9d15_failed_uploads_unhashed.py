@@ -0,0 +1,35 @@
+"""failed uploads unhashed
+
+Revision ID: 8e2f4a7c9d15
+Revises: 1c3d9c6257d0
+Create Date: 2026-10-18 16:00:37.502116
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e2f4a7c9d15"
+down_revision: Union[str, Sequence[str], None] = "1c3d9c6257d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A failed single upload used to be stored with an empty s3_key. Its hash
+    # held ux_user_photo_user_id_content_hash, so uploading the same content
+    # again resolved to the photo without an object.
+    op.execute("""
+        UPDATE user_photo SET content_hash = NULL
+        FROM photo
+        WHERE photo.id = user_photo.photo_id AND photo.s3_key = ''
+        """)
+    op.execute("UPDATE photo SET content_hash = NULL WHERE s3_key = ''")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    pass
@@ -0,0 +1,16 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON rendered by orjson (datetimes as ISO 8601, like pydantic does).
+
+    A route returning it directly skips FastAPI's response_model validation and
+    serialization, so the content must already be plain data in the declared
+    shape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
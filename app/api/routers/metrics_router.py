@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from app.db import engine, read_engine, replica_engines
+
+router = APIRouter()
+
+# name: (type, help) of every exported sample, see the stats() of each source
+DB_POOL_METRICS = {
+    "size": ("gauge", "Connections kept open by the pool"),
+    "checked_out": ("gauge", "Connections in use"),
+    "checked_in": ("gauge", "Idle connections"),
+    "overflow": ("gauge", "Connections open beyond the pool size"),
+    "max_overflow": ("gauge", "Connections allowed beyond the pool size"),
+    "checkouts": ("counter", "Connections handed out"),
+    "timeouts": ("counter", "Checkouts that gave up after the pool timeout"),
+    "wait_seconds": ("counter", "Time spent waiting for a connection"),
+    "max_wait_seconds": ("gauge", "Longest wait for a connection"),
+}
+PRESIGNED_URL_CACHE_METRICS = {
+    "hits": ("counter", "URLs served from the cache"),
+    "misses": ("counter", "URLs that had to be signed"),
+    "hit_ratio": ("gauge", "hits / (hits + misses)"),
+    "size": ("gauge", "Cached URLs"),
+    "evictions": ("counter", "URLs evicted to stay under the size limit"),
+}
+PHOTO_CACHE_METRICS = {
+    "local_hits": ("counter", "Lookups served from the in-process cache"),
+    "shared_hits": ("counter", "Lookups served from the shared cache"),
+    "misses": ("counter", "Lookups that went to the database"),
+    "coalesced": ("counter", "Lookups that waited on a concurrent load"),
+    "hit_ratio": ("gauge", "Share of lookups not sent to the database"),
+    "size": ("gauge", "Entries in the in-process cache"),
+    "evictions": ("counter", "Entries evicted to stay under the size limit"),
+}
+
+
+def _render(
+    prefix: str, metrics: dict, stats: dict, label: str | None = None
+) -> list[str]:
+    """stats is one sample, or with a label, one sample per label value"""
+    samples = (
+        {"": stats}
+        if label is None
+        else {f'{{{label}="{value}"}}': values for value, values in stats.items()}
+    )
+    lines = []
+    for name, (kind, description) in metrics.items():
+        full_name = f"{prefix}_{name}"
+        if kind == "counter" and not name.endswith("_total"):
+            full_name += "_total"
+        lines += [
+            f"# HELP {full_name} {description}",
+            f"# TYPE {full_name} {kind}",
+        ]
+        lines += [
+            f"{full_name}{labels} {values[name]}" for labels, values in samples.items()
+        ]
+    return lines
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics(request: Request):
+    """Process metrics in the Prometheus text format"""
+    lines = _render("db_pool", DB_POOL_METRICS, engine.pool.stats())
+    lines += _render("db_read_pool", DB_POOL_METRICS, read_engine.pool.stats())
+    if replica_engines:
+        # labelled by position in DATABASE_REPLICA_URLS, URLs may hold credentials
+        lines += _render(
+            "db_replica_pool",
+            DB_POOL_METRICS,
+            {i: e.pool.stats() for i, e in enumerate(replica_engines)},
+            label="replica",
+        )
+
+    url_cache = request.app.state.container.presigned_url_cache
+    if url_cache is not None:
+        lines += _render(
+            "presigned_url_cache", PRESIGNED_URL_CACHE_METRICS, url_cache.stats()
+        )
+
+    photo_cache = request.app.state.container.photo_cache
+    if photo_cache is not None:
+        lines += _render("photo_cache", PHOTO_CACHE_METRICS, photo_cache.stats())
+
+    return "\n".join(lines) + "\n"
@@ -1,15 +1,36 @@
 import json
-from typing import Optional
-from fastapi import APIRouter, Body, File, Form, Path, Query, UploadFile
+from typing import Annotated, Optional
+from fastapi import (
+    APIRouter,
+    Body,
+    File,
+    Form,
+    Header,
+    Path,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
 
-from app.dependencies import PhotoClientDep
+from app.api.responses import OrjsonResponse
+from app.dependencies import PhotoClientDep, ReadPhotoClientDep
+from app.pagination import TotalMode
 from app.schemas.photo import (
+    PhotoBatchCreateResponse,
+    PhotoBulkDelete,
+    PhotoBulkDeleteSoft,
+    PhotoBulkResponse,
     PhotoCreate,
     PhotoCreateResponse,
     PhotoDeleteResponse,
     PhotoDeleteSoft,
     PhotoRead,
+    PhotoStreamCreate,
+    PhotoUploadRead,
     UserPhotosResponse,
+    UserPhotoStatsRead,
 )
 
 
@@ -36,22 +57,103 @@ async def create_photo(
     return PhotoCreateResponse(description="Photo created successfully")
 
 
+@router.post("/batch", response_model=PhotoBatchCreateResponse)
+async def create_photo_batch(
+    photo_client: PhotoClientDep,
+    payload: str = Form(..., description="JSON array of metadata, one per file"),
+    files: list[UploadFile] = File(...),
+):
+    try:
+        photos = TypeAdapter(list[PhotoCreate]).validate_json(payload)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    user_id = 1  # TODO: update mocked user id
+    return await photo_client.create_photo_batch(
+        photos=photos, user_id=user_id, files=files
+    )
+
+
+@router.post("/stream", response_model=PhotoCreateResponse)
+async def create_photo_stream(
+    photo_client: PhotoClientDep,
+    request: Request,
+    photo: Annotated[PhotoStreamCreate, Query()],
+    content_type: str = Header(
+        ..., max_length=32, description="MIME type of the photo"
+    ),
+):
+    """Uploads the raw request body (not a multipart form) straight to S3"""
+    user_id = 1  # TODO: update mocked user id
+    await photo_client.create_photo_stream(
+        photo=photo,
+        user_id=user_id,
+        chunks=request.stream(),
+        content_type=content_type,
+    )
+    return PhotoCreateResponse(description="Photo created successfully")
+
+
+@router.post("/uploads", response_model=PhotoUploadRead)
+async def create_upload(photo_client: PhotoClientDep, payload: PhotoCreate = Body(...)):
+    """Starts a direct-to-S3 upload; call /uploads/{id}/complete once it is done"""
+    user_id = 1  # TODO: update mocked user id
+    return await photo_client.create_upload(photo=payload, user_id=user_id)
+
+
+@router.post("/uploads/{id}/complete", response_model=PhotoCreateResponse)
+async def complete_upload(
+    photo_client: PhotoClientDep, id: int = Path(..., description="Photo ID")
+):
+    user_id = 1  # TODO: update mocked user id
+    await photo_client.complete_upload(id=id, user_id=user_id)
+    return PhotoCreateResponse(description="Photo created successfully")
+
+
 @router.get("/", response_model=UserPhotosResponse)
 async def get_user_photos(
-    photo_client: PhotoClientDep,
+    photo_client: ReadPhotoClientDep,
     skip: Optional[int] = Query(0, description="Offset used for pagination"),
     limit: Optional[int] = Query(10, description="Number of photos per page"),
+    cursor: Optional[str] = Query(
+        None,
+        description="next_cursor from a previous page; when set, skip is ignored",
+    ),
+    total_mode: TotalMode = Query(
+        TotalMode.EXACT,
+        description="exact: counted total, estimate: approximate total, none: no total",
+    ),
+    renditions: Optional[str] = Query(
+        None,
+        description="Comma separated renditions to sign for each photo (default: thumbnail); empty for none",
+    ),
 ):
     user_id = 1  # TODO: update mocked user id
     response = await photo_client.get_user_photos(
-        user_id=user_id, skip=skip, limit=limit
+        user_id=user_id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        total_mode=total_mode,
+        renditions=(
+            None
+            if renditions is None
+            else [name for name in renditions.split(",") if name]
+        ),
     )
-    return response
+    # already shaped like UserPhotosResponse, response_model is only for the docs
+    return OrjsonResponse(response)
+
+
+@router.get("/stats", response_model=UserPhotoStatsRead)
+async def get_user_photo_stats(photo_client: ReadPhotoClientDep):
+    user_id = 1  # TODO: update mocked user id
+    return await photo_client.get_user_photo_stats(user_id=user_id)
 
 
 @router.get("/{id}", response_model=PhotoRead)
 async def get_photo_by_id(
-    photo_client: PhotoClientDep, id: int = Path(..., description="Photo ID")
+    photo_client: ReadPhotoClientDep, id: int = Path(..., description="Photo ID")
 ):
     photo = await photo_client.get_photo_by_id(id=id)
     return photo
@@ -78,3 +180,23 @@ async def hard_delete_photo(
     user_id = 1  # TODO: update mocked user id
     await photo_client.hard_delete_photo(id=id, user_id=user_id)
     return PhotoDeleteResponse(description="Photo permanently deleted")
+
+
+@router.patch("/soft", response_model=PhotoBulkResponse)
+async def bulk_soft_delete_toggle(
+    photo_client: PhotoClientDep, payload: PhotoBulkDeleteSoft = Body(...)
+):
+    """Marks (or unmarks) several photos for deletion, reporting the outcome of each id"""
+    user_id = 1  # TODO: update mocked user id
+    return await photo_client.bulk_soft_delete_toggle(
+        ids=payload.ids, deleting=payload.deleting, user_id=user_id
+    )
+
+
+@router.delete("/hard", response_model=PhotoBulkResponse)
+async def bulk_hard_delete_photos(
+    photo_client: PhotoClientDep, payload: PhotoBulkDelete = Body(...)
+):
+    """Permanently deletes several photos, reporting the outcome of each id"""
+    user_id = 1  # TODO: update mocked user id
+    return await photo_client.bulk_hard_delete_photos(ids=payload.ids, user_id=user_id)
@@ -0,0 +1,184 @@
+"""Maintenance commands, run with ``python -m app.cli <command>``"""
+
+import argparse
+import asyncio
+
+from app.clients.s3_client import AwsS3Client
+from app.clients.s3_pool import S3ClientPool
+from app.config import settings
+from app.container import build_photo_cache
+from app.db import async_session
+from app.repositories.photo_repository import PhotoRepository
+from app.services.deleted_photo_purger import DeletedPhotoPurger
+from app.services.pending_upload_sweeper import PendingUploadSweeper
+from app.services.s3_deletion_collector import S3DeletionCollector
+from app.services.s3_key_backfill import S3KeyBackfill
+from app.services.s3_orphan_scanner import S3OrphanScanner
+
+logger = settings.logger
+
+
+async def reconcile_photo_stats(args: argparse.Namespace) -> None:
+    async with async_session() as session:
+        repo = PhotoRepository(session=session)
+        repaired = await repo.reconcile_user_photo_stats(user_id=args.user_id)
+        await session.commit()
+
+    print(f"Repaired {repaired} user_photo_stats row(s)")
+
+
+async def sweep_pending_uploads(args: argparse.Namespace) -> None:
+    sweeper = PendingUploadSweeper(async_session, ttl=args.ttl)
+    swept = await sweeper.run_once()
+
+    print(f"Swept {swept} abandoned pending upload(s)")
+
+
+async def purge_deleted_photos(args: argparse.Namespace) -> None:
+    purger = DeletedPhotoPurger(async_session, retention=args.retention)
+    purged = await purger.run_once()
+
+    print(f"Purged {purged} deleted photo(s)")
+
+
+async def collect_s3_deletions(args: argparse.Namespace) -> None:
+    s3_pool = S3ClientPool()
+    await s3_pool.start()
+    try:
+        collector = S3DeletionCollector(
+            async_session, AwsS3Client(s3_pool, settings.bucket_name)
+        )
+        deleted = await collector.run_once()
+    finally:
+        await s3_pool.close()
+
+    print(f"Deleted {deleted} S3 object(s)")
+
+
+async def scan_s3_orphans(args: argparse.Namespace) -> None:
+    s3_pool = S3ClientPool()
+    await s3_pool.start()
+    try:
+        scanner = S3OrphanScanner(
+            async_session,
+            AwsS3Client(s3_pool, settings.bucket_name),
+            min_age=args.min_age,
+        )
+        if args.delete:
+            queued = await scanner.enqueue_orphans(prefix=args.prefix)
+            print(f"Queued {queued} orphaned S3 object(s) for deletion")
+            return
+
+        found = 0
+        async for orphans in scanner.iter_orphans(prefix=args.prefix):
+            for key in orphans:
+                print(key)
+            found += len(orphans)
+    finally:
+        await s3_pool.close()
+
+    print(f"Found {found} orphaned S3 object(s), rerun with --delete to remove them")
+
+
+async def backfill_s3_keys(args: argparse.Namespace) -> None:
+    s3_pool = S3ClientPool()
+    await s3_pool.start()
+    # the API may have cached photos under the keys being moved
+    photo_cache = build_photo_cache()
+    try:
+        backfill = S3KeyBackfill(
+            async_session,
+            AwsS3Client(s3_pool, settings.bucket_name),
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            photo_cache=photo_cache,
+        )
+        moved, failed = await backfill.run()
+    finally:
+        if photo_cache is not None:
+            await photo_cache.close()
+        await s3_pool.close()
+
+    print(f"Moved {moved} S3 object(s) to the sharded key layout, {failed} failed")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    reconcile = commands.add_parser(
+        "reconcile-photo-stats",
+        help="Recompute user_photo_stats from the photo tables and fix any drift",
+    )
+    reconcile.add_argument("--user-id", type=int, help="Only reconcile this user")
+    reconcile.set_defaults(handler=reconcile_photo_stats)
+
+    sweep = commands.add_parser(
+        "sweep-pending-uploads",
+        help="Delete direct uploads that were never completed, with their S3 objects",
+    )
+    sweep.add_argument(
+        "--ttl",
+        type=int,
+        default=settings.pending_upload_ttl,
+        help="Age in seconds after which a pending upload is abandoned",
+    )
+    sweep.set_defaults(handler=sweep_pending_uploads)
+
+    purge = commands.add_parser(
+        "purge-deleted-photos",
+        help="Permanently delete photos soft-deleted longer than the retention window",
+    )
+    purge.add_argument(
+        "--retention",
+        type=int,
+        default=settings.deleted_photo_retention,
+        help="Seconds a photo stays recoverable after being deleted",
+    )
+    purge.set_defaults(handler=purge_deleted_photos)
+
+    collect = commands.add_parser(
+        "collect-s3-deletions",
+        help="Delete the queued S3 objects of deleted photos now",
+    )
+    collect.set_defaults(handler=collect_s3_deletions)
+
+    scan = commands.add_parser(
+        "scan-s3-orphans",
+        help="List bucket objects no photo points to (dry run unless --delete)",
+    )
+    scan.add_argument("--prefix", default="", help="Only scan keys under this prefix")
+    scan.add_argument(
+        "--min-age",
+        type=int,
+        default=settings.s3_orphan_min_age,
+        help="Ignore objects younger than this many seconds",
+    )
+    scan.add_argument(
+        "--delete",
+        action="store_true",
+        help="Queue the orphans for the S3 deletion collector",
+    )
+    scan.set_defaults(handler=scan_s3_orphans)
+
+    backfill = commands.add_parser(
+        "backfill-s3-keys",
+        help="Copy photos stored under legacy keys to the sharded layout and repoint them",
+    )
+    backfill.add_argument(
+        "--batch-size", type=int, default=500, help="Keys copied per transaction"
+    )
+    backfill.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.s3_key_backfill_concurrency,
+        help="Copies running at once",
+    )
+    backfill.set_defaults(handler=backfill_s3_keys)
+
+    args = parser.parse_args(argv)
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,18 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 from fastapi import UploadFile
 
-from app.schemas.photo import PhotoCreate, PhotoRead, UserPhotosResponse
+from app.pagination import TotalMode
+from app.schemas.photo import (
+    PhotoBatchCreateResponse,
+    PhotoBulkResponse,
+    PhotoCreate,
+    PhotoRead,
+    PhotoStreamCreate,
+    PhotoUploadRead,
+    UserPhotoStatsRead,
+)
 from app.services.photo_service import PhotoService
 
 
@@ -14,6 +24,34 @@ class PhotoClientInterface(ABC):
         """Creates a photo in the database"""
         pass
 
+    @abstractmethod
+    async def create_photo_batch(
+        self, photos: list[PhotoCreate], user_id: int, files: list[UploadFile]
+    ) -> PhotoBatchCreateResponse:
+        """Creates many photos at once, reporting the outcome of each one"""
+        pass
+
+    @abstractmethod
+    async def create_photo_stream(
+        self,
+        photo: PhotoStreamCreate,
+        user_id: int,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+    ) -> None:
+        """Creates a photo streaming its bytes straight to S3"""
+        pass
+
+    @abstractmethod
+    async def create_upload(self, photo: PhotoCreate, user_id: int) -> PhotoUploadRead:
+        """Creates a pending photo and returns where to upload its bytes"""
+        pass
+
+    @abstractmethod
+    async def complete_upload(self, id: int, user_id: int) -> None:
+        """Verifies the uploaded object and makes the pending photo visible"""
+        pass
+
     @abstractmethod
     async def get_photo_by_id(self, id: int) -> PhotoRead:
         """Gets a photo by its id"""
@@ -21,9 +59,20 @@ class PhotoClientInterface(ABC):
 
     @abstractmethod
     async def get_user_photos(
-        self, user_id: int, skip: int = 0, limit: int = 10
-    ) -> UserPhotosResponse:
-        """Get all the photos from an user"""
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+        renditions: list[str] | None = None,
+    ) -> dict:
+        """Get all the photos from an user, as plain data shaped like UserPhotosResponse"""
+        pass
+
+    @abstractmethod
+    async def get_user_photo_stats(self, user_id: int) -> UserPhotoStatsRead:
+        """Get the photo counters and storage used by an user"""
         pass
 
     @abstractmethod
@@ -36,6 +85,20 @@ class PhotoClientInterface(ABC):
         """Deletes a photo from the database"""
         pass
 
+    @abstractmethod
+    async def bulk_soft_delete_toggle(
+        self, ids: list[int], deleting: bool, user_id: int
+    ) -> PhotoBulkResponse:
+        """Mark several photos as to be deleted, or restore them"""
+        pass
+
+    @abstractmethod
+    async def bulk_hard_delete_photos(
+        self, ids: list[int], user_id: int
+    ) -> PhotoBulkResponse:
+        """Deletes several photos from the database"""
+        pass
+
 
 class PhotoClient(PhotoClientInterface):
     def __init__(self, photo_service: PhotoService):
@@ -48,16 +111,54 @@ class PhotoClient(PhotoClientInterface):
             photo=photo, user_id=user_id, file=file
         )
 
+    async def create_photo_batch(
+        self, photos: list[PhotoCreate], user_id: int, files: list[UploadFile]
+    ) -> PhotoBatchCreateResponse:
+        return await self.photo_service.create_photo_batch(
+            photos=photos, user_id=user_id, files=files
+        )
+
+    async def create_photo_stream(
+        self,
+        photo: PhotoStreamCreate,
+        user_id: int,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+    ) -> None:
+        return await self.photo_service.create_photo_stream(
+            photo=photo, user_id=user_id, chunks=chunks, content_type=content_type
+        )
+
+    async def create_upload(self, photo: PhotoCreate, user_id: int) -> PhotoUploadRead:
+        return await self.photo_service.create_upload(photo=photo, user_id=user_id)
+
+    async def complete_upload(self, id: int, user_id: int) -> None:
+        return await self.photo_service.complete_upload(id=id, user_id=user_id)
+
     async def get_photo_by_id(self, id: int) -> PhotoRead:
         return await self.photo_service.get_photo_by_id(id=id)
 
     async def get_user_photos(
-        self, user_id: int, skip: int = 0, limit: int = 10
-    ) -> UserPhotosResponse:
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+        renditions: list[str] | None = None,
+    ) -> dict:
         return await self.photo_service.get_user_photos(
-            user_id=user_id, skip=skip, limit=limit
+            user_id=user_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            total_mode=total_mode,
+            renditions=renditions,
         )
 
+    async def get_user_photo_stats(self, user_id: int) -> UserPhotoStatsRead:
+        return await self.photo_service.get_user_photo_stats(user_id=user_id)
+
     async def soft_delete_toggle(self, id: int, deleting: bool, user_id: int) -> None:
         return await self.photo_service.soft_delete_toggle(
             id=id, deleting=deleting, user_id=user_id
@@ -65,3 +166,17 @@ class PhotoClient(PhotoClientInterface):
 
     async def hard_delete_photo(self, id: int, user_id: int) -> None:
         return await self.photo_service.hard_delete_photo(id=id, user_id=user_id)
+
+    async def bulk_soft_delete_toggle(
+        self, ids: list[int], deleting: bool, user_id: int
+    ) -> PhotoBulkResponse:
+        return await self.photo_service.bulk_soft_delete_toggle(
+            ids=ids, deleting=deleting, user_id=user_id
+        )
+
+    async def bulk_hard_delete_photos(
+        self, ids: list[int], user_id: int
+    ) -> PhotoBulkResponse:
+        return await self.photo_service.bulk_hard_delete_photos(
+            ids=ids, user_id=user_id
+        )
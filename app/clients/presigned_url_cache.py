@@ -0,0 +1,140 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+from typing import Awaitable, Callable
+
+from app.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class CachedUrl:
+    url: str
+    expires_at: float
+
+
+class PresignedUrlCacheBackend(ABC):
+    """Storage for presigned URLs; implement it to share the cache across workers"""
+
+    @abstractmethod
+    async def get_many(self, keys: list[str]) -> list[CachedUrl | None]:
+        """Returns the cached entry for every key, None when missing"""
+        pass
+
+    @abstractmethod
+    async def set_many(self, entries: dict[str, CachedUrl]) -> None:
+        """Stores the given entries"""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class InMemoryPresignedUrlCacheBackend(PresignedUrlCacheBackend):
+    """Bounded per-process LRU"""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CachedUrl] = OrderedDict()
+        self.evictions = 0
+
+    async def get_many(self, keys: list[str]) -> list[CachedUrl | None]:
+        entries = self._entries
+        found = []
+        for key in keys:
+            entry = entries.get(key)
+            if entry is not None:
+                entries.move_to_end(key)
+            found.append(entry)
+        return found
+
+    async def set_many(self, entries: dict[str, CachedUrl]) -> None:
+        for key, entry in entries.items():
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+        overflow = len(self._entries) - self._max_entries
+        for _ in range(max(overflow, 0)):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PresignedUrlCache:
+    """Reuses presigned URLs while they still have enough validity left.
+
+    Entries are keyed by (bucket, s3_key, expiration) so callers asking for
+    different ExpiresIn values never share a URL. A URL expires after
+    ExpiresIn, or when the credentials it was signed with do if that is sooner.
+    """
+
+    def __init__(
+        self,
+        backend: PresignedUrlCacheBackend,
+        min_remaining: int = settings.presigned_url_cache_min_remaining,
+    ):
+        self._backend = backend
+        self._min_remaining = min_remaining
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _cache_key(bucket: str, s3_key: str, expiration: int) -> str:
+        return f"{bucket}:{expiration}:{s3_key}"
+
+    async def get_or_sign(
+        self,
+        bucket: str,
+        keys: list[str],
+        expiration: int,
+        sign: Callable[[list[str]], Awaitable[list[str]]],
+        credentials_expiry: float | None = None,
+    ) -> list[str]:
+        """Returns URLs in the order of ``keys``, signing only the misses in one batch.
+
+        credentials_expiry is the unix time the signing credentials expire, if
+        they are temporary.
+        """
+        now = time.time()
+        # Entries signed with a shorter lifetime than min_remaining are never reusable
+        reusable_after = now + min(self._min_remaining, expiration)
+        cache_keys = [self._cache_key(bucket, key, expiration) for key in keys]
+        cached = await self._backend.get_many(cache_keys)
+
+        urls: list[str | None] = []
+        missing: list[int] = []
+        for i, entry in enumerate(cached):
+            if entry is not None and entry.expires_at > reusable_after:
+                urls.append(entry.url)
+            else:
+                urls.append(None)
+                missing.append(i)
+
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            signed = await sign([keys[i] for i in missing])
+            expires_at = now + expiration
+            if credentials_expiry is not None:
+                expires_at = min(expires_at, credentials_expiry)
+            fresh = {}
+            for i, url in zip(missing, signed):
+                urls[i] = url
+                fresh[cache_keys[i]] = CachedUrl(url=url, expires_at=expires_at)
+            await self._backend.set_many(fresh)
+
+        return urls
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._backend),
+            "evictions": getattr(self._backend, "evictions", 0),
+        }
@@ -1,11 +1,15 @@
 from abc import ABC, abstractmethod
 import asyncio
 from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
-from aioboto3 import Session
+from botocore.exceptions import ClientError
 from fastapi import UploadFile
 from types_aiobotocore_s3 import S3Client
 
+from app.clients.presigned_url_cache import PresignedUrlCache
+from app.clients.s3_pool import S3ClientPool
+from app.clients.s3_presigner import S3Presigner
 from app.config import settings
 
 logger = settings.logger
@@ -13,15 +17,62 @@ logger = settings.logger
 
 class AwsS3ClientInterface(ABC):
     @abstractmethod
-    async def upload_file(self, path_to_s3: str, file: UploadFile) -> str:
-        """Uploads a file to the s3 bucket and returns it's S3 key"""
+    async def upload_file(self, key: str, file: UploadFile) -> str:
+        """Uploads a file to the s3 bucket under the given key and returns it, or an empty string if the upload failed"""
         pass
 
     @abstractmethod
     async def bulk_upload_file(
-        self, path_to_s3: str, files: list[UploadFile]
+        self, keys: list[str], files: list[UploadFile]
     ) -> list[str]:
-        """Uploads a group of files to the s3 bucket and return a list containing the S3 keys or an empty string for failed uploads"""
+        """Uploads a group of files under the given, distinct keys and return a list containing the S3 keys or an empty string for failed uploads"""
+        pass
+
+    @abstractmethod
+    async def upload_stream(
+        self,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str | None = None,
+    ) -> int:
+        """Streams chunks to the s3 bucket as a multipart upload and returns the uploaded size"""
+        pass
+
+    @abstractmethod
+    async def get_file(self, key: str) -> bytes:
+        """Downloads an object from the s3 bucket"""
+        pass
+
+    @abstractmethod
+    async def put_file(self, key: str, body: bytes, content_type: str) -> None:
+        """Uploads an in-memory object to the s3 bucket under the given key"""
+        pass
+
+    @abstractmethod
+    async def copy_file(self, source_key: str, key: str) -> None:
+        """Copies an object within the s3 bucket (multipart for large objects)"""
+        pass
+
+    @abstractmethod
+    async def get_upload_presigned_url(
+        self, key: str, content_type: str, expiration: int
+    ) -> str:
+        """Returns a presigned PUT URL a client can upload the given key with"""
+        pass
+
+    @abstractmethod
+    async def head_file(self, key: str) -> dict | None:
+        """Returns the object's metadata (ContentLength, ContentType, ...) or None if it does not exist"""
+        pass
+
+    @abstractmethod
+    async def bulk_delete_file(self, keys: list[str]) -> list[str]:
+        """Deletes the given keys from the s3 bucket and returns the ones that could not be deleted"""
+        pass
+
+    @abstractmethod
+    def iter_file_pages(self, prefix: str = "") -> AsyncIterator[list[dict]]:
+        """Lists the bucket one page (up to 1000 objects: Key, Size, LastModified, ...) at a time"""
         pass
 
     @abstractmethod
@@ -37,25 +88,27 @@ class AwsS3ClientInterface(ABC):
 
 
 class AwsS3Client(AwsS3ClientInterface):
-    def __init__(self, session: Session, bucket: str):
-        self._session = session
+    def __init__(
+        self,
+        pool: S3ClientPool,
+        bucket: str,
+        presigner: S3Presigner | None = None,
+        url_cache: PresignedUrlCache | None = None,
+    ):
+        self._pool = pool
         self._bucket = bucket
+        self._presigner = presigner
+        self._url_cache = url_cache
 
     @asynccontextmanager
     async def _get_client(self):
-        """Reusable client context manager"""
-        async with self._session.client(
-            "s3",
-            endpoint_url=settings.aws_endpoint_url,
-            region_name=settings.aws_region,
-        ) as client:
+        """Borrows the process-wide client from the pool"""
+        async with self._pool.client() as client:
             yield client
 
     async def _upload_file(
-        self, path_to_s3: str, file: UploadFile, s3_client: S3Client
+        self, key: str, file: UploadFile, s3_client: S3Client
     ) -> str:
-        prefix = path_to_s3.strip("/")
-        key = f"{prefix}/{file.filename}" if prefix else file.filename
         content_type = file.content_type
         file_obj = file.file
         extra = {"ContentType": content_type} if content_type else None
@@ -75,6 +128,88 @@ class AwsS3Client(AwsS3ClientInterface):
 
         return key
 
+    async def _upload_stream(
+        self,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str | None,
+        s3_client: S3Client,
+    ) -> int:
+        part_size = max(settings.s3_multipart_part_size, 5 * 1024 * 1024)
+        # a free slot is needed before a part is cut, so at most
+        # (concurrency + 1) parts are held in memory at any time
+        slots = asyncio.Semaphore(settings.s3_multipart_concurrency)
+        extra = {"ContentType": content_type} if content_type else {}
+        buffer = bytearray()
+        size = 0
+        upload_id = None
+        parts: list[dict] = []
+        tasks: list[asyncio.Task] = []
+
+        async def upload_part(number: int, body: bytes) -> None:
+            try:
+                response = await s3_client.upload_part(
+                    Bucket=self._bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=number,
+                    Body=body,
+                )
+                parts.append({"PartNumber": number, "ETag": response["ETag"]})
+            finally:
+                slots.release()
+
+        async def start_part(body: bytes) -> None:
+            nonlocal upload_id
+            if upload_id is None:
+                response = await s3_client.create_multipart_upload(
+                    Bucket=self._bucket, Key=key, **extra
+                )
+                upload_id = response["UploadId"]
+            await slots.acquire()
+            tasks.append(asyncio.create_task(upload_part(len(tasks) + 1, body)))
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                while len(buffer) >= part_size:
+                    await start_part(bytes(buffer[:part_size]))
+                    del buffer[:part_size]
+                # surface failed parts early instead of streaming the rest
+                for task in tasks:
+                    if task.done() and task.exception():
+                        raise task.exception()
+
+            if upload_id is None:
+                # small enough for a single request
+                await s3_client.put_object(
+                    Bucket=self._bucket, Key=key, Body=bytes(buffer), **extra
+                )
+                return size
+
+            if buffer:
+                await start_part(bytes(buffer))
+            await asyncio.gather(*tasks)
+            await s3_client.complete_multipart_upload(
+                Bucket=self._bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": sorted(parts, key=lambda part: part["PartNumber"])
+                },
+            )
+            return size
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if upload_id is not None:
+                await s3_client.abort_multipart_upload(
+                    Bucket=self._bucket, Key=key, UploadId=upload_id
+                )
+            raise
+
     async def _get_file_presigned_url(
         self, key: str, s3_client: S3Client, expiration: int = 3600
     ):
@@ -90,35 +225,138 @@ class AwsS3Client(AwsS3ClientInterface):
             logger.error(f"Error while getting the object: {key}")
             raise e
 
-    async def upload_file(self, path_to_s3: str, file: UploadFile) -> str:
+    async def upload_file(self, key: str, file: UploadFile) -> str:
         async with self._get_client() as s3_client:
-            s3_path = await self._upload_file(
-                path_to_s3, file=file, s3_client=s3_client
-            )
+            s3_path = await self._upload_file(key, file=file, s3_client=s3_client)
         return s3_path
 
+    async def upload_stream(
+        self,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str | None = None,
+    ) -> int:
+        logger.info(f"Streaming {key} to bucket: {self._bucket}")
+
+        async with self._get_client() as s3_client:
+            try:
+                size = await self._upload_stream(
+                    key, chunks, content_type=content_type, s3_client=s3_client
+                )
+            except Exception as e:
+                logger.error(
+                    f"Unable to stream {key} to bucket: {self._bucket} {e} ({type(e)})"
+                )
+                raise
+
+        logger.info("File streamed successfully")
+        return size
+
     async def bulk_upload_file(
-        self, path_to_s3: str, files: list[UploadFile]
+        self, keys: list[str], files: list[UploadFile]
     ) -> list[str]:
+        # uploads under one key would silently overwrite each other, leaving
+        # several photos pointing at the last file's bytes
+        if len(set(keys)) != len(keys):
+            raise ValueError("bulk_upload_file needs a distinct key per file")
+
+        # bounds the files in flight so a large batch does not claim every
+        # pooled connection (or its read buffers) at once
+        slots = asyncio.Semaphore(settings.s3_bulk_upload_concurrency)
+
+        async def upload(key: str, file: UploadFile, s3_client: S3Client) -> str:
+            async with slots:
+                return await self._upload_file(key, file=file, s3_client=s3_client)
+
         async with self._get_client() as s3_client:
-            tasks = [
-                self._upload_file(path_to_s3=path_to_s3, file=f, s3_client=s3_client)
-                for f in files
-            ]
+            tasks = [upload(key, f, s3_client) for key, f in zip(keys, files)]
             s3_paths = await asyncio.gather(*tasks)
 
         return s3_paths
 
-    async def get_file_presigned_url(self, key: str, expiration: int = 3600) -> str:
+    async def get_file(self, key: str) -> bytes:
         async with self._get_client() as s3_client:
-            url = await self._get_file_presigned_url(
-                key=key, s3_client=s3_client, expiration=expiration
+            response = await s3_client.get_object(Bucket=self._bucket, Key=key)
+            async with response["Body"] as body:
+                return await body.read()
+
+    async def put_file(self, key: str, body: bytes, content_type: str) -> None:
+        async with self._get_client() as s3_client:
+            await s3_client.put_object(
+                Bucket=self._bucket, Key=key, Body=body, ContentType=content_type
+            )
+
+    async def copy_file(self, source_key: str, key: str) -> None:
+        async with self._get_client() as s3_client:
+            await s3_client.copy(
+                CopySource={"Bucket": self._bucket, "Key": source_key},
+                Bucket=self._bucket,
+                Key=key,
+            )
+
+    async def get_upload_presigned_url(
+        self, key: str, content_type: str, expiration: int
+    ) -> str:
+        async with self._get_client() as s3_client:
+            url = await s3_client.generate_presigned_url(
+                "put_object",
+                Params={
+                    "Bucket": self._bucket,
+                    "Key": key,
+                    "ContentType": content_type,
+                },
+                ExpiresIn=expiration,
             )
         return url
 
-    async def bulk_get_file_presigned_url(
-        self, keys: list[str], expiration: int = 3600
-    ) -> list[str]:
+    async def head_file(self, key: str) -> dict | None:
+        async with self._get_client() as s3_client:
+            try:
+                return await s3_client.head_object(Bucket=self._bucket, Key=key)
+            except ClientError as e:
+                if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                    return None
+                raise
+
+    async def bulk_delete_file(self, keys: list[str]) -> list[str]:
+        failed = []
+        async with self._get_client() as s3_client:
+            # DeleteObjects accepts at most 1000 keys per request
+            for i in range(0, len(keys), 1000):
+                batch = keys[i : i + 1000]
+                try:
+                    response = await s3_client.delete_objects(
+                        Bucket=self._bucket,
+                        Delete={
+                            "Objects": [{"Key": key} for key in batch],
+                            "Quiet": True,
+                        },
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"Unable to delete {len(batch)} keys from bucket: {self._bucket} {e} ({type(e)})"
+                    )
+                    failed.extend(batch)
+                    continue
+
+                for error in response.get("Errors", []):
+                    logger.error(
+                        f"Unable to delete {error['Key']} from bucket: {self._bucket} {error.get('Message')}"
+                    )
+                    failed.append(error["Key"])
+
+        return failed
+
+    async def iter_file_pages(self, prefix: str = "") -> AsyncIterator[list[dict]]:
+        async with self._get_client() as s3_client:
+            paginator = s3_client.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(Bucket=self._bucket, Prefix=prefix):
+                yield page.get("Contents", [])
+
+    async def _sign_urls(self, keys: list[str], expiration: int) -> list[str]:
+        if self._presigner:
+            return await self._presigner.bulk_presign_get(keys, expiration=expiration)
+
         async with self._get_client() as s3_client:
             tasks = [
                 self._get_file_presigned_url(
@@ -128,3 +366,22 @@ class AwsS3Client(AwsS3ClientInterface):
             ]
             urls = await asyncio.gather(*tasks)
         return urls
+
+    async def get_file_presigned_url(self, key: str, expiration: int = 3600) -> str:
+        urls = await self.bulk_get_file_presigned_url([key], expiration=expiration)
+        return urls[0]
+
+    async def bulk_get_file_presigned_url(
+        self, keys: list[str], expiration: int = 3600
+    ) -> list[str]:
+        if self._url_cache:
+            return await self._url_cache.get_or_sign(
+                self._bucket,
+                keys,
+                expiration,
+                lambda missing: self._sign_urls(missing, expiration),
+                # read before signing: credentials refreshed meanwhile only last longer
+                credentials_expiry=await self._pool.credentials_expiry(),
+            )
+
+        return await self._sign_urls(keys, expiration)
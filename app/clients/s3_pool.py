@@ -0,0 +1,90 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from aioboto3 import Session
+from aiobotocore.config import AioConfig
+from types_aiobotocore_s3 import S3Client
+
+from app.config import settings
+
+logger = settings.logger
+
+
+class S3ClientPool:
+    """Process-wide S3 client shared by every request.
+
+    A single aioboto3 session and botocore client are opened on startup, so the
+    connection pool, the keep-alive sockets and the resolved credentials are
+    reused instead of being rebuilt for every request.
+    """
+
+    def __init__(
+        self,
+        session: Session | None = None,
+        max_pool_connections: int = settings.s3_max_pool_connections,
+        keepalive_timeout: float = settings.s3_keepalive_timeout,
+        connect_timeout: float = settings.s3_connect_timeout,
+        read_timeout: float = settings.s3_read_timeout,
+    ):
+        self._session = session or Session()
+        self._config = AioConfig(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            signature_version="s3v4",
+            tcp_keepalive=True,
+            connector_args={"keepalive_timeout": keepalive_timeout},
+        )
+        self._exit_stack: AsyncExitStack | None = None
+        self._client: S3Client | None = None
+
+    @property
+    def session(self) -> Session:
+        return self._session
+
+    async def credentials_expiry(self) -> float | None:
+        """Unix time the session's credentials expire, None for long-lived keys.
+
+        Anything signed with temporary credentials (STS, instance roles) stops
+        working once the session token it carries expires.
+        """
+        credentials = await self._session.get_credentials()
+        # set by botocore on refreshable credentials only, it has no public accessor
+        expiry = getattr(credentials, "_expiry_time", None)
+        return expiry.timestamp() if expiry else None
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+
+        exit_stack = AsyncExitStack()
+        self._client = await exit_stack.enter_async_context(
+            self._session.client(
+                "s3",
+                endpoint_url=settings.aws_endpoint_url,
+                region_name=settings.aws_region,
+                config=self._config,
+            )
+        )
+        self._exit_stack = exit_stack
+        logger.info(
+            f"S3 client pool started (max_pool_connections={self._config.max_pool_connections})"
+        )
+
+    async def close(self) -> None:
+        if self._exit_stack is None:
+            return
+
+        exit_stack, self._exit_stack, self._client = self._exit_stack, None, None
+        await exit_stack.aclose()
+        logger.info("S3 client pool closed")
+
+    @asynccontextmanager
+    async def client(self):
+        """Borrows the shared client; it is not closed when the block exits"""
+        if self._client is None:
+            raise RuntimeError("S3ClientPool.start() must be awaited before use")
+        yield self._client
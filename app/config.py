@@ -20,6 +20,114 @@ class Settings(BaseSettings):
         "AWS_ENDPOINT_URL"
     )  # Do not set on prod
     aws_region: str = os.getenv("AWS_REGION") or "us-east-1"
+
+    # Connection pool of each SQLAlchemy engine, see app.db; every process (API,
+    # worker, CLI) holds up to pool_size + max_overflow connections per engine
+    # it uses (the primary, its read-only pool, each replica), and a
+    # checkout waits at most pool_timeout seconds for one. Connections older
+    # than pool_recycle seconds are replaced, pre_ping drops dead ones
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Compiled SQL kept per engine, and server-side prepared statements:
+    # psycopg prepares a query after prepare_threshold runs, asyncpg caches
+    # statement_cache_size of them; 0 disables them, as PgBouncer in
+    # transaction mode requires
+    db_query_cache_size: int = 500
+    db_prepare_threshold: int = 5
+    db_statement_cache_size: int = 100
+
+    # Read replicas (JSON list of URLs) for the read-only routes, see
+    # app.db_replicas; an unreachable replica is skipped for retry_after
+    # seconds. After a write, the client's reads stay on the primary for
+    # read_your_writes_window seconds so they see it despite replication lag
+    database_replica_urls: list[str] = []
+    db_replica_retry_after: float = 30
+    read_your_writes_window: float = 5
+
+    # Shared S3 client pool, see app.clients.s3_pool
+    s3_max_pool_connections: int = 50
+    s3_keepalive_timeout: float = 60
+    s3_connect_timeout: float = 5
+    s3_read_timeout: float = 60
+
+    # Streaming multipart uploads; S3 requires parts of at least 5 MiB. A
+    # stream longer than max_size bytes is aborted, photo.size cannot hold
+    # more than 2**31 - 1
+    s3_multipart_part_size: int = 8 * 1024 * 1024
+    s3_multipart_concurrency: int = 4
+    photo_stream_max_size: int = 2**31 - 1
+
+    # Photo keys are spread over this many hash-sharded prefixes, see
+    # app.s3_keys; changing it only affects new uploads
+    s3_key_fanout: int = 256
+    # Copies running at once while moving legacy keys to that layout
+    s3_key_backfill_concurrency: int = 16
+
+    # POST /photos/batch: files per request, and how many are uploaded at once
+    photo_batch_max_files: int = 500
+    s3_bulk_upload_concurrency: int = 8
+    # PATCH /photos/soft and DELETE /photos/hard: ids per request
+    photo_bulk_max_ids: int = 1000
+
+    # Renditions rendered by the render_renditions job in a process pool, see
+    # app.renditions; sizes are the longest side in px (0 workers disables them)
+    rendition_sizes: dict[str, int] = {"thumbnail": 256, "web": 1600}
+    rendition_format: str = "webp"
+    rendition_quality: int = 80
+    rendition_workers: int = 2
+    # what GET /photos signs for each photo unless the request asks otherwise
+    listing_renditions: list[str] = ["thumbnail"]
+
+    # Durable job queue, see app.services.job_runner. The API runs up to
+    # job_worker_concurrency jobs in-process (0 leaves them to app.worker);
+    # failures are retried after retry_backoff seconds, doubled per attempt
+    job_worker_concurrency: int = 4
+    job_poll_interval: float = 1
+    job_visibility_timeout: int = 300
+    job_max_attempts: int = 5
+    job_retry_backoff: float = 10
+    job_retry_backoff_max: float = 3600
+
+    # S3 objects of deleted photos are queued and removed in DeleteObjects
+    # batches every interval (0 disables it); a batch is claimed for lease
+    # seconds, keys a collector failed on are retried once it expires. The
+    # orphan scan ignores objects younger than min_age, which may belong to
+    # uploads still in flight
+    s3_deletion_interval: int = 60
+    s3_deletion_lease: int = 300
+    s3_orphan_min_age: int = 24 * 3600
+
+    # Soft-deleted photos are purged for good once deleted for longer than the
+    # retention window (seconds); the purge runs every interval (0 disables it)
+    deleted_photo_retention: int = 30 * 24 * 3600
+    deleted_photo_purge_interval: int = 3600
+
+    # Uploads are hashed (SHA-256) as they stream; a user's duplicate resolves to
+    # the photo they already have, and identical content uploaded by different
+    # users shares one S3 object when enabled
+    share_identical_uploads: bool = True
+
+    # Direct-to-S3 uploads: presigned PUT lifetime, and age (seconds) after which
+    # a pending upload is swept; the sweeper runs every interval (0 disables it)
+    pending_upload_url_expiration: int = 900
+    pending_upload_ttl: int = 3600
+    pending_upload_sweep_interval: int = 600
+
+    # Presigned URL cache, see app.clients.presigned_url_cache (0 disables it)
+    presigned_url_cache_max_entries: int = 10_000
+    presigned_url_cache_min_remaining: int = 600
+
+    # Photo metadata cache, see app.repositories.photo_cache: entries kept per
+    # process (0 disables the cache), their lifetime in seconds, and the
+    # Redis-compatible server shared by every process (needs the redis
+    # package). The cache is off while redis_url is unset: invalidations must
+    # reach every process
+    photo_cache_max_entries: int = 10_000
+    photo_cache_ttl: int = 60
+    photo_cache_redis_url: Optional[str] = None
     # model_config = SettingsConfigDict(env_file=".env")
 
     logger: Logger = getLogger("photobucket")
@@ -0,0 +1,126 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.clients.photo_client import PhotoClient, PhotoClientInterface
+from app.clients.presigned_url_cache import (
+    InMemoryPresignedUrlCacheBackend,
+    PresignedUrlCache,
+)
+from app.clients.s3_client import AwsS3Client
+from app.clients.s3_pool import S3ClientPool
+from app.clients.s3_presigner import S3Presigner
+from app.config import settings
+from app.repositories.cached_photo_repository import CachedPhotoRepository
+from app.repositories.job_repository import JobRepository
+from app.repositories.photo_cache import (
+    InMemoryPhotoCacheBackend,
+    PhotoCache,
+    RedisPhotoCacheBackend,
+)
+from app.repositories.photo_repository import (
+    PhotoRepository,
+    PhotoRepositoryInterface,
+)
+from app.services.photo_service import PhotoService
+
+
+def build_photo_cache() -> PhotoCache | None:
+    """The photo cache configured in settings, None when it is disabled"""
+    # the versions live in the shared tier: without it a write would only
+    # invalidate the cache of the process that made it
+    if not settings.photo_cache_redis_url or settings.photo_cache_max_entries <= 0:
+        return None
+
+    return PhotoCache(
+        InMemoryPhotoCacheBackend(settings.photo_cache_max_entries),
+        shared=RedisPhotoCacheBackend(settings.photo_cache_redis_url),
+        ttl=settings.photo_cache_ttl,
+        # entries refilled before the write committed, or from a replica that
+        # lags behind it, are dropped a second time
+        reinvalidate_after=settings.read_your_writes_window,
+    )
+
+
+class AppContainer:
+    """Collaborators that live as long as the app, built once on startup.
+
+    Only the database session changes between requests: the repositories,
+    service and client on top of it are assembled in one call per request
+    instead of one dependency per layer.
+    """
+
+    def __init__(
+        self,
+        s3_pool: S3ClientPool,
+        s3_presigner: S3Presigner,
+        presigned_url_cache: PresignedUrlCache | None,
+        photo_cache: PhotoCache | None = None,
+    ):
+        self.s3_pool = s3_pool
+        self.s3_presigner = s3_presigner
+        self.presigned_url_cache = presigned_url_cache
+        self.photo_cache = photo_cache
+        self.s3_client = AwsS3Client(
+            s3_pool,
+            settings.bucket_name,
+            presigner=s3_presigner,
+            url_cache=presigned_url_cache,
+        )
+
+    @classmethod
+    async def start(cls) -> "AppContainer":
+        s3_pool = S3ClientPool()
+        await s3_pool.start()
+        try:
+            s3_presigner = await S3Presigner.from_pool(s3_pool, settings.bucket_name)
+        except Exception:
+            await s3_pool.close()
+            raise
+
+        presigned_url_cache = (
+            PresignedUrlCache(
+                InMemoryPresignedUrlCacheBackend(
+                    settings.presigned_url_cache_max_entries
+                )
+            )
+            if settings.presigned_url_cache_max_entries > 0
+            else None
+        )
+        return cls(s3_pool, s3_presigner, presigned_url_cache, build_photo_cache())
+
+    async def close(self) -> None:
+        if self.photo_cache is not None:
+            await self.photo_cache.close()
+        await self.s3_pool.close()
+
+    def _photo_repository(
+        self, session: AsyncSession, read_through: bool
+    ) -> PhotoRepositoryInterface:
+        repository = PhotoRepository(session=session)
+        if self.photo_cache is None:
+            return repository
+        return CachedPhotoRepository(repository, self.photo_cache, read_through)
+
+    def photo_client(self, session: AsyncSession) -> PhotoClientInterface:
+        # writes keep the cache up to date, but read what their transaction sees
+        return PhotoClient(
+            photo_service=PhotoService(
+                photo_repository=self._photo_repository(session, read_through=False),
+                s3_client=self.s3_client,
+                job_repository=JobRepository(session=session),
+            )
+        )
+
+    def read_photo_client(
+        self, session: AsyncSession, read_through: bool = True
+    ) -> PhotoClientInterface:
+        """A client for read-only routes, it has no job queue to write to.
+
+        read_through=False skips the photo cache, for clients that must read
+        their own writes.
+        """
+        return PhotoClient(
+            photo_service=PhotoService(
+                photo_repository=self._photo_repository(session, read_through),
+                s3_client=self.s3_client,
+            )
+        )
@@ -1,13 +1,89 @@
 from typing import AsyncGenerator
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from app.config import settings
+from app.db_replicas import ReplicaRouter
+from app.db_pool import InstrumentedQueuePool
+
+
+def _statement_cache_args(url: str) -> dict:
+    """Server-side prepared statement options of the configured driver"""
+    driver = make_url(url).get_driver_name()
+    if driver == "psycopg":
+        return {"prepare_threshold": settings.db_prepare_threshold or None}
+    if driver == "asyncpg":
+        return {"prepared_statement_cache_size": settings.db_statement_cache_size}
+    return {}
+
+
+def _read_only_args(url: str) -> dict:
+    """Makes every transaction of the driver's connections read-only"""
+    driver = make_url(url).get_driver_name()
+    if driver == "psycopg":
+        return {"options": "-c default_transaction_read_only=on"}
+    if driver == "asyncpg":
+        return {"server_settings": {"default_transaction_read_only": "on"}}
+    return {}
+
+
+def _create_engine(url: str, read_only: bool = False) -> AsyncEngine:
+    connect_args = _statement_cache_args(url)
+    if read_only:
+        connect_args |= _read_only_args(url)
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        query_cache_size=settings.db_query_cache_size,
+        connect_args=connect_args,
+    )
+
 
 url = settings.database_url
-engine = create_async_engine(url)
+engine = _create_engine(url)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
 
+def _read_only_sessionmaker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Sessions that run every statement in autocommit, sharing the engine's pool.
+
+    Read-only routes have nothing to commit: this saves the BEGIN before their
+    first query and the COMMIT (or ROLLBACK) round trip after the last one.
+    The engine must be created read-only, a write sent through such a session
+    would otherwise be committed right away.
+    """
+    return async_sessionmaker(
+        engine.execution_options(isolation_level="AUTOCOMMIT"),
+        expire_on_commit=False,
+    )
+
+
+# Reads on the primary get their own pool, whose connections refuse writes
+read_engine = _create_engine(url, read_only=True)
+read_only_session = _read_only_sessionmaker(read_engine)
+
+# Pools are only opened on first use, an unreachable replica costs nothing
+# until a read is routed to it
+replica_engines = [
+    _create_engine(replica_url, read_only=True)
+    for replica_url in settings.database_replica_urls
+]
+replica_router = ReplicaRouter(
+    [_read_only_sessionmaker(e) for e in replica_engines],
+    primary=read_only_session,
+)
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -0,0 +1,64 @@
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+
+logger = settings.logger
+
+
+class ReplicaRouter:
+    """Spreads read-only sessions over the replicas, round-robin.
+
+    A session checks its connection out up front, so a replica that cannot be
+    reached fails over to the next one before the request runs any query. The
+    failed replica is skipped for retry_after seconds and then tried again;
+    with no replica available reads go to the primary.
+    """
+
+    def __init__(
+        self,
+        replicas: list[async_sessionmaker[AsyncSession]],
+        primary: async_sessionmaker[AsyncSession],
+        retry_after: float = settings.db_replica_retry_after,
+    ):
+        self._replicas = replicas
+        self._primary = primary
+        self._retry_after = retry_after
+        self._down_until = [0.0] * len(replicas)
+        self._counter = itertools.count()
+
+    def _candidates(self) -> list[int]:
+        if not self._replicas:
+            return []
+
+        start = next(self._counter) % len(self._replicas)
+        now = time.monotonic()
+        return [
+            i % len(self._replicas)
+            for i in range(start, start + len(self._replicas))
+            if self._down_until[i % len(self._replicas)] <= now
+        ]
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        for i in self._candidates():
+            session = self._replicas[i]()
+            try:
+                await session.connection()
+            except (exc.DBAPIError, exc.TimeoutError, OSError) as e:
+                await session.close()
+                self._down_until[i] = time.monotonic() + self._retry_after
+                logger.warning(f"Replica {i} unavailable, failing over: {e}")
+                continue
+
+            async with session:
+                yield session
+            return
+
+        async with self._primary() as session:
+            yield session
@@ -1,14 +1,11 @@
 from typing import Annotated, AsyncGenerator
-from aioboto3 import Session
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.clients.photo_client import PhotoClient, PhotoClientInterface
-from app.clients.s3_client import AwsS3Client, AwsS3ClientInterface
-from app.config import settings
-from app.db import get_session
-from app.repositories.photo_repository import PhotoRepository, PhotoRepositoryInterface
-from app.services.photo_service import PhotoService
+from app.clients.photo_client import PhotoClientInterface
+from app.container import AppContainer
+from app.db import get_session, read_only_session, replica_router
+from app.middleware import reads_own_writes
 
 
 async def get_db_transaction(
@@ -24,26 +21,39 @@ async def get_db_transaction(
 TransactionDep = Annotated[AsyncSession, Depends(get_db_transaction)]
 
 
-async def get_photo_repository(session: TransactionDep) -> PhotoRepositoryInterface:
-    return PhotoRepository(session=session)
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession]:
+    """Session for read-only routes, never committed: a replica unless the client must read its own writes"""
+    if reads_own_writes(request):
+        async with read_only_session() as session:
+            yield session
+        return
+
+    async with replica_router.session() as session:
+        yield session
 
 
-async def get_s3_client() -> AwsS3ClientInterface:
-    session = Session()
-    return AwsS3Client(session, settings.bucket_name)
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
 
 
-async def get_photo_service(
-    repo: Annotated[PhotoRepositoryInterface, Depends(get_photo_repository)],
-    s3_client: Annotated[AwsS3ClientInterface, Depends(get_s3_client)],
-) -> PhotoService:
-    return PhotoService(photo_repository=repo, s3_client=s3_client)
+def get_container(request: Request) -> AppContainer:
+    return request.app.state.container
 
 
 async def get_photo_client(
-    service: Annotated[PhotoService, Depends(get_photo_service)],
+    request: Request, session: TransactionDep
+) -> PhotoClientInterface:
+    return get_container(request).photo_client(session)
+
+
+async def get_read_photo_client(
+    request: Request, session: ReadSessionDep
 ) -> PhotoClientInterface:
-    return PhotoClient(photo_service=service)
+    # a cached entry may predate the client's own writes
+    return get_container(request).read_photo_client(
+        session, read_through=not reads_own_writes(request)
+    )
 
 
 PhotoClientDep = Annotated[PhotoClientInterface, Depends(get_photo_client)]
+# For read-only routes, which may be served by a replica
+ReadPhotoClientDep = Annotated[PhotoClientInterface, Depends(get_read_photo_client)]
@@ -14,3 +14,52 @@ class PhotoNotFound(NotFoundError):
 class ForbiddenError(HTTPException):
     def __init__(self, detail: str = "Access Denied", **kwargs):
         super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail, **kwargs)
+
+
+class PhotoNotOwned(ForbiddenError):
+    def __init__(self, **kwargs):
+        super().__init__(
+            detail="The requested photo does not belongs to the user", **kwargs
+        )
+
+
+class BadRequestError(HTTPException):
+    def __init__(self, detail: str = "Bad Request", **kwargs):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=detail, **kwargs
+        )
+
+
+class EmptyUpload(BadRequestError):
+    def __init__(self, **kwargs):
+        super().__init__(detail="The uploaded file is empty", **kwargs)
+
+
+class UploadTooLarge(HTTPException):
+    def __init__(self, max_size: int, **kwargs):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"The uploaded file is larger than {max_size} bytes",
+            **kwargs,
+        )
+
+
+class UploadFailed(HTTPException):
+    def __init__(self, **kwargs):
+        super().__init__(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="The file could not be stored",
+            **kwargs,
+        )
+
+
+class UploadNotVerified(BadRequestError):
+    def __init__(
+        self, detail: str = "The uploaded object could not be verified", **kwargs
+    ):
+        super().__init__(detail=detail, **kwargs)
+
+
+class InvalidCursor(BadRequestError):
+    def __init__(self, **kwargs):
+        super().__init__(detail="Invalid pagination cursor", **kwargs)
@@ -0,0 +1,28 @@
+import hashlib
+from typing import AsyncIterator, BinaryIO
+
+
+class HashingReader:
+    """File-like wrapper that computes the SHA-256 of whatever is read through it,
+    so an upload is hashed in the same pass that sends it"""
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self._hash.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+async def hash_chunks(
+    chunks: AsyncIterator[bytes], digest: "hashlib._Hash"
+) -> AsyncIterator[bytes]:
+    """Feeds every chunk to digest as it is passed along"""
+    async for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
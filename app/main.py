@@ -1,15 +1,71 @@
+import asyncio
+from contextlib import asynccontextmanager
 from typing import Union
 from fastapi import FastAPI
 from pydantic import BaseModel
 
-from app.api.routers import photos_router, users_router, videos_router
+from app.api.routers import (
+    metrics_router,
+    photos_router,
+    users_router,
+    videos_router,
+)
 from app.config import settings
+from app.container import AppContainer
+from app.db import async_session
+from app.middleware import ReadYourWritesMiddleware
+from app.services.deleted_photo_purger import DeletedPhotoPurger
+from app.services.job_runner import job_runner
+from app.services.pending_upload_sweeper import PendingUploadSweeper
+from app.services.s3_deletion_collector import S3DeletionCollector
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    container = await AppContainer.start()
+    app.state.container = container
+
+    periodic_tasks = [
+        (PendingUploadSweeper(async_session), settings.pending_upload_sweep_interval),
+        (DeletedPhotoPurger(async_session), settings.deleted_photo_purge_interval),
+        (
+            S3DeletionCollector(async_session, container.s3_client),
+            settings.s3_deletion_interval,
+        ),
+    ]
+    background_tasks = [
+        asyncio.create_task(task.run(interval))
+        for task, interval in periodic_tasks
+        if interval > 0
+    ]
+
+    try:
+        async with job_runner(
+            container.s3_pool, settings.job_worker_concurrency
+        ) as runner:
+            if settings.job_worker_concurrency > 0:
+                background_tasks.append(asyncio.create_task(runner.run()))
+
+            try:
+                yield
+            finally:
+                for task, _ in periodic_tasks:
+                    task.stop()
+                runner.stop()
+                await asyncio.gather(*background_tasks, return_exceptions=True)
+    finally:
+        await container.close()
+
+
+app = FastAPI(lifespan=lifespan)
+# the replicas and the photo cache may both lag behind a client's own writes
+if settings.database_replica_urls or settings.photo_cache_redis_url:
+    app.add_middleware(ReadYourWritesMiddleware)
 
 app.include_router(users_router.router, prefix="/users", tags=["users"])
 app.include_router(photos_router.router, prefix="/photos", tags=["photos"])
 app.include_router(videos_router.router, prefix="/videos", tags=["videos"])
+app.include_router(metrics_router.router, prefix="/metrics", tags=["metrics"])
 
 
 class Item(BaseModel):
@@ -0,0 +1,57 @@
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+# Expiry (unix time) of the client's read-your-writes window
+READ_PRIMARY_COOKIE = "read_primary_until"
+# Lets clients that do not keep cookies ask for the primary explicitly
+READ_PRIMARY_HEADER = "x-read-primary"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def reads_own_writes(connection: HTTPConnection) -> bool:
+    """Whether a read must see the client's latest writes, which replicas may still lag behind"""
+    if connection.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true"):
+        return True
+
+    try:
+        return float(connection.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Sends the reads that follow a successful write to the primary.
+
+    Every successful mutating request sets a cookie that keeps the client's
+    reads on the primary, and off the photo cache, for read_your_writes_window
+    seconds, long enough for the replicas to catch up and the cache to be
+    invalidated again.
+    """
+
+    def __init__(self, app: ASGIApp, window: float = settings.read_your_writes_window):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{READ_PRIMARY_COOKIE}={time.time() + self.window:.3f}; "
+                    f"Max-Age={math.ceil(self.window)}; Path=/; HttpOnly; SameSite=lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -3,3 +3,7 @@ from .user_photo import UserPhoto  # noqa: F401
 from .user import User  # noqa: F401
 from .video import Video  # noqa: F401
 from .user_video import UserVideo  # noqa: F401
+from .user_photo_stats import UserPhotoStats  # noqa: F401
+from .photo_rendition import PhotoRendition  # noqa: F401
+from .job import Job  # noqa: F401
+from .s3_object_deletion import S3ObjectDeletion  # noqa: F401
@@ -0,0 +1,60 @@
+from enum import Enum
+
+from app.db import Base
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class JobKind(str, Enum):
+    RENDER_RENDITIONS = "render_renditions"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """Durable background work, run by app.services.job_runner.JobRunner.
+
+    Finished jobs are deleted. A queued job becomes claimable at run_at, which
+    a claim pushes forward by the visibility timeout and a failure by the
+    retry backoff; jobs out of attempts are kept as failed.
+    """
+
+    __tablename__ = "job"
+    __table_args__ = (
+        Index(
+            "ix_job_queued_run_at",
+            "run_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, nullable=False)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(16),
+        nullable=False,
+        default=JobStatus.QUEUED.value,
+        server_default=JobStatus.QUEUED.value,
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    run_at: Mapped[DateTime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+
+    def __repr__(self):
+        return (
+            f"Job(id={self.id} kind='{self.kind}' status='{self.status}' "
+            f"attempts={self.attempts}/{self.max_attempts})"
+        )
@@ -1,21 +1,52 @@
 from app.db import Base
-from sqlalchemy import String, DateTime, Boolean, Integer
+from sqlalchemy import Index, String, DateTime, Boolean, Integer, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
+# Largest size the 32-bit size column holds
+MAX_PHOTO_SIZE = 2**31 - 1
+
 
 class Photo(Base):
     __tablename__ = "photo"
+    __table_args__ = (
+        Index("ix_photo_id_not_deleted", "id", postgresql_where=text("NOT is_deleted")),
+        Index("ix_photo_s3_key", "s3_key"),
+        Index("ix_photo_content_hash", "content_hash"),
+        Index(
+            "ix_photo_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+        Index(
+            "ix_photo_pending_created_at",
+            "created_at",
+            postgresql_where=text("is_pending"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, nullable=False)
     filename: Mapped[str] = mapped_column(String(128), nullable=False)
     s3_key: Mapped[str] = mapped_column(String(256), nullable=False)
     content_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    # Hex SHA-256 of the object, computed while it is uploaded; photos with the
+    # same content share one S3 object
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True)
     size: Mapped[int] = mapped_column(Integer, nullable=False)
     date_taken: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
     is_public: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     is_deleted: Mapped[bool] = mapped_column(
         Boolean, nullable=False, default=False, server_default="false"
     )
+    # Set while is_deleted; the purge removes photos deleted for longer than
+    # the retention window
+    deleted_at: Mapped[DateTime] = mapped_column(DateTime, nullable=True)
+    # Direct-to-S3 uploads stay pending, and hidden, until the object is verified
+    is_pending: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default="false"
+    )
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
 
     def __repr__(self):
         return (
@@ -0,0 +1,30 @@
+from app.db import Base
+from sqlalchemy import ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class PhotoRendition(Base):
+    """A resized variant of a photo stored under its own S3 key, see app.renditions"""
+
+    __tablename__ = "photo_rendition"
+    __table_args__ = (
+        Index("ux_photo_rendition_photo_id_name", "photo_id", "name", unique=True),
+        Index("ix_photo_rendition_s3_key", "s3_key"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, nullable=False)
+    photo_id: Mapped[int] = mapped_column(
+        ForeignKey("photo.id", ondelete="CASCADE"), nullable=False
+    )
+    name: Mapped[str] = mapped_column(String(32), nullable=False)
+    s3_key: Mapped[str] = mapped_column(String(320), nullable=False)
+    content_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    height: Mapped[int] = mapped_column(Integer, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"PhotoRendition(id={self.id} photo_id={self.photo_id} name='{self.name}' "
+            f"width={self.width} height={self.height})"
+        )
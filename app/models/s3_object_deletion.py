@@ -0,0 +1,21 @@
+from app.db import Base
+from sqlalchemy import BigInteger, DateTime, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class S3ObjectDeletion(Base):
+    """An S3 key waiting for app.services.s3_deletion_collector to delete it"""
+
+    __tablename__ = "s3_object_deletion"
+    __table_args__ = (Index("ux_s3_object_deletion_s3_key", "s3_key", unique=True),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, nullable=False)
+    s3_key: Mapped[str] = mapped_column(String(320), nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+    # set while a collector works on the key, it is claimable again afterwards
+    claimed_until: Mapped[DateTime] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"S3ObjectDeletion(id={self.id} s3_key='{self.s3_key}')"
@@ -1,14 +1,38 @@
 from app.db import Base
-from sqlalchemy import ForeignKey
+from sqlalchemy import DateTime, ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 
 class UserPhoto(Base):
     __tablename__ = "user_photo"
+    __table_args__ = (
+        Index("ux_user_photo_user_id_photo_id", "user_id", "photo_id", unique=True),
+        Index("ix_user_photo_photo_id", "photo_id"),
+        # Keyset pagination order of a user's listing: (date_taken, photo_id) DESC
+        Index(
+            "ix_user_photo_user_id_date_taken_photo_id",
+            "user_id",
+            text("date_taken DESC"),
+            text("photo_id DESC"),
+        ),
+        # A user holds one photo per content
+        Index(
+            "ux_user_photo_user_id_content_hash",
+            "user_id",
+            "content_hash",
+            unique=True,
+            postgresql_where=text("content_hash IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, nullable=False)
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
     photo_id: Mapped[int] = mapped_column(ForeignKey("photo.id"))
+    # Copy of photo.content_hash, photo has no user column to index it with
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True)
+    # Copy of photo.date_taken, so a listing is read in order from one index
+    # instead of sorting every photo the user has
+    date_taken: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
 
     def __repr__(self):
         return f"UserPhoto(id={self.id} user_id='{self.user_id}' photo_id='{self.photo_id}')"
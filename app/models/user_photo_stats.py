@@ -0,0 +1,26 @@
+from app.db import Base
+from sqlalchemy import BigInteger, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class UserPhotoStats(Base):
+    """Per-user photo counters, kept in sync by PhotoRepository writes"""
+
+    __tablename__ = "user_photo_stats"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), primary_key=True)
+    live_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    deleted_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    total_bytes: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+
+    def __repr__(self):
+        return (
+            f"UserPhotoStats(user_id={self.user_id} live_count={self.live_count} "
+            f"deleted_count={self.deleted_count} total_bytes={self.total_bytes})"
+        )
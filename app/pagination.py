@@ -0,0 +1,31 @@
+import base64
+import binascii
+from datetime import datetime
+from enum import Enum
+import json
+
+from app.exceptions import InvalidCursor
+
+
+class TotalMode(str, Enum):
+    """How the total of a listing is computed"""
+
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
+def encode_cursor(date_taken: datetime, id: int) -> str:
+    """Encodes the keyset position of the last photo of a page as an opaque token"""
+    raw = json.dumps([date_taken.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decodes a token produced by encode_cursor into (date_taken, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_taken, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date_taken), int(id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor() from e
@@ -0,0 +1,63 @@
+"""Resized variants (renditions) of uploaded photos.
+
+Rendering is CPU bound and kept free of app state so it can run in a process
+pool, see app.services.rendition_generator.
+"""
+
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+CONTENT_TYPES = {"webp": "image/webp", "avif": "image/avif", "jpeg": "image/jpeg"}
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedImage:
+    name: str
+    body: bytes
+    width: int
+    height: int
+
+
+def rendition_key(s3_key: str, name: str, image_format: str) -> str:
+    """S3 key of a rendition, derived from the key of its original"""
+    return f"renditions/{name}/{s3_key}.{image_format}"
+
+
+def render_renditions(
+    data: bytes, sizes: dict[str, int], image_format: str, quality: int
+) -> list[RenderedImage]:
+    """Renders one image per size, each fitting in a `size` px square, never upscaled"""
+    if not sizes:
+        return []
+
+    with Image.open(BytesIO(data)) as original:
+        # lets JPEG decode at a reduced scale when the largest size allows it
+        largest = max(sizes.values())
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+
+    if image.mode not in ("RGB", "RGBA") or (
+        image_format == "jpeg" and image.mode == "RGBA"
+    ):
+        keep_alpha = image_format != "jpeg" and image.has_transparency_data
+        image = image.convert("RGBA" if keep_alpha else "RGB")
+
+    rendered = []
+    # largest first, so every smaller size is resampled from the previous one
+    for name, size in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        image = image.copy()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, format=image_format.upper(), quality=quality)
+        rendered.append(
+            RenderedImage(
+                name=name,
+                body=buffer.getvalue(),
+                width=image.width,
+                height=image.height,
+            )
+        )
+
+    return rendered
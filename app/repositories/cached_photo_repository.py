@@ -0,0 +1,240 @@
+from datetime import datetime
+from functools import partial
+
+import orjson
+
+from app.config import settings
+from app.models.photo import Photo
+from app.models.photo_rendition import PhotoRendition
+from app.models.user_photo import UserPhoto
+from app.models.user_photo_stats import UserPhotoStats
+from app.pagination import TotalMode
+from app.repositories.photo_cache import PhotoCache
+from app.repositories.photo_repository import (
+    MovedPhoto,
+    PhotoOwnership,
+    PhotoRecord,
+    PhotoRenditionRecord,
+    PhotoRepositoryInterface,
+)
+
+
+def _encode_records(records: list[PhotoRecord]) -> list[list]:
+    return [list(record) for record in records]
+
+
+def _decode_records(rows: list[list]) -> list[PhotoRecord]:
+    date_taken = PhotoRecord._fields.index("date_taken")
+    records = []
+    for row in rows:
+        row[date_taken] = datetime.fromisoformat(row[date_taken])
+        records.append(PhotoRecord._make(row))
+    return records
+
+
+def _encode_photo(photo: PhotoRecord) -> bytes:
+    return orjson.dumps(_encode_records([photo]))
+
+
+def _decode_photo(data: bytes) -> PhotoRecord:
+    return _decode_records(orjson.loads(data))[0]
+
+
+def _encode_listing(listing: tuple[list[PhotoRecord], int | None]) -> bytes:
+    records, total = listing
+    return orjson.dumps({"records": _encode_records(records), "total": total})
+
+
+def _decode_listing(data: bytes) -> tuple[list[PhotoRecord], int | None]:
+    listing = orjson.loads(data)
+    return _decode_records(listing["records"]), listing["total"]
+
+
+class CachedPhotoRepository(PhotoRepositoryInterface):
+    """Serves get_photo_by_id and get_user_photos from a PhotoCache.
+
+    Entries depend on the version of the photo ("photo:{id}") or of its owner's
+    listings ("user:{id}"); writes made through this repository move those
+    versions right away, and PhotoCache moves them again once the transaction
+    has had time to commit. Everything else goes straight to the wrapped
+    repository, and so do the reads when read_through is off: a request that
+    must see its own writes neither reads nor fills entries that may predate
+    them.
+    """
+
+    def __init__(
+        self,
+        repository: PhotoRepositoryInterface,
+        cache: PhotoCache,
+        read_through: bool = True,
+    ):
+        self.repository = repository
+        self.cache = cache
+        self.read_through = read_through
+
+    async def _invalidate(self, scopes: list[str]) -> None:
+        # the write itself succeeded, stale entries still expire after the ttl
+        try:
+            await self.cache.invalidate(scopes)
+        except Exception as e:
+            settings.logger.error(f"Photo cache invalidation failed: {e} ({type(e)})")
+
+    async def create_photo(self, photo: Photo, user_id: int) -> None:
+        await self.repository.create_photo(photo=photo, user_id=user_id)
+        await self._invalidate([f"user:{user_id}"])
+
+    async def bulk_create_photos(
+        self, photos: list[Photo], user_id: int
+    ) -> list[tuple[int, bool]]:
+        stored = await self.repository.bulk_create_photos(
+            photos=photos, user_id=user_id
+        )
+        await self._invalidate([f"user:{user_id}"])
+        return stored
+
+    async def get_user_photos_by_hashes(
+        self, user_id: int, content_hashes: list[str]
+    ) -> dict[str, Photo]:
+        return await self.repository.get_user_photos_by_hashes(user_id, content_hashes)
+
+    async def get_s3_keys_by_hashes(self, content_hashes: list[str]) -> dict[str, str]:
+        return await self.repository.get_s3_keys_by_hashes(content_hashes)
+
+    async def enqueue_s3_deletion(self, keys: list[str]) -> None:
+        await self.repository.enqueue_s3_deletion(keys)
+
+    async def get_pending_photo_by_id(self, id: int) -> Photo:
+        return await self.repository.get_pending_photo_by_id(id)
+
+    async def complete_pending_photo(self, id: int) -> bool:
+        if not await self.repository.complete_pending_photo(id):
+            return False
+        # pending photos are never cached, only the owners' listings change
+        owner_ids = await self.repository.get_photo_owner_ids(id)
+        await self._invalidate([f"user:{owner_id}" for owner_id in owner_ids])
+        return True
+
+    async def delete_stale_pending_photos(self, ttl: int, limit: int) -> int:
+        return await self.repository.delete_stale_pending_photos(ttl, limit)
+
+    async def get_legacy_s3_keys(
+        self, after: str, limit: int
+    ) -> list[tuple[str, int, datetime]]:
+        return await self.repository.get_legacy_s3_keys(after, limit)
+
+    async def move_s3_keys(self, moves: dict[str, str]) -> list[MovedPhoto]:
+        moved = await self.repository.move_s3_keys(moves)
+        # cached records still point at the old keys, which are queued for deletion
+        scopes = set()
+        for photo in moved:
+            scopes.add(f"photo:{photo.id}")
+            scopes.update(f"user:{owner_id}" for owner_id in photo.owner_ids)
+        await self._invalidate(list(scopes))
+        return moved
+
+    async def get_photo_by_id(self, id: int) -> PhotoRecord | None:
+        if not self.read_through:
+            return await self.repository.get_photo_by_id(id)
+
+        (version,) = await self.cache.versions([f"photo:{id}"])
+        return await self.cache.get_or_load(
+            f"photo:{id}:{version}",
+            partial(self.repository.get_photo_by_id, id),
+            _encode_photo,
+            _decode_photo,
+        )
+
+    async def get_deleted_photo_by_id(self, id: int) -> PhotoRecord | None:
+        return await self.repository.get_deleted_photo_by_id(id)
+
+    async def get_user_photo_relation(self, photo_id: int, user_id: int) -> UserPhoto:
+        return await self.repository.get_user_photo_relation(photo_id, user_id)
+
+    async def get_photo_owner_ids(self, photo_id: int) -> list[int]:
+        return await self.repository.get_photo_owner_ids(photo_id)
+
+    async def get_user_photos(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: tuple[datetime, int] | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[list[PhotoRecord], int | None]:
+        if not self.read_through:
+            return await self.repository.get_user_photos(
+                user_id=user_id,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                total_mode=total_mode,
+            )
+
+        (version,) = await self.cache.versions([f"user:{user_id}"])
+        position = f"{cursor[0].isoformat()},{cursor[1]}" if cursor else skip
+        return await self.cache.get_or_load(
+            f"photos:{user_id}:{version}:{position}:{limit}:{total_mode.value}",
+            partial(
+                self.repository.get_user_photos,
+                user_id=user_id,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                total_mode=total_mode,
+            ),
+            _encode_listing,
+            _decode_listing,
+        )
+
+    async def get_photo_renditions(
+        self, photo_ids: list[int], names: list[str] | None = None
+    ) -> list[PhotoRenditionRecord]:
+        # renditions are stored by the job worker, which writes around the cache
+        return await self.repository.get_photo_renditions(photo_ids, names=names)
+
+    async def upsert_photo_renditions(self, renditions: list[PhotoRendition]) -> None:
+        await self.repository.upsert_photo_renditions(renditions)
+
+    async def get_user_photo_stats(self, user_id: int) -> UserPhotoStats | None:
+        return await self.repository.get_user_photo_stats(user_id)
+
+    async def reconcile_user_photo_stats(self, user_id: int | None = None) -> int:
+        return await self.repository.reconcile_user_photo_stats(user_id)
+
+    async def _invalidate_mutation(
+        self, user_id: int, photos: dict[int, PhotoOwnership]
+    ) -> None:
+        await self._invalidate(
+            [f"user:{user_id}"]
+            + [f"photo:{id}" for id, photo in photos.items() if photo.owned]
+        )
+
+    async def soft_delete_toggle(
+        self, id: int, deleting: bool, user_id: int
+    ) -> PhotoOwnership | None:
+        photos = await self.bulk_soft_delete_toggle([id], deleting, user_id)
+        return photos.get(id)
+
+    async def bulk_soft_delete_toggle(
+        self, ids: list[int], deleting: bool, user_id: int
+    ) -> dict[int, PhotoOwnership]:
+        photos = await self.repository.bulk_soft_delete_toggle(
+            ids=ids, deleting=deleting, user_id=user_id
+        )
+        await self._invalidate_mutation(user_id, photos)
+        return photos
+
+    async def purge_deleted_photos(self, retention: int, limit: int) -> int:
+        # deleted photos are left out of every cached read already
+        return await self.repository.purge_deleted_photos(retention, limit)
+
+    async def hard_delete_photo(self, id: int, user_id: int) -> PhotoOwnership | None:
+        photos = await self.bulk_hard_delete_photos([id], user_id)
+        return photos.get(id)
+
+    async def bulk_hard_delete_photos(
+        self, ids: list[int], user_id: int
+    ) -> dict[int, PhotoOwnership]:
+        photos = await self.repository.bulk_hard_delete_photos(ids=ids, user_id=user_id)
+        await self._invalidate_mutation(user_id, photos)
+        return photos
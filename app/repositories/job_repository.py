@@ -0,0 +1,157 @@
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.job import Job, JobStatus
+
+
+class JobRepositoryInterface(ABC):
+
+    @abstractmethod
+    async def enqueue(
+        self,
+        kind: str,
+        payloads: list[dict],
+        max_attempts: int = settings.job_max_attempts,
+    ) -> None:
+        """Queues one job per payload as part of the current transaction"""
+        pass
+
+    @abstractmethod
+    async def claim(
+        self, kinds: list[str], limit: int, visibility_timeout: int
+    ) -> list[Job]:
+        """Claims up to limit due jobs, hiding them from other claims for visibility_timeout seconds.
+
+        Jobs whose last attempt never reported back (the worker died) are
+        failed instead of being claimed again.
+        """
+        pass
+
+    @abstractmethod
+    async def extend(self, id: int, attempts: int, visibility_timeout: int) -> bool:
+        """Keeps a claimed job hidden for visibility_timeout more seconds; False if the claim was lost"""
+        pass
+
+    @abstractmethod
+    async def complete(self, id: int, attempts: int) -> None:
+        """Deletes a finished job, unless it was claimed again since"""
+        pass
+
+    @abstractmethod
+    async def retry(self, id: int, attempts: int, error: str, delay: float) -> None:
+        """Makes a failed job claimable again after delay seconds, unless it was claimed again since"""
+        pass
+
+    @abstractmethod
+    async def fail(self, id: int, attempts: int, error: str) -> None:
+        """Marks a job as failed for good, unless it was claimed again since"""
+        pass
+
+
+class JobRepository(JobRepositoryInterface):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(
+        self,
+        kind: str,
+        payloads: list[dict],
+        max_attempts: int = settings.job_max_attempts,
+    ) -> None:
+        if not payloads:
+            return
+
+        stmt = insert(Job).values(
+            [
+                {"kind": kind, "payload": payload, "max_attempts": max_attempts}
+                for payload in payloads
+            ]
+        )
+        await self.session.execute(stmt)
+
+    async def claim(
+        self, kinds: list[str], limit: int, visibility_timeout: int
+    ) -> list[Job]:
+        # a job that crashes its worker never reaches fail(): its lease just
+        # expires with every attempt used up
+        exhausted = (
+            update(Job)
+            .where(
+                Job.status == JobStatus.QUEUED.value,
+                Job.kind.in_(kinds),
+                Job.run_at <= func.now(),
+                Job.attempts >= Job.max_attempts,
+            )
+            .values(
+                status=JobStatus.FAILED.value,
+                last_error=func.concat_ws(
+                    "; ", Job.last_error, "the last attempt never reported back"
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(exhausted)
+
+        due = (
+            select(Job.id)
+            .where(
+                Job.status == JobStatus.QUEUED.value,
+                Job.kind.in_(kinds),
+                Job.run_at <= func.now(),
+                Job.attempts < Job.max_attempts,
+            )
+            .order_by(Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        # pushing run_at forward is the lease: if the worker dies the job is
+        # due again once the timeout expires, no separate lock column needed
+        stmt = (
+            update(Job)
+            .where(Job.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=Job.attempts + 1,
+                run_at=func.now() + timedelta(seconds=visibility_timeout),
+            )
+            .returning(Job)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    @staticmethod
+    def _claimed(id: int, attempts: int):
+        # every claim bumps attempts, so a runner whose lease expired and was
+        # taken over no longer matches and cannot touch the new claim
+        return (Job.id == id) & (Job.attempts == attempts)
+
+    async def extend(self, id: int, attempts: int, visibility_timeout: int) -> bool:
+        stmt = (
+            update(Job)
+            .where(self._claimed(id, attempts))
+            .values(run_at=func.now() + timedelta(seconds=visibility_timeout))
+            .returning(Job.id)
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none() is not None
+
+    async def complete(self, id: int, attempts: int) -> None:
+        await self.session.execute(delete(Job).where(self._claimed(id, attempts)))
+
+    async def retry(self, id: int, attempts: int, error: str, delay: float) -> None:
+        stmt = (
+            update(Job)
+            .where(self._claimed(id, attempts))
+            .values(run_at=func.now() + timedelta(seconds=delay), last_error=error)
+        )
+        await self.session.execute(stmt)
+
+    async def fail(self, id: int, attempts: int, error: str) -> None:
+        stmt = (
+            update(Job)
+            .where(self._claimed(id, attempts))
+            .values(status=JobStatus.FAILED.value, last_error=error)
+        )
+        await self.session.execute(stmt)
@@ -0,0 +1,276 @@
+"""Two-tier cache of photo metadata read by app.repositories.cached_photo_repository.
+
+Lookups go to a per-process LRU first and then, when configured, to a
+Redis-compatible server shared by every worker. Entries are keyed by a
+version token per user and per photo; invalidating bumps the token, which
+makes every entry built on the old one unreachable (they then expire on
+their own). Tokens are random, so a version entry that is evicted or expires
+is simply replaced by a new one and can never resurrect old entries.
+"""
+
+import asyncio
+import secrets
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+# Version tokens outlive the entries built on them; losing one early is safe
+VERSION_TTL = 24 * 3600
+# Handed to the callers waiting on a load that failed, they load on their own
+_FAILED = object()
+
+
+class PhotoCacheBackend(ABC):
+    """Storage for cache entries; values are bytes for shared backends"""
+
+    @abstractmethod
+    async def get_many(self, keys: list[str]) -> list[Any | None]:
+        """Returns the value of every key, None when missing or expired"""
+        pass
+
+    @abstractmethod
+    async def set_many(self, entries: dict[str, Any], ttl: int) -> None:
+        """Stores the given entries for ttl seconds"""
+        pass
+
+    @abstractmethod
+    async def add_many(self, entries: dict[str, Any], ttl: int) -> None:
+        """Stores the given entries for ttl seconds, except for keys already set"""
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryPhotoCacheBackend(PhotoCacheBackend):
+    """Bounded per-process LRU with expiry; also the stand-in for a shared backend"""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.evictions = 0
+
+    async def get_many(self, keys: list[str]) -> list[Any | None]:
+        entries = self._entries
+        now = time.monotonic()
+        found = []
+        for key in keys:
+            entry = entries.get(key)
+            if entry is None:
+                found.append(None)
+            elif entry[0] <= now:
+                del entries[key]
+                found.append(None)
+            else:
+                entries.move_to_end(key)
+                found.append(entry[1])
+        return found
+
+    async def set_many(self, entries: dict[str, Any], ttl: int) -> None:
+        expires_at = time.monotonic() + ttl
+        for key, value in entries.items():
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+        overflow = len(self._entries) - self._max_entries
+        for _ in range(max(overflow, 0)):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def add_many(self, entries: dict[str, Any], ttl: int) -> None:
+        found = await self.get_many(list(entries))
+        await self.set_many(
+            {
+                key: value
+                for (key, value), current in zip(entries.items(), found)
+                if current is None
+            },
+            ttl,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisPhotoCacheBackend(PhotoCacheBackend):
+    """Any Redis-compatible server, through the optional redis package"""
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "PHOTO_CACHE_REDIS_URL is set but the redis package is not installed"
+            ) from e
+
+        self._client = redis.from_url(url)
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return await self._client.mget(keys) if keys else []
+
+    async def _set(self, entries: dict[str, bytes], ttl: int, nx: bool) -> None:
+        if not entries:
+            return
+
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in entries.items():
+                pipe.set(key, value, ex=ttl, nx=nx)
+            await pipe.execute()
+
+    async def set_many(self, entries: dict[str, bytes], ttl: int) -> None:
+        await self._set(entries, ttl, nx=False)
+
+    async def add_many(self, entries: dict[str, bytes], ttl: int) -> None:
+        await self._set(entries, ttl, nx=True)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class PhotoCache:
+    """Versioned read-through cache with single-flight loads.
+
+    Values kept in the shared tier go through encode/decode; the local tier
+    keeps them as they are. Concurrent misses on the same key in a process
+    share one load. invalidate() can run a second time after reinvalidate_after
+    seconds, for entries filled in the meantime from a transaction that had not
+    committed yet or from a lagging read replica.
+    """
+
+    def __init__(
+        self,
+        local: InMemoryPhotoCacheBackend,
+        shared: PhotoCacheBackend | None = None,
+        ttl: int = 60,
+        reinvalidate_after: float = 0,
+        prefix: str = "photo-cache",
+    ):
+        self._local = local
+        self._shared = shared
+        # versions must be seen by every process when entries are shared
+        self._versions = shared if shared is not None else local
+        self._ttl = ttl
+        self._reinvalidate_after = reinvalidate_after
+        self._prefix = prefix
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._pending_invalidations: set[asyncio.Task] = set()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def versions(self, scopes: list[str]) -> list[str]:
+        """Current version token of every scope, e.g. "user:1" or "photo:2" """
+        keys = [f"{self._prefix}:v:{scope}" for scope in scopes]
+        found = await self._versions.get_many(keys)
+
+        created = {}
+        tokens = []
+        for key, token in zip(keys, found):
+            if token is None:
+                token = created[key] = secrets.token_hex(8)
+            elif isinstance(token, bytes):
+                token = token.decode()
+            tokens.append(token)
+        # a concurrent reader may win the add, entries under the losing
+        # token are just never read again
+        await self._versions.add_many(created, VERSION_TTL)
+        return tokens
+
+    async def invalidate(self, scopes: list[str]) -> None:
+        """Moves the given scopes to a new version"""
+        if not scopes:
+            return
+
+        await self._versions.set_many(
+            {f"{self._prefix}:v:{scope}": secrets.token_hex(8) for scope in scopes},
+            VERSION_TTL,
+        )
+        if self._reinvalidate_after > 0:
+            task = asyncio.create_task(self._reinvalidate(scopes))
+            self._pending_invalidations.add(task)
+            task.add_done_callback(self._pending_invalidations.discard)
+
+    async def _reinvalidate(self, scopes: list[str]) -> None:
+        await asyncio.sleep(self._reinvalidate_after)
+        await self._versions.set_many(
+            {f"{self._prefix}:v:{scope}": secrets.token_hex(8) for scope in scopes},
+            VERSION_TTL,
+        )
+
+    async def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], bytes],
+        decode: Callable[[bytes], Any],
+    ) -> Any:
+        """Returns the cached value of key, loading and caching it on a miss.
+
+        key must embed the versions it depends on. None values are not cached.
+        """
+        key = f"{self._prefix}:{key}"
+        (value,) = await self._local.get_many([key])
+        if value is not None:
+            self.local_hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            value = await asyncio.shield(inflight)
+            if value is not _FAILED:
+                return value
+            return await load()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, load, encode, decode)
+        except BaseException:
+            future.set_result(_FAILED)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def _load(self, key, load, encode, decode) -> Any:
+        if self._shared is not None:
+            (data,) = await self._shared.get_many([key])
+            if data is not None:
+                self.shared_hits += 1
+                value = decode(data)
+                await self._local.set_many({key: value}, self._ttl)
+                return value
+
+        self.misses += 1
+        value = await load()
+        if value is None:
+            return None
+
+        await self._local.set_many({key: value}, self._ttl)
+        if self._shared is not None:
+            await self._shared.set_many({key: encode(value)}, self._ttl)
+        return value
+
+    async def close(self) -> None:
+        for task in self._pending_invalidations:
+            task.cancel()
+        if self._shared is not None:
+            await self._shared.close()
+
+    def stats(self) -> dict[str, float]:
+        hits = self.local_hits + self.shared_hits
+        lookups = hits + self.misses + self.coalesced
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (hits + self.coalesced) / lookups if lookups else 0.0,
+            "size": len(self._local),
+            "evictions": self._local.evictions,
+        }
@@ -1,9 +1,77 @@
 from abc import ABC, abstractmethod
-from sqlalchemy import delete, func, select, update
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import (
+    CTE,
+    Select,
+    String,
+    case,
+    column,
+    delete,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.photo import Photo
+from app.models.photo_rendition import PhotoRendition
+from app.models.s3_object_deletion import S3ObjectDeletion
 from app.models.user_photo import UserPhoto
+from app.models.user_photo_stats import UserPhotoStats
+from app.pagination import TotalMode
+from app.repositories.s3_deletion_repository import S3DeletionRepository
+from app.s3_keys import PHOTO_KEY_ROOT
+
+
+class PhotoRecord(NamedTuple):
+    """Read-only view of a photo, for paths that only serialize it.
+
+    Loading ORM entities (identity map, instance state) costs more than the
+    query itself; paths that change a photo keep using Photo.
+    """
+
+    id: int
+    filename: str
+    content_type: str
+    size: int
+    date_taken: datetime
+    is_public: bool
+    is_deleted: bool
+    s3_key: str
+    content_hash: str | None
+
+
+class PhotoRenditionRecord(NamedTuple):
+    photo_id: int
+    name: str
+    s3_key: str
+
+
+class PhotoOwnership(NamedTuple):
+    """What an ownership-scoped mutation found: the photo's is_deleted before
+    the change, and whether the user owns it (nothing is changed otherwise)"""
+
+    is_deleted: bool
+    owned: bool
+
+
+class MovedPhoto(NamedTuple):
+    """A photo move_s3_keys repointed, with the key it left and its owners"""
+
+    id: int
+    old_key: str
+    owner_ids: list[int]
+
+
+# selected in PhotoRecord field order
+PHOTO_RECORD_COLUMNS = tuple(getattr(Photo, name) for name in PhotoRecord._fields)
 
 
 class PhotoRepositoryInterface(ABC):
@@ -14,12 +82,71 @@ class PhotoRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    async def get_photo_by_id(self, id: int) -> Photo:
+    async def bulk_create_photos(
+        self, photos: list[Photo], user_id: int
+    ) -> list[tuple[int, bool]]:
+        """Creates many photos owned by a user, returns (id, created) in the given order.
+
+        A photo whose content_hash the user got in the meantime (a concurrent
+        upload) is not created, it resolves to the photo the user already has.
+        """
+        pass
+
+    @abstractmethod
+    async def get_user_photos_by_hashes(
+        self, user_id: int, content_hashes: list[str]
+    ) -> dict[str, Photo]:
+        """Gets the photos of a user (deleted included) with any of the given content hashes, by hash"""
+        pass
+
+    @abstractmethod
+    async def get_s3_keys_by_hashes(self, content_hashes: list[str]) -> dict[str, str]:
+        """Gets an S3 key already holding each of the given content hashes, by hash.
+
+        The keys stay safe from the S3 deletion collector until the transaction
+        ends, so the photos pointed at them must be created in it.
+        """
+        pass
+
+    @abstractmethod
+    async def enqueue_s3_deletion(self, keys: list[str]) -> None:
+        """Queues objects that are no longer needed for the S3 deletion collector"""
+        pass
+
+    @abstractmethod
+    async def get_pending_photo_by_id(self, id: int) -> Photo:
+        """Gets a photo whose direct upload has not been completed yet"""
+        pass
+
+    @abstractmethod
+    async def complete_pending_photo(self, id: int) -> bool:
+        """Marks a pending photo as uploaded, making it visible; False if it is gone"""
+        pass
+
+    @abstractmethod
+    async def delete_stale_pending_photos(self, ttl: int, limit: int) -> int:
+        """Deletes up to limit pending photos older than ttl seconds, queueing their S3 objects"""
+        pass
+
+    @abstractmethod
+    async def get_legacy_s3_keys(
+        self, after: str, limit: int
+    ) -> list[tuple[str, int, datetime]]:
+        """Gets up to limit (s3_key, owner id, created_at) of keys sorting after `after` that predate app.s3_keys"""
+        pass
+
+    @abstractmethod
+    async def move_s3_keys(self, moves: dict[str, str]) -> list[MovedPhoto]:
+        """Repoints photos from old to new keys and queues the objects left unused, returns the photos moved"""
+        pass
+
+    @abstractmethod
+    async def get_photo_by_id(self, id: int) -> PhotoRecord | None:
         """Get a photo by its id"""
         pass
 
     @abstractmethod
-    async def get_deleted_photo_by_id(self, id: int) -> Photo:
+    async def get_deleted_photo_by_id(self, id: int) -> PhotoRecord | None:
         """Gets any photo by its id even if deleted"""
         pass
 
@@ -28,21 +155,79 @@ class PhotoRepositoryInterface(ABC):
         """Gets a user_photo relation by both photo_id and user_id"""
         pass
 
+    @abstractmethod
+    async def get_photo_owner_ids(self, photo_id: int) -> list[int]:
+        """Gets the ids of the users a photo belongs to"""
+        pass
+
     @abstractmethod
     async def get_user_photos(
-        self, user_id: int, skip: int = 0, limit: int = 10
-    ) -> tuple[list[Photo], int]:
-        """Gets a list of photos for a given user"""
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: tuple[datetime, int] | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[list[PhotoRecord], int | None]:
+        """Gets a page of photos for a given user, newest first, and their total.
+
+        When a (date_taken, id) cursor is given the page starts right after it
+        (keyset pagination) and skip is ignored. The total is exact, estimated or
+        None depending on total_mode; the estimate is the user_photo_stats counter.
+        """
+        pass
+
+    @abstractmethod
+    async def get_photo_renditions(
+        self, photo_ids: list[int], names: list[str] | None = None
+    ) -> list[PhotoRenditionRecord]:
+        """Gets the renditions of the given photos, optionally only the named ones"""
+        pass
+
+    @abstractmethod
+    async def upsert_photo_renditions(self, renditions: list[PhotoRendition]) -> None:
+        """Stores renditions, replacing any existing one with the same photo and name"""
+        pass
+
+    @abstractmethod
+    async def get_user_photo_stats(self, user_id: int) -> UserPhotoStats | None:
+        """Gets the photo counters of a user"""
+        pass
+
+    @abstractmethod
+    async def reconcile_user_photo_stats(self, user_id: int | None = None) -> int:
+        """Recomputes photo counters from the photo tables, returns how many rows drifted"""
+        pass
+
+    @abstractmethod
+    async def soft_delete_toggle(
+        self, id: int, deleting: bool, user_id: int
+    ) -> PhotoOwnership | None:
+        """Toggles the is_deleted property of a photo owned by the user, None if there is no such photo"""
+        pass
+
+    @abstractmethod
+    async def bulk_soft_delete_toggle(
+        self, ids: list[int], deleting: bool, user_id: int
+    ) -> dict[int, PhotoOwnership]:
+        """Toggles is_deleted on the given photos owned by the user, returns every photo found by id"""
+        pass
+
+    @abstractmethod
+    async def purge_deleted_photos(self, retention: int, limit: int) -> int:
+        """Deletes up to limit photos soft-deleted more than retention seconds ago, queueing their S3 objects"""
         pass
 
     @abstractmethod
-    async def soft_delete_toggle(self, id: int, deleting: bool) -> None:
-        """Toggles the is_deleted property of a photo"""
+    async def hard_delete_photo(self, id: int, user_id: int) -> PhotoOwnership | None:
+        """Deletes a photo owned by the user, queueing its S3 objects for deletion; None if there is no such photo"""
         pass
 
     @abstractmethod
-    async def hard_delete_photo(self, id: int) -> None:
-        """Deletes a photo"""
+    async def bulk_hard_delete_photos(
+        self, ids: list[int], user_id: int
+    ) -> dict[int, PhotoOwnership]:
+        """Deletes the given photos owned by the user, queueing their S3 objects for deletion; returns every photo found by id"""
         pass
 
 
@@ -50,34 +235,325 @@ class PhotoRepository(PhotoRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def _create_user_photo(self, photo_id: int, user_id: int) -> None:
-        user_photo = UserPhoto(photo_id=photo_id, user_id=user_id)
+    async def _create_user_photo(self, photo: Photo, user_id: int) -> None:
+        user_photo = UserPhoto(
+            photo_id=photo.id,
+            user_id=user_id,
+            content_hash=photo.content_hash,
+            date_taken=photo.date_taken,
+        )
         self.session.add(user_photo)
         await self.session.flush()
 
+    async def _update_user_photo_stats(
+        self,
+        user_ids: list[int],
+        live_count: int = 0,
+        deleted_count: int = 0,
+        total_bytes: int = 0,
+    ) -> None:
+        """Adds the given deltas to the counters of every user, creating missing rows"""
+        await self._apply_user_photo_stats_deltas(
+            [
+                {
+                    "user_id": user_id,
+                    "live_count": live_count,
+                    "deleted_count": deleted_count,
+                    "total_bytes": total_bytes,
+                }
+                for user_id in user_ids
+            ]
+        )
+
+    def _add_user_photo_stats_deltas(self, stmt: Insert) -> Insert:
+        """Makes an INSERT of (user_id, live_count, deleted_count, total_bytes) add to existing counters"""
+        return stmt.on_conflict_do_update(
+            index_elements=[UserPhotoStats.user_id],
+            set_={
+                "live_count": UserPhotoStats.live_count + stmt.excluded.live_count,
+                "deleted_count": UserPhotoStats.deleted_count
+                + stmt.excluded.deleted_count,
+                "total_bytes": UserPhotoStats.total_bytes + stmt.excluded.total_bytes,
+            },
+        )
+
+    async def _apply_user_photo_stats_deltas(self, deltas: list[dict]) -> None:
+        """Adds per-user deltas (user_id, live_count, deleted_count, total_bytes) in one upsert"""
+        if not deltas:
+            return
+
+        stmt = insert(UserPhotoStats).values(deltas)
+        await self.session.execute(self._add_user_photo_stats_deltas(stmt))
+
+    def _user_photo_stats_deltas_cte(self, name: str, deltas: Select) -> CTE:
+        """Upsert of the (user_id, live_count, deleted_count, total_bytes) rows of deltas, as a CTE"""
+        stmt = insert(UserPhotoStats).from_select(
+            ["user_id", "live_count", "deleted_count", "total_bytes"], deltas
+        )
+        return self._add_user_photo_stats_deltas(stmt).cte(name)
+
     async def create_photo(self, photo: Photo, user_id: int) -> None:
         self.session.add(photo)
         await self.session.flush()
-        await self._create_user_photo(photo_id=photo.id, user_id=user_id)
+        await self._create_user_photo(photo=photo, user_id=user_id)
+        if photo.is_pending:
+            # counted by complete_pending_photo once the upload is verified
+            return
 
-    async def get_photo_by_id(self, id: int) -> Photo:
-        stmt = select(Photo).where(
-            Photo.id == id,
-            Photo.is_public == True,  # NOQA: E712
-            Photo.is_deleted == False,  # NOQA: E712
+        await self._update_user_photo_stats(
+            [user_id],
+            live_count=0 if photo.is_deleted else 1,
+            deleted_count=1 if photo.is_deleted else 0,
+            total_bytes=photo.size,
+        )
+
+    async def bulk_create_photos(
+        self, photos: list[Photo], user_id: int
+    ) -> list[tuple[int, bool]]:
+        if not photos:
+            return []
+
+        # executemany with RETURNING is sent as multi-row INSERT ... VALUES
+        # statements (up to 1000 rows each) instead of one round trip per photo
+        stmt = insert(Photo).returning(Photo.id, sort_by_parameter_order=True)
+        result = await self.session.execute(stmt, [photo.to_dict() for photo in photos])
+        ids = list(result.scalars().all())
+
+        # a concurrent upload of the same content by the same user may have
+        # linked it first; waits for that transaction instead of failing on
+        # ux_user_photo_user_id_content_hash
+        stmt = (
+            insert(UserPhoto)
+            .values(
+                [
+                    {
+                        "photo_id": photo_id,
+                        "user_id": user_id,
+                        "content_hash": photo.content_hash,
+                        "date_taken": photo.date_taken,
+                    }
+                    for photo_id, photo in zip(ids, photos)
+                ]
+            )
+            .on_conflict_do_nothing(
+                index_elements=[UserPhoto.user_id, UserPhoto.content_hash],
+                index_where=UserPhoto.content_hash.is_not(None),
+            )
+            .returning(UserPhoto.photo_id)
+        )
+        linked = set((await self.session.execute(stmt)).scalars().all())
+
+        existing = {}
+        unlinked = [photo_id for photo_id in ids if photo_id not in linked]
+        if unlinked:
+            await self.session.execute(delete(Photo).where(Photo.id.in_(unlinked)))
+            stmt = select(UserPhoto.content_hash, UserPhoto.photo_id).where(
+                UserPhoto.user_id == user_id,
+                UserPhoto.content_hash.in_(
+                    [
+                        photo.content_hash
+                        for photo_id, photo in zip(ids, photos)
+                        if photo_id not in linked
+                    ]
+                ),
+            )
+            existing = dict((await self.session.execute(stmt)).all())
+
+        created = [photo for photo_id, photo in zip(ids, photos) if photo_id in linked]
+        deleted_count = sum(1 for photo in created if photo.is_deleted)
+        await self._update_user_photo_stats(
+            [user_id],
+            live_count=len(created) - deleted_count,
+            deleted_count=deleted_count,
+            total_bytes=sum(photo.size for photo in created),
+        )
+
+        return [
+            (
+                (photo_id, True)
+                if photo_id in linked
+                else (existing[photo.content_hash], False)
+            )
+            for photo_id, photo in zip(ids, photos)
+        ]
+
+    async def get_user_photos_by_hashes(
+        self, user_id: int, content_hashes: list[str]
+    ) -> dict[str, Photo]:
+        if not content_hashes:
+            return {}
+
+        stmt = (
+            select(Photo)
+            .join(UserPhoto, UserPhoto.photo_id == Photo.id)
+            .where(
+                UserPhoto.user_id == user_id,
+                UserPhoto.content_hash.in_(content_hashes),
+                Photo.is_pending == False,  # NOQA: E712
+                # rows of a failed upload hold no object
+                Photo.s3_key != "",
+            )
         )
         result = await self.session.execute(stmt)
+        return {photo.content_hash: photo for photo in result.scalars().all()}
 
-        return result.scalar_one_or_none()
+    async def get_s3_keys_by_hashes(self, content_hashes: list[str]) -> dict[str, str]:
+        if not content_hashes:
+            return {}
+
+        stmt = (
+            select(Photo.content_hash, Photo.s3_key)
+            .where(
+                Photo.content_hash.in_(content_hashes),
+                Photo.is_pending == False,  # NOQA: E712
+                Photo.s3_key != "",
+                # a queued key may be deleted by the collector at any moment
+                Photo.s3_key.not_in(select(S3ObjectDeletion.s3_key)),
+            )
+            .distinct(Photo.content_hash)
+            .order_by(Photo.content_hash, Photo.s3_key)
+        )
+        result = await self.session.execute(stmt)
+        candidates = {content_hash: s3_key for content_hash, s3_key in result.all()}
+        if not candidates:
+            return {}
 
-    async def get_deleted_photo_by_id(self, id: int) -> Photo:
+        # the collector takes these locks before checking whether a key is still
+        # referenced, so it waits for this transaction's photos to be visible;
+        # read again once they are held, a key queued and released meanwhile is
+        # no longer listed
+        await S3DeletionRepository(self.session).lock_keys(list(candidates.values()))
+        result = await self.session.execute(
+            stmt.where(Photo.content_hash.in_(list(candidates)))
+        )
+        return {
+            content_hash: s3_key
+            for content_hash, s3_key in result.all()
+            if candidates[content_hash] == s3_key
+        }
+
+    async def enqueue_s3_deletion(self, keys: list[str]) -> None:
+        await S3DeletionRepository(self.session).enqueue(keys)
+
+    async def get_pending_photo_by_id(self, id: int) -> Photo:
         stmt = select(Photo).where(
             Photo.id == id,
+            Photo.is_pending == True,  # NOQA: E712
         )
         result = await self.session.execute(stmt)
 
         return result.scalar_one_or_none()
 
+    async def complete_pending_photo(self, id: int) -> bool:
+        stmt = (
+            update(Photo)
+            .values(is_pending=False)
+            .where(Photo.id == id, Photo.is_pending == True)  # NOQA: E712
+            .returning(Photo.size)
+        )
+        size = (await self.session.execute(stmt)).scalar_one_or_none()
+        if size is None:
+            # swept or completed by a concurrent request since it was read
+            return False
+
+        await self._update_user_photo_stats(
+            await self.get_photo_owner_ids(id), live_count=1, total_bytes=size
+        )
+        return True
+
+    async def delete_stale_pending_photos(self, ttl: int, limit: int) -> int:
+        stale_ids = (
+            select(Photo.id)
+            .where(
+                Photo.is_pending == True,  # NOQA: E712
+                Photo.created_at < func.now() - timedelta(seconds=ttl),
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        ids = list((await self.session.execute(stale_ids)).scalars().all())
+        if not ids:
+            return 0
+
+        await self.session.execute(delete(UserPhoto).where(UserPhoto.photo_id.in_(ids)))
+        stmt = delete(Photo).where(Photo.id.in_(ids)).returning(Photo.s3_key)
+        keys = list((await self.session.execute(stmt)).scalars().all())
+        # keys can be shared between photos (see dedup); an object another
+        # photo still uses must stay
+        repo = S3DeletionRepository(self.session)
+        referenced = await repo.get_referenced_keys(keys)
+        await repo.enqueue([key for key in keys if key not in referenced])
+        return len(keys)
+
+    async def get_legacy_s3_keys(
+        self, after: str, limit: int
+    ) -> list[tuple[str, int, datetime]]:
+        # a key shared by several photos (see dedup) is moved once for all of them
+        stmt = (
+            select(
+                Photo.s3_key, func.min(UserPhoto.user_id), func.min(Photo.created_at)
+            )
+            .join(UserPhoto, UserPhoto.photo_id == Photo.id)
+            .where(
+                ~Photo.s3_key.startswith(f"{PHOTO_KEY_ROOT}/"),
+                Photo.s3_key > after,
+                Photo.is_pending == False,  # NOQA: E712
+            )
+            .group_by(Photo.s3_key)
+            .order_by(Photo.s3_key)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def move_s3_keys(self, moves: dict[str, str]) -> list[MovedPhoto]:
+        if not moves:
+            return []
+
+        rows = values(
+            column("old_key", String), column("new_key", String), name="moves"
+        ).data(list(moves.items()))
+        owner_ids = func.array(
+            select(UserPhoto.user_id)
+            .where(UserPhoto.photo_id == Photo.id)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Photo)
+            .where(Photo.s3_key == rows.c.old_key)
+            .values(s3_key=rows.c.new_key)
+            .returning(Photo.id, rows.c.old_key, owner_ids)
+        )
+        result = await self.session.execute(stmt)
+        moved = [MovedPhoto._make(row) for row in result.all()]
+
+        # the old objects, and the copies of keys no photo points to anymore
+        moved_keys = {photo.old_key for photo in moved}
+        await S3DeletionRepository(self.session).enqueue(
+            [old if old in moved_keys else new for old, new in moves.items()]
+        )
+        return moved
+
+    async def get_photo_by_id(self, id: int) -> PhotoRecord | None:
+        stmt = select(*PHOTO_RECORD_COLUMNS).where(
+            Photo.id == id,
+            Photo.is_public == True,  # NOQA: E712
+            Photo.is_deleted == False,  # NOQA: E712
+            Photo.is_pending == False,  # NOQA: E712
+        )
+        row = (await self.session.execute(stmt)).one_or_none()
+
+        return PhotoRecord._make(row) if row else None
+
+    async def get_deleted_photo_by_id(self, id: int) -> PhotoRecord | None:
+        stmt = select(*PHOTO_RECORD_COLUMNS).where(
+            Photo.id == id,
+            Photo.is_pending == False,  # NOQA: E712
+        )
+        row = (await self.session.execute(stmt)).one_or_none()
+
+        return PhotoRecord._make(row) if row else None
+
     async def get_user_photo_relation(self, photo_id: int, user_id: int) -> UserPhoto:
         stmt = select(UserPhoto).where(
             UserPhoto.photo_id == photo_id, UserPhoto.user_id == user_id
@@ -85,40 +561,339 @@ class PhotoRepository(PhotoRepositoryInterface):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def get_user_photos(
-        self, user_id: int, skip: int = 0, limit: int = 10
-    ) -> tuple[list[Photo], int]:
-        data_stmt = (
-            select(Photo)
+    def _user_photos_stmt(self, user_id: int, *columns) -> Select:
+        return (
+            select(*columns)
+            .select_from(Photo)
             .join(UserPhoto, UserPhoto.photo_id == Photo.id)
             .where(
-                UserPhoto.user_id == user_id, Photo.is_deleted == False  # NOQA: E712
+                UserPhoto.user_id == user_id,
+                Photo.is_deleted == False,  # NOQA: E712
+                Photo.is_pending == False,  # NOQA: E712
             )
-            .offset(skip)
-            .limit(limit)
         )
-        data_result = await self.session.execute(data_stmt)
-        photos = list(data_result.scalars().all())
 
-        count_stmt = (
-            select(func.count())
-            .select_from(Photo)
-            .join(UserPhoto, UserPhoto.photo_id == Photo.id)
+    async def get_user_photos(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: tuple[datetime, int] | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[list[PhotoRecord], int | None]:
+        stmt = self._user_photos_stmt(user_id, *PHOTO_RECORD_COLUMNS)
+        if total_mode == TotalMode.EXACT:
+            # uncorrelated, so it runs once beside the page instead of making
+            # Postgres read every row of the user before the LIMIT
+            total = (
+                self._user_photos_stmt(user_id, func.count())
+                .correlate(None)
+                .scalar_subquery()
+            )
+            stmt = stmt.add_columns(total.label("total"))
+
+        # the order of ix_user_photo_user_id_date_taken_photo_id
+        stmt = stmt.order_by(
+            UserPhoto.date_taken.desc(), UserPhoto.photo_id.desc()
+        ).limit(limit)
+        if cursor:
+            stmt = stmt.where(tuple_(UserPhoto.date_taken, UserPhoto.photo_id) < cursor)
+        else:
+            stmt = stmt.offset(skip)
+        rows = (await self.session.execute(stmt)).all()
+
+        if total_mode == TotalMode.EXACT:
+            # an empty page carries no total; callers treat it as not found anyway
+            total = rows[0].total if rows else 0
+            rows = [row[:-1] for row in rows]
+        else:
+            total = None
+            if total_mode == TotalMode.ESTIMATE:
+                stats = await self.get_user_photo_stats(user_id)
+                total = stats.live_count if stats else 0
+
+        return [PhotoRecord._make(row) for row in rows], total
+
+    async def get_photo_renditions(
+        self, photo_ids: list[int], names: list[str] | None = None
+    ) -> list[PhotoRenditionRecord]:
+        if not photo_ids or names == []:
+            return []
+
+        stmt = select(
+            PhotoRendition.photo_id, PhotoRendition.name, PhotoRendition.s3_key
+        ).where(PhotoRendition.photo_id.in_(photo_ids))
+        if names is not None:
+            stmt = stmt.where(PhotoRendition.name.in_(names))
+        result = await self.session.execute(stmt)
+        return [PhotoRenditionRecord._make(row) for row in result]
+
+    async def upsert_photo_renditions(self, renditions: list[PhotoRendition]) -> None:
+        if not renditions:
+            return
+
+        stmt = insert(PhotoRendition).values(
+            [
+                {
+                    "photo_id": rendition.photo_id,
+                    "name": rendition.name,
+                    "s3_key": rendition.s3_key,
+                    "content_type": rendition.content_type,
+                    "width": rendition.width,
+                    "height": rendition.height,
+                    "size": rendition.size,
+                }
+                for rendition in renditions
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PhotoRendition.photo_id, PhotoRendition.name],
+            set_={
+                "s3_key": stmt.excluded.s3_key,
+                "content_type": stmt.excluded.content_type,
+                "width": stmt.excluded.width,
+                "height": stmt.excluded.height,
+                "size": stmt.excluded.size,
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def get_user_photo_stats(self, user_id: int) -> UserPhotoStats | None:
+        return await self.session.get(UserPhotoStats, user_id)
+
+    async def reconcile_user_photo_stats(self, user_id: int | None = None) -> int:
+        actual = (
+            select(
+                UserPhoto.user_id,
+                func.count().filter(Photo.is_deleted == False),  # NOQA: E712
+                func.count().filter(Photo.is_deleted == True),  # NOQA: E712
+                func.coalesce(func.sum(Photo.size), 0),
+            )
+            .join(Photo, Photo.id == UserPhoto.photo_id)
+            .where(Photo.is_pending == False)  # NOQA: E712
+            .group_by(UserPhoto.user_id)
+        )
+        orphaned = update(UserPhotoStats).where(
+            UserPhotoStats.user_id.not_in(select(UserPhoto.user_id)),
+            or_(
+                UserPhotoStats.live_count != 0,
+                UserPhotoStats.deleted_count != 0,
+                UserPhotoStats.total_bytes != 0,
+            ),
+        )
+        if user_id is not None:
+            actual = actual.where(UserPhoto.user_id == user_id)
+            orphaned = orphaned.where(UserPhotoStats.user_id == user_id)
+
+        upsert = insert(UserPhotoStats).from_select(
+            ["user_id", "live_count", "deleted_count", "total_bytes"], actual
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[UserPhotoStats.user_id],
+            set_={
+                "live_count": upsert.excluded.live_count,
+                "deleted_count": upsert.excluded.deleted_count,
+                "total_bytes": upsert.excluded.total_bytes,
+            },
+            where=or_(
+                UserPhotoStats.live_count != upsert.excluded.live_count,
+                UserPhotoStats.deleted_count != upsert.excluded.deleted_count,
+                UserPhotoStats.total_bytes != upsert.excluded.total_bytes,
+            ),
+        ).returning(UserPhotoStats.user_id)
+        repaired = len((await self.session.execute(upsert)).all())
+
+        orphaned = orphaned.values(
+            live_count=0, deleted_count=0, total_bytes=0
+        ).returning(UserPhotoStats.user_id)
+        repaired += len((await self.session.execute(orphaned)).all())
+
+        return repaired
+
+    async def get_photo_owner_ids(self, photo_id: int) -> list[int]:
+        stmt = select(UserPhoto.user_id).where(UserPhoto.photo_id == photo_id)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    def _owned_photos_cte(self, ids: list[int], user_id: int) -> CTE:
+        """The (id, is_deleted, owned) of non-pending photos, as a CTE the mutations are scoped by"""
+        owned = (
+            select(UserPhoto.id)
+            .where(UserPhoto.photo_id == Photo.id, UserPhoto.user_id == user_id)
+            .exists()
+        )
+        return (
+            select(Photo.id, Photo.is_deleted, owned.label("owned"))
+            .where(Photo.id.in_(ids), Photo.is_pending == False)  # NOQA: E712
+            # locked in id order, so overlapping bulk requests cannot deadlock
+            .order_by(Photo.id)
+            .with_for_update(of=Photo)
+            .cte("target")
+        )
+
+    async def soft_delete_toggle(
+        self, id: int, deleting: bool, user_id: int
+    ) -> PhotoOwnership | None:
+        photos = await self.bulk_soft_delete_toggle([id], deleting, user_id)
+        return photos.get(id)
+
+    async def bulk_soft_delete_toggle(
+        self, ids: list[int], deleting: bool, user_id: int
+    ) -> dict[int, PhotoOwnership]:
+        # lookup, ownership check, update and counters in a single statement
+        target = self._owned_photos_cte(ids, user_id)
+        toggled = (
+            update(Photo)
+            .values(is_deleted=deleting, deleted_at=func.now() if deleting else None)
+            .where(
+                Photo.id == target.c.id,
+                target.c.owned,
+                Photo.is_deleted != deleting,
+            )
+            .returning(Photo.id)
+            .cte("toggled")
+        )
+        delta = 1 if deleting else -1
+        stats = self._user_photo_stats_deltas_cte(
+            "stats",
+            select(
+                UserPhoto.user_id,
+                func.count() * -delta,
+                func.count() * delta,
+                literal(0),
+            )
+            .join(toggled, toggled.c.id == UserPhoto.photo_id)
+            .group_by(UserPhoto.user_id),
+        )
+        stmt = select(target.c.id, target.c.is_deleted, target.c.owned).add_cte(stats)
+
+        result = await self.session.execute(stmt)
+        return {row.id: PhotoOwnership(row.is_deleted, row.owned) for row in result}
+
+    async def purge_deleted_photos(self, retention: int, limit: int) -> int:
+        expired_ids = (
+            select(Photo.id)
             .where(
-                UserPhoto.user_id == user_id, Photo.is_deleted == False  # NOQA: E712
+                Photo.is_deleted == True,  # NOQA: E712
+                Photo.deleted_at < func.now() - timedelta(seconds=retention),
             )
+            .order_by(Photo.deleted_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
         )
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar_one_or_none()
+        # materialized once so every statement below sees the same batch
+        ids = list((await self.session.execute(expired_ids)).scalars().all())
+        if not ids:
+            return 0
 
-        return photos, total
+        stmt_1 = (
+            delete(UserPhoto)
+            .where(UserPhoto.photo_id.in_(ids))
+            .returning(UserPhoto.photo_id, UserPhoto.user_id)
+        )
+        stmt_2 = (
+            delete(PhotoRendition)
+            .where(PhotoRendition.photo_id.in_(ids))
+            .returning(PhotoRendition.s3_key)
+        )
+        stmt_3 = (
+            delete(Photo)
+            .where(Photo.id.in_(ids))
+            .returning(Photo.id, Photo.size, Photo.s3_key)
+        )
+        links = (await self.session.execute(stmt_1)).all()
+        rendition_keys = list((await self.session.execute(stmt_2)).scalars().all())
+        purged = (await self.session.execute(stmt_3)).all()
 
-    async def soft_delete_toggle(self, id: int, deleting: bool) -> None:
-        stmt = update(Photo).values(is_deleted=deleting).where(Photo.id == id)
-        await self.session.execute(stmt)
+        sizes = {photo.id: photo.size for photo in purged}
+        deltas: dict[int, dict] = {}
+        for link in links:
+            delta = deltas.setdefault(
+                link.user_id,
+                {
+                    "user_id": link.user_id,
+                    "live_count": 0,
+                    "deleted_count": 0,
+                    "total_bytes": 0,
+                },
+            )
+            delta["deleted_count"] -= 1
+            delta["total_bytes"] -= sizes[link.photo_id]
+        await self._apply_user_photo_stats_deltas(list(deltas.values()))
+
+        await S3DeletionRepository(self.session).enqueue(
+            [photo.s3_key for photo in purged] + rendition_keys
+        )
+        return len(purged)
+
+    async def hard_delete_photo(self, id: int, user_id: int) -> PhotoOwnership | None:
+        photos = await self.bulk_hard_delete_photos([id], user_id)
+        return photos.get(id)
 
-    async def hard_delete_photo(self, id: int) -> None:
-        stmt_1 = delete(UserPhoto).where(UserPhoto.photo_id == id)
-        stmt_2 = delete(Photo).where(Photo.id == id)
-        await self.session.execute(stmt_1)
-        await self.session.execute(stmt_2)
+    async def bulk_hard_delete_photos(
+        self, ids: list[int], user_id: int
+    ) -> dict[int, PhotoOwnership]:
+        # lookup, ownership check, the three deletes and counters in a single
+        # statement; foreign keys are checked at its end, so the order is free
+        target = self._owned_photos_cte(ids, user_id)
+        links = (
+            delete(UserPhoto)
+            .where(UserPhoto.photo_id == target.c.id, target.c.owned)
+            .returning(UserPhoto.photo_id, UserPhoto.user_id)
+            .cte("links")
+        )
+        renditions = (
+            delete(PhotoRendition)
+            .where(PhotoRendition.photo_id == target.c.id, target.c.owned)
+            .returning(PhotoRendition.photo_id, PhotoRendition.s3_key)
+            .cte("renditions")
+        )
+        deleted = (
+            delete(Photo)
+            .where(Photo.id == target.c.id, target.c.owned)
+            .returning(Photo.id, Photo.is_deleted, Photo.size, Photo.s3_key)
+            .cte("deleted")
+        )
+        stats = self._user_photo_stats_deltas_cte(
+            "stats",
+            select(
+                links.c.user_id,
+                func.sum(case((deleted.c.is_deleted, 0), else_=-1)),
+                func.sum(case((deleted.c.is_deleted, -1), else_=0)),
+                -func.sum(deleted.c.size),
+            )
+            .join_from(links, deleted, deleted.c.id == links.c.photo_id)
+            .group_by(links.c.user_id),
+        )
+        rendition_keys = (
+            select(
+                renditions.c.photo_id,
+                func.array_agg(renditions.c.s3_key).label("s3_keys"),
+            )
+            .group_by(renditions.c.photo_id)
+            .subquery()
+        )
+        stmt = (
+            select(
+                target.c.id,
+                target.c.is_deleted,
+                target.c.owned,
+                deleted.c.s3_key,
+                rendition_keys.c.s3_keys,
+            )
+            .outerjoin_from(target, deleted, deleted.c.id == target.c.id)
+            .outerjoin(rendition_keys, rendition_keys.c.photo_id == target.c.id)
+            .add_cte(stats)
+        )
+        rows = (await self.session.execute(stmt)).all()
+
+        # removed from S3 by the collector once this commits
+        await S3DeletionRepository(self.session).enqueue(
+            [
+                key
+                for row in rows
+                if row.s3_key is not None
+                for key in (row.s3_key, *(row.s3_keys or []))
+            ]
+        )
+        return {row.id: PhotoOwnership(row.is_deleted, row.owned) for row in rows}
@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from sqlalchemy import String, column, delete, func, or_, select, union, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.photo import Photo
+from app.models.photo_rendition import PhotoRendition
+from app.models.s3_object_deletion import S3ObjectDeletion
+
+
+class S3DeletionRepositoryInterface(ABC):
+
+    @abstractmethod
+    async def enqueue(self, keys: list[str]) -> None:
+        """Queues S3 keys for deletion as part of the current transaction"""
+        pass
+
+    @abstractmethod
+    async def claim(self, limit: int, lease: int) -> list[S3ObjectDeletion]:
+        """Claims up to limit queued keys for lease seconds, skipping the ones other collectors hold"""
+        pass
+
+    @abstractmethod
+    async def remove(self, ids: list[int]) -> None:
+        """Takes keys off the queue"""
+        pass
+
+    @abstractmethod
+    async def get_referenced_keys(self, keys: list[str]) -> set[str]:
+        """Returns which of the keys are still used by a photo or a rendition"""
+        pass
+
+    @abstractmethod
+    async def lock_keys(self, keys: list[str]) -> None:
+        """Holds, until the transaction ends, the locks that order deciding to delete a key against starting to share it"""
+        pass
+
+
+class S3DeletionRepository(S3DeletionRepositoryInterface):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(self, keys: list[str]) -> None:
+        keys = [key for key in keys if key]
+        if not keys:
+            return
+
+        stmt = insert(S3ObjectDeletion).values([{"s3_key": key} for key in keys])
+        await self.session.execute(stmt.on_conflict_do_nothing())
+
+    async def claim(self, limit: int, lease: int) -> list[S3ObjectDeletion]:
+        free = (
+            select(S3ObjectDeletion.id)
+            .where(
+                or_(
+                    S3ObjectDeletion.claimed_until == None,  # NOQA: E711
+                    S3ObjectDeletion.claimed_until < func.now(),
+                )
+            )
+            .order_by(S3ObjectDeletion.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        # like the job queue, the claim is a lease rather than a row lock held
+        # across the S3 call: a collector that dies gives its keys back once
+        # it runs out
+        stmt = (
+            update(S3ObjectDeletion)
+            .where(S3ObjectDeletion.id.in_(free.scalar_subquery()))
+            .values(claimed_until=func.now() + timedelta(seconds=lease))
+            .returning(S3ObjectDeletion)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return sorted(result.scalars().all(), key=lambda item: item.id)
+
+    async def remove(self, ids: list[int]) -> None:
+        if not ids:
+            return
+
+        await self.session.execute(
+            delete(S3ObjectDeletion).where(S3ObjectDeletion.id.in_(ids))
+        )
+
+    async def get_referenced_keys(self, keys: list[str]) -> set[str]:
+        if not keys:
+            return set()
+
+        stmt = union(
+            select(Photo.s3_key).where(Photo.s3_key.in_(keys)),
+            select(PhotoRendition.s3_key).where(PhotoRendition.s3_key.in_(keys)),
+        )
+        result = await self.session.execute(stmt)
+        return set(result.scalars().all())
+
+    async def lock_keys(self, keys: list[str]) -> None:
+        if not keys:
+            return
+
+        rows = values(column("s3_key", String), name="locked_keys").data(
+            [(key,) for key in set(keys)]
+        )
+        # taken in one order, so transactions locking overlapping keys queue up
+        # instead of deadlocking
+        hashes = (
+            select(func.hashtext(rows.c.s3_key).label("hash"))
+            .distinct()
+            .order_by("hash")
+            .subquery()
+        )
+        await self.session.execute(select(func.pg_advisory_xact_lock(hashes.c.hash)))
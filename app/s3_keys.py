@@ -0,0 +1,50 @@
+"""S3 key layout of uploaded photos.
+
+    photos/{shard}/{user_id}/{yyyy}/{mm}/{uuid}{ext}
+
+The shard is a hash of the user id, spreading users evenly over
+`s3_key_fanout` prefixes so S3 can partition the request rate instead of every
+upload hitting one hot prefix. The month partition keeps a user's objects
+listable by period, and the random id means same-named files never overwrite
+each other.
+"""
+
+import hashlib
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import PurePosixPath
+
+from app.config import settings
+
+PHOTO_KEY_ROOT = "photos"
+
+_EXTENSION = re.compile(r"\.[a-z0-9]{1,10}")
+
+
+def user_shard(user_id: int, fanout: int | None = None) -> str:
+    """Fixed-width hex shard of a user, in [0, fanout)"""
+    fanout = fanout or settings.s3_key_fanout
+    digest = hashlib.sha256(str(user_id).encode()).digest()
+    width = len(f"{fanout - 1:x}")
+    return f"{int.from_bytes(digest[:8]) % fanout:0{width}x}"
+
+
+def build_photo_key(
+    user_id: int, filename: str, created_at: datetime | None = None
+) -> str:
+    """New, unique S3 key of a photo; only the filename's extension is kept"""
+    created_at = created_at or datetime.now(timezone.utc)
+    extension = PurePosixPath(filename).suffix.lower()
+    if not _EXTENSION.fullmatch(extension):
+        extension = ""
+
+    return (
+        f"{PHOTO_KEY_ROOT}/{user_shard(user_id)}/{user_id}/"
+        f"{created_at:%Y}/{created_at:%m}/{uuid.uuid4().hex}{extension}"
+    )
+
+
+def is_photo_key(key: str) -> bool:
+    """Whether a key already follows this layout (anything else predates it)"""
+    return key.startswith(f"{PHOTO_KEY_ROOT}/")
@@ -1,4 +1,6 @@
 from datetime import datetime
+from enum import Enum
+from typing import Optional
 from pydantic import BaseModel, Field
 
 
@@ -16,20 +18,115 @@ class BasePhotoRequest(BaseModel):
 
 class PhotoRead(BasePhotoRequest):
     url: str = Field(..., description="S3 presigned URL")
-    pass
+    renditions: dict[str, str] = Field(
+        default_factory=dict,
+        description="S3 presigned URLs of the resized variants, by rendition name",
+    )
+    content_hash: Optional[str] = Field(
+        None, description="Hex SHA-256 of the photo, when known"
+    )
 
 
 class PhotoCreate(BasePhotoRequest):
-    pass
+    content_hash: Optional[str] = Field(
+        None,
+        pattern=r"^[0-9a-f]{64}$",
+        description="Hex SHA-256 of the file, if known; lets the upload be skipped when the user already has it",
+    )
+
+
+class PhotoUploadRead(BaseModel):
+    id: int = Field(..., description="ID of the pending photo")
+    upload_url: str = Field(..., description="Presigned URL to upload the photo to")
+    method: str = Field("PUT", description="HTTP method to use with upload_url")
+    headers: dict[str, str] = Field(
+        ..., description="Headers that must be sent along with the upload"
+    )
+    expires_in: int = Field(..., description="Seconds until upload_url expires")
+
+
+class PhotoBatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the file in the request")
+    filename: str = Field(..., description="The original filename of the photo")
+    id: Optional[int] = Field(None, description="ID of the created photo")
+    duplicate: bool = Field(
+        False, description="Whether id is a photo the user already had"
+    )
+    error: Optional[str] = Field(None, description="Why the photo was not created")
+
+
+class PhotoBatchCreateResponse(BaseModel):
+    created: int = Field(..., description="Number of photos created")
+    duplicates: int = Field(
+        0, description="Number of files the user already had, matched by content"
+    )
+    failed: int = Field(..., description="Number of photos that could not be created")
+    results: list[PhotoBatchItemResult] = Field(
+        ..., description="Outcome of every file, in request order"
+    )
+
+
+class PhotoBulkOutcome(str, Enum):
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+
+
+class PhotoBulkItemResult(BaseModel):
+    id: int = Field(..., description="Photo ID")
+    outcome: PhotoBulkOutcome = Field(
+        ...,
+        description="changed, unchanged (already in the requested state), not_found or forbidden (owned by another user)",
+    )
+
+
+class PhotoBulkResponse(BaseModel):
+    changed: int = Field(..., description="Number of photos changed")
+    failed: int = Field(
+        ..., description="Number of ids not found or not owned by the user"
+    )
+    results: list[PhotoBulkItemResult] = Field(
+        ..., description="Outcome of every distinct id, in request order"
+    )
+
+
+class PhotoStreamCreate(BaseModel):
+    # the object is uploaded before the row is written, so whatever the row
+    # cannot hold must be refused up front
+    filename: str = Field(
+        ..., max_length=128, description="The original filename of the photo"
+    )
+    date_taken: datetime = Field(
+        ..., description="The date and time the photo was taken"
+    )
+    is_public: bool = Field(..., description="Whether the photo is publicly visible")
+    content_hash: Optional[str] = Field(
+        None,
+        pattern=r"^[0-9a-f]{64}$",
+        description="Hex SHA-256 of the file, if known; lets the upload be skipped when the user already has it",
+    )
 
 
 class UserPhotosResponse(BaseModel):
     photos: list[PhotoRead] = Field(
         ..., description="List of photos in the current page"
     )
-    total: int = Field(..., description="Total number of photos available")
+    total: Optional[int] = Field(
+        ...,
+        description="Total number of photos available; approximate for total_mode=estimate and null for total_mode=none",
+    )
     skip: int = Field(..., description="Offset used for pagination")
     limit: int = Field(..., description="Number of photos per page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, null when there are no more"
+    )
+
+
+class UserPhotoStatsRead(BaseModel):
+    live_count: int = Field(..., description="Number of photos not marked as deleted")
+    deleted_count: int = Field(..., description="Number of photos marked as deleted")
+    total_bytes: int = Field(..., description="Storage used by all the user's photos")
 
 
 class PhotoResponse(BaseModel):
@@ -48,3 +145,11 @@ class PhotoDeleteSoft(BaseModel):
     deleting: bool = Field(
         ..., description="Wether the photo is going to be marked as is_deleted or not"
     )
+
+
+class PhotoBulkDelete(BaseModel):
+    ids: list[int] = Field(..., min_length=1, description="Photo IDs")
+
+
+class PhotoBulkDeleteSoft(PhotoBulkDelete, PhotoDeleteSoft):
+    pass
@@ -0,0 +1,40 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.repositories.photo_repository import PhotoRepository
+from app.services.periodic_task import PeriodicTask
+
+logger = settings.logger
+
+
+class DeletedPhotoPurger(PeriodicTask):
+    """Permanently removes photos that stayed soft-deleted past the retention window"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        retention: int = settings.deleted_photo_retention,
+        batch_size: int = 500,
+    ):
+        super().__init__()
+        self._session_factory = session_factory
+        self._retention = retention
+        self._batch_size = batch_size
+
+    async def run_once(self) -> int:
+        """Purges in batches, each in its own short transaction, returns how many"""
+        purged = 0
+        while True:
+            async with self._session_factory() as session:
+                repo = PhotoRepository(session=session)
+                # their objects are queued for the S3 deletion collector
+                removed = await repo.purge_deleted_photos(
+                    retention=self._retention, limit=self._batch_size
+                )
+                await session.commit()
+            purged += removed
+
+            if removed < self._batch_size:
+                if purged:
+                    logger.info(f"Purged {purged} expired deleted photo(s)")
+                return purged
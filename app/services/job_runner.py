@@ -0,0 +1,200 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.clients.s3_client import AwsS3Client
+from app.clients.s3_pool import S3ClientPool
+from app.config import settings
+from app.db import async_session
+from app.models.job import Job, JobKind
+from app.repositories.job_repository import JobRepository
+from app.services.rendition_generator import RenditionGenerator
+
+logger = settings.logger
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+
+class JobRunner:
+    """Runs queued jobs from the job table with bounded concurrency.
+
+    Jobs are claimed with FOR UPDATE SKIP LOCKED, so any number of runners
+    (in the API or in ``python -m app.worker``) can share the queue. Failed
+    jobs are retried with exponential backoff until they run out of attempts.
+    While a handler runs its claim is extended every third of the visibility
+    timeout, so a slow job is not handed to a second runner; the outcome of a
+    job whose claim was lost anyway is dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        handlers: dict[str, JobHandler],
+        concurrency: int = settings.job_worker_concurrency,
+        poll_interval: float = settings.job_poll_interval,
+        visibility_timeout: int = settings.job_visibility_timeout,
+        retry_backoff: float = settings.job_retry_backoff,
+        retry_backoff_max: float = settings.job_retry_backoff_max,
+    ):
+        self._session_factory = session_factory
+        self._handlers = handlers
+        self._concurrency = concurrency
+        self._poll_interval = poll_interval
+        self._visibility_timeout = visibility_timeout
+        self._retry_backoff = retry_backoff
+        self._retry_backoff_max = retry_backoff_max
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+
+    async def _claim(self, limit: int) -> list[Job]:
+        async with self._session_factory() as session:
+            repo = JobRepository(session=session)
+            jobs = await repo.claim(
+                list(self._handlers), limit, self._visibility_timeout
+            )
+            await session.commit()
+        return jobs
+
+    async def _finish(self, job: Job, error: Exception | None) -> None:
+        async with self._session_factory() as session:
+            repo = JobRepository(session=session)
+            if error is None:
+                await repo.complete(job.id, job.attempts)
+            elif job.attempts >= job.max_attempts:
+                logger.error(f"Job {job.id} ({job.kind}) failed for good: {error}")
+                await repo.fail(job.id, job.attempts, repr(error))
+            else:
+                delay = min(
+                    self._retry_backoff * 2 ** (job.attempts - 1),
+                    self._retry_backoff_max,
+                )
+                await repo.retry(job.id, job.attempts, repr(error), delay)
+            await session.commit()
+
+    async def _heartbeat(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(self._visibility_timeout / 3)
+            try:
+                async with self._session_factory() as session:
+                    held = await JobRepository(session=session).extend(
+                        job.id, job.attempts, self._visibility_timeout
+                    )
+                    await session.commit()
+            except Exception as e:
+                # the claim still has time left, the next beat tries again
+                logger.error(f"Unable to extend the claim of job {job.id}: {e}")
+                continue
+            if not held:
+                logger.warning(
+                    f"Job {job.id} ({job.kind}) was claimed by another runner"
+                )
+                return
+
+    async def _process(self, job: Job) -> None:
+        error = None
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await self._handlers[job.kind](job.payload)
+        except Exception as e:
+            logger.error(
+                f"Job {job.id} ({job.kind}) attempt {job.attempts} failed: {e} ({type(e)})"
+            )
+            error = e
+        finally:
+            heartbeat.cancel()
+
+        try:
+            await self._finish(job, error)
+        except Exception as e:
+            # the job is claimed again once its visibility timeout expires
+            logger.error(f"Unable to record the outcome of job {job.id}: {e}")
+
+    def _start(self, job: Job) -> None:
+        task = asyncio.create_task(self._process(job))
+        self._tasks.add(task)
+
+        def done(task: asyncio.Task) -> None:
+            self._tasks.discard(task)
+            self._wakeup.set()
+
+        task.add_done_callback(done)
+
+    async def run_once(self) -> int:
+        """Claims as many jobs as there are free slots and starts them, returns how many"""
+        free = self._concurrency - len(self._tasks)
+        if free <= 0 or not self._handlers:
+            return 0
+
+        jobs = await self._claim(free)
+        for job in jobs:
+            self._start(job)
+        return len(jobs)
+
+    async def run(self) -> None:
+        """Runs jobs until `stop` is called, then waits for the running ones"""
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Unable to claim jobs: {e} ({type(e)})")
+            # wakes up when a slot frees, on stop, or to poll for new jobs
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+
+
+@asynccontextmanager
+async def job_runner(
+    s3_pool: S3ClientPool, concurrency: int
+) -> AsyncIterator[JobRunner]:
+    """A JobRunner wired with every job handler, releasing their resources on exit"""
+    handlers: dict[str, JobHandler] = {}
+    rendition_executor = None
+
+    if settings.rendition_workers > 0:
+        s3_client = AwsS3Client(s3_pool, settings.bucket_name)
+
+        def start_renditions() -> tuple[ProcessPoolExecutor, RenditionGenerator]:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            executor = ProcessPoolExecutor(
+                settings.rendition_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            return executor, RenditionGenerator(async_session, s3_client, executor)
+
+        rendition_executor, generator = start_renditions()
+
+        async def render_renditions(payload: dict) -> None:
+            nonlocal rendition_executor, generator
+            executor = rendition_executor
+            try:
+                await generator.generate(payload["photo_id"], payload["s3_key"])
+            except BrokenProcessPool:
+                # a rendering process died (e.g. killed while decoding) and the
+                # pool fails every later job; the first job to notice replaces it
+                if rendition_executor is executor:
+                    executor.shutdown(wait=False)
+                    rendition_executor, generator = start_renditions()
+                raise
+
+        handlers[JobKind.RENDER_RENDITIONS.value] = render_renditions
+
+    try:
+        yield JobRunner(async_session, handlers, concurrency=concurrency)
+    finally:
+        if rendition_executor:
+            rendition_executor.shutdown()
@@ -0,0 +1,40 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.repositories.photo_repository import PhotoRepository
+from app.services.periodic_task import PeriodicTask
+
+logger = settings.logger
+
+
+class PendingUploadSweeper(PeriodicTask):
+    """Removes direct uploads that were started but never completed"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        ttl: int = settings.pending_upload_ttl,
+        batch_size: int = 500,
+    ):
+        super().__init__()
+        self._session_factory = session_factory
+        self._ttl = ttl
+        self._batch_size = batch_size
+
+    async def run_once(self) -> int:
+        """Sweeps every stale pending upload in batches, returns how many were removed"""
+        swept = 0
+        while True:
+            async with self._session_factory() as session:
+                repo = PhotoRepository(session=session)
+                # their objects are queued for the S3 deletion collector
+                removed = await repo.delete_stale_pending_photos(
+                    ttl=self._ttl, limit=self._batch_size
+                )
+                await session.commit()
+            swept += removed
+
+            if removed < self._batch_size:
+                if swept:
+                    logger.info(f"Swept {swept} abandoned pending upload(s)")
+                return swept
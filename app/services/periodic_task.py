@@ -0,0 +1,35 @@
+import asyncio
+from abc import ABC, abstractmethod
+
+from app.config import settings
+
+logger = settings.logger
+
+
+class PeriodicTask(ABC):
+    """Upkeep work the lifespan runs every few minutes, also runnable once from app.cli"""
+
+    def __init__(self):
+        self._stopping = asyncio.Event()
+
+    @abstractmethod
+    async def run_once(self) -> int:
+        """Does one full pass and returns how many items it handled"""
+        pass
+
+    async def run(self, interval: float) -> None:
+        """Runs a pass every `interval` seconds until `stop` is called"""
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"{type(self).__name__} failed: {e} ({type(e)})")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        # cancelling mid-query would surface as a database error, so let the
+        # current pass finish and exit on the next check instead
+        self._stopping.set()
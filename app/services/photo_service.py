@@ -1,9 +1,37 @@
+import hashlib
+from collections import defaultdict
+from typing import AsyncIterator
 from fastapi import UploadFile
 from app.clients.s3_client import AwsS3ClientInterface
-from app.exceptions import ForbiddenError, PhotoNotFound
-from app.models.photo import Photo
-from app.repositories.photo_repository import PhotoRepositoryInterface
-from app.schemas.photo import PhotoCreate, PhotoRead, UserPhotosResponse
+from app.config import settings
+from app.exceptions import (
+    BadRequestError,
+    EmptyUpload,
+    PhotoNotFound,
+    PhotoNotOwned,
+    UploadFailed,
+    UploadNotVerified,
+    UploadTooLarge,
+)
+from app.hashing import HashingReader, hash_chunks
+from app.models.job import JobKind
+from app.models.photo import MAX_PHOTO_SIZE, Photo
+from app.pagination import TotalMode, decode_cursor, encode_cursor
+from app.repositories.job_repository import JobRepositoryInterface
+from app.repositories.photo_repository import PhotoRecord, PhotoRepositoryInterface
+from app.s3_keys import build_photo_key
+from app.schemas.photo import (
+    PhotoBatchCreateResponse,
+    PhotoBulkItemResult,
+    PhotoBulkOutcome,
+    PhotoBulkResponse,
+    PhotoBatchItemResult,
+    PhotoCreate,
+    PhotoRead,
+    PhotoStreamCreate,
+    PhotoUploadRead,
+    UserPhotoStatsRead,
+)
 
 
 class PhotoService:
@@ -11,11 +39,13 @@ class PhotoService:
         self,
         photo_repository: PhotoRepositoryInterface,
         s3_client: AwsS3ClientInterface,
+        job_repository: JobRepositoryInterface | None = None,
     ):
         self.photo_repository = photo_repository
         self.s3_client = s3_client
+        self.job_repository = job_repository
 
-    async def _get_photo_model_by_id(self, id: int) -> Photo:
+    async def _get_photo_record_by_id(self, id: int) -> PhotoRecord:
         photo = await self.photo_repository.get_photo_by_id(id)
 
         if not photo:
@@ -23,81 +53,470 @@ class PhotoService:
 
         return photo
 
-    async def _get_deleted_photo_model_by_id(self, id: int) -> Photo:
-        photo = await self.photo_repository.get_deleted_photo_by_id(id)
-
-        if not photo:
-            raise PhotoNotFound()
-
-        return photo
-
     async def _check_user_photo(self, photo_id: int, user_id: int) -> None:
         user_photo = await self.photo_repository.get_user_photo_relation(
             photo_id, user_id
         )
         if not user_photo:
-            raise ForbiddenError(
-                detail="The requested photo does not belongs to the user"
+            raise PhotoNotOwned()
+
+    async def _enqueue_renditions(self, photos: list[tuple[int, str]]) -> None:
+        # queued in the request's transaction: the jobs exist iff the photos do
+        if not self.job_repository or settings.rendition_workers <= 0:
+            return
+
+        await self.job_repository.enqueue(
+            JobKind.RENDER_RENDITIONS.value,
+            [
+                {"photo_id": photo_id, "s3_key": s3_key}
+                for photo_id, s3_key in photos
+                if s3_key
+            ],
+        )
+
+    async def _restore_duplicates(self, user_id: int, photos: list[Photo]) -> None:
+        # uploading a deleted photo again brings it back
+        for photo in photos:
+            if photo.is_deleted:
+                await self.photo_repository.soft_delete_toggle(
+                    id=photo.id, deleting=False, user_id=user_id
+                )
+
+    async def _store_photos(
+        self, user_id: int, photos: list[Photo]
+    ) -> list[tuple[int, bool]]:
+        """Creates just uploaded (and hashed) photos, returns (id, duplicate) for each one.
+
+        Content the user already has, or that repeats within photos, resolves to
+        the existing photo; content some other user uploaded before is pointed at
+        that object. Either way the object just uploaded is queued for deletion.
+        """
+        content_hashes = list({photo.content_hash for photo in photos})
+        existing = await self.photo_repository.get_user_photos_by_hashes(
+            user_id, content_hashes
+        )
+        shared = {}
+        if settings.share_identical_uploads:
+            shared = await self.photo_repository.get_s3_keys_by_hashes(
+                [
+                    content_hash
+                    for content_hash in content_hashes
+                    if content_hash not in existing
+                ]
+            )
+
+        new: dict[str, Photo] = {}
+        redundant_keys = []
+        for photo in photos:
+            content_hash = photo.content_hash
+            if content_hash in existing or content_hash in new:
+                redundant_keys.append(photo.s3_key)
+                continue
+            if shared.get(content_hash, photo.s3_key) != photo.s3_key:
+                redundant_keys.append(photo.s3_key)
+                photo.s3_key = shared[content_hash]
+            new[content_hash] = photo
+
+        stored = await self.photo_repository.bulk_create_photos(
+            photos=list(new.values()), user_id=user_id
+        )
+        created = {}
+        raced = set()
+        renditions = []
+        for (content_hash, photo), (photo_id, is_new) in zip(new.items(), stored):
+            created[content_hash] = photo_id
+            if is_new:
+                renditions.append((photo_id, photo.s3_key))
+            else:
+                # a concurrent upload of the same content linked it first
+                raced.add(content_hash)
+                redundant_keys.append(photo.s3_key)
+        await self._restore_duplicates(user_id, list(existing.values()))
+        # the deletion collector keeps any key a photo still points at
+        await self.photo_repository.enqueue_s3_deletion(redundant_keys)
+        await self._enqueue_renditions(renditions)
+
+        return [
+            (
+                (existing[photo.content_hash].id, True)
+                if photo.content_hash in existing
+                else (
+                    created[photo.content_hash],
+                    new[photo.content_hash] is not photo or photo.content_hash in raced,
+                )
+            )
+            for photo in photos
+        ]
+
+    async def _get_declared_duplicates(
+        self, user_id: int, content_hashes: list[str | None]
+    ) -> dict[str, Photo]:
+        """Photos the user already has for client declared hashes, their uploads can be skipped"""
+        duplicates = await self.photo_repository.get_user_photos_by_hashes(
+            user_id, [content_hash for content_hash in content_hashes if content_hash]
+        )
+        await self._restore_duplicates(user_id, list(duplicates.values()))
+        return duplicates
+
+    async def _sign_photos(
+        self, photos: list[PhotoRecord], renditions: list[str] | None = None
+    ) -> tuple[list[str], dict[int, dict[str, str]]]:
+        """Signs the originals and the requested renditions (all when None) in one batch.
+
+        Returns the url of every photo, in order, and their rendition urls by photo id.
+        """
+        rendition_rows = await self.photo_repository.get_photo_renditions(
+            [photo.id for photo in photos], names=renditions
+        )
+        keys = [photo.s3_key for photo in photos]
+        keys += [rendition.s3_key for rendition in rendition_rows]
+        urls = await self.s3_client.bulk_get_file_presigned_url(keys)
+
+        # leverages asyncio.gather order preservation to assign urls
+        rendition_urls = defaultdict(dict)
+        for (photo_id, name, _), url in zip(rendition_rows, urls[len(photos) :]):
+            rendition_urls[photo_id][name] = url
+
+        return urls[: len(photos)], rendition_urls
+
+    async def _to_photo_reads(
+        self, photos: list[PhotoRecord], renditions: list[str] | None = None
+    ) -> list[PhotoRead]:
+        urls, rendition_urls = await self._sign_photos(photos, renditions)
+        return [
+            PhotoRead(
+                **photo._asdict(), url=url, renditions=rendition_urls.get(photo.id, {})
             )
+            for photo, url in zip(photos, urls)
+        ]
 
     async def create_photo(
         self, photo: PhotoCreate, user_id: int, file: UploadFile
     ) -> None:
         # TODO: add user validation later
-        path = "mocked/path"  # TODO: define path, probably use user identifier as main folder
-        s3_key = await self.s3_client.upload_file(path, file)
-        photo_model = Photo(**photo.model_dump(), s3_key=s3_key)
+        if await self._get_declared_duplicates(user_id, [photo.content_hash]):
+            return
 
-        return await self.photo_repository.create_photo(
-            photo=photo_model, user_id=user_id
+        reader = HashingReader(file.file)
+        s3_key = await self.s3_client.upload_file(
+            build_photo_key(user_id, photo.filename),
+            UploadFile(reader, filename=file.filename, headers=file.headers),
+        )
+        if not s3_key:
+            raise UploadFailed()
+        photo_model = Photo(
+            **photo.model_dump(exclude={"content_hash"}),
+            s3_key=s3_key,
+            content_hash=reader.hexdigest(),
         )
 
-    async def get_photo_by_id(self, id: int) -> PhotoRead:
-        photo = await self._get_photo_model_by_id(id)
-        url = await self.s3_client.get_file_presigned_url(photo.s3_key)
-        photo_obj = {"url": url, **photo.__dict__}
-        return PhotoRead.model_validate(
-            photo_obj,
-            from_attributes=True,
+        await self._store_photos(user_id, [photo_model])
+
+    async def create_photo_batch(
+        self, photos: list[PhotoCreate], user_id: int, files: list[UploadFile]
+    ) -> PhotoBatchCreateResponse:
+        # TODO: add user validation later
+        if len(photos) != len(files):
+            raise BadRequestError(
+                detail=f"Got {len(files)} files but metadata for {len(photos)}"
+            )
+        if len(files) > settings.photo_batch_max_files:
+            raise BadRequestError(
+                detail=f"At most {settings.photo_batch_max_files} files can be uploaded at once"
+            )
+
+        declared = await self._get_declared_duplicates(
+            user_id, [photo.content_hash for photo in photos]
+        )
+        to_upload = [
+            i for i, photo in enumerate(photos) if photo.content_hash not in declared
+        ]
+        readers = [HashingReader(files[i].file) for i in to_upload]
+
+        s3_keys = await self.s3_client.bulk_upload_file(
+            [build_photo_key(user_id, photos[i].filename) for i in to_upload],
+            [
+                UploadFile(reader, filename=files[i].filename, headers=files[i].headers)
+                for i, reader in zip(to_upload, readers)
+            ],
+        )
+        # failed uploads come back as "" and are left out
+        uploaded = {
+            i: Photo(
+                **photos[i].model_dump(exclude={"content_hash"}),
+                s3_key=s3_key,
+                content_hash=reader.hexdigest(),
+            )
+            for i, reader, s3_key in zip(to_upload, readers, s3_keys)
+            if s3_key
+        }
+        stored = await self._store_photos(user_id, list(uploaded.values()))
+        stored = dict(zip(uploaded, stored))
+
+        results = []
+        for i, photo in enumerate(photos):
+            if photo.content_hash in declared:
+                photo_id, duplicate = declared[photo.content_hash].id, True
+            else:
+                photo_id, duplicate = stored.get(i, (None, False))
+            results.append(
+                PhotoBatchItemResult(
+                    index=i,
+                    filename=photo.filename,
+                    id=photo_id,
+                    duplicate=duplicate,
+                    error=None if photo_id else "Unable to upload the file",
+                )
+            )
+
+        duplicates = sum(1 for result in results if result.duplicate)
+        failed = sum(1 for result in results if result.id is None)
+        return PhotoBatchCreateResponse(
+            created=len(results) - duplicates - failed,
+            duplicates=duplicates,
+            failed=failed,
+            results=results,
+        )
+
+    async def create_photo_stream(
+        self,
+        photo: PhotoStreamCreate,
+        user_id: int,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+    ) -> None:
+        # TODO: add user validation later
+        if await self._get_declared_duplicates(user_id, [photo.content_hash]):
+            return
+
+        # checked while streaming: the row is only written once the object is
+        # in S3, and photo.size is a 32-bit integer
+        max_size = min(settings.photo_stream_max_size, MAX_PHOTO_SIZE)
+
+        async def checked(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+            received = 0
+            async for chunk in chunks:
+                received += len(chunk)
+                if received > max_size:
+                    raise UploadTooLarge(max_size)
+                yield chunk
+            if not received:
+                raise EmptyUpload()
+
+        digest = hashlib.sha256()
+        s3_key = build_photo_key(user_id, photo.filename)
+        size = await self.s3_client.upload_stream(
+            s3_key,
+            hash_chunks(checked(chunks), digest),
+            content_type=content_type,
+        )
+        photo_model = Photo(
+            **photo.model_dump(exclude={"content_hash"}),
+            content_type=content_type,
+            size=size,
+            s3_key=s3_key,
+            content_hash=digest.hexdigest(),
+        )
+
+        await self._store_photos(user_id, [photo_model])
+
+    async def create_upload(self, photo: PhotoCreate, user_id: int) -> PhotoUploadRead:
+        # TODO: add user validation later
+        expiration = settings.pending_upload_url_expiration
+        s3_key = build_photo_key(user_id, photo.filename)
+        url = await self.s3_client.get_upload_presigned_url(
+            s3_key, photo.content_type, expiration
+        )
+        # a declared hash is not verified for direct uploads, so it is not kept
+        photo_model = Photo(
+            **photo.model_dump(exclude={"content_hash"}), s3_key=s3_key, is_pending=True
+        )
+        await self.photo_repository.create_photo(photo=photo_model, user_id=user_id)
+
+        return PhotoUploadRead(
+            id=photo_model.id,
+            upload_url=url,
+            headers={"Content-Type": photo.content_type},
+            expires_in=expiration,
         )
 
+    async def complete_upload(self, id: int, user_id: int) -> None:
+        photo = await self.photo_repository.get_pending_photo_by_id(id)
+        if not photo:
+            raise PhotoNotFound()
+
+        await self._check_user_photo(id, user_id)
+
+        head = await self.s3_client.head_file(photo.s3_key)
+        if head is None:
+            raise UploadNotVerified(detail="The photo has not been uploaded yet")
+        if head["ContentLength"] != photo.size:
+            raise UploadNotVerified(
+                detail=f"Uploaded size {head['ContentLength']} does not match the declared size {photo.size}"
+            )
+        if head.get("ContentType") != photo.content_type:
+            raise UploadNotVerified(
+                detail=f"Uploaded content type {head.get('ContentType')} does not match {photo.content_type}"
+            )
+
+        # the sweeper may have removed it while the object was checked
+        if not await self.photo_repository.complete_pending_photo(id):
+            raise PhotoNotFound()
+        await self._enqueue_renditions([(id, photo.s3_key)])
+
+    async def get_photo_by_id(self, id: int) -> PhotoRead:
+        photo = await self._get_photo_record_by_id(id)
+        photos_schema = await self._to_photo_reads([photo])
+        return photos_schema[0]
+
     async def get_user_photos(
-        self, user_id: int, skip: int = 0, limit: int = 10
-    ) -> UserPhotosResponse:
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+        renditions: list[str] | None = None,
+    ) -> dict:
         # TODO: add user validation later
+        position = decode_cursor(cursor) if cursor else None
+        if position:
+            skip = 0
+
+        # one extra row tells whether there is a next page
         photos, total = await self.photo_repository.get_user_photos(
-            user_id=user_id, skip=skip, limit=limit
+            user_id=user_id,
+            skip=skip,
+            limit=limit + 1,
+            cursor=position,
+            total_mode=total_mode,
         )
+        has_more = len(photos) > limit
+        photos = photos[:limit]
 
         if not photos:
             raise PhotoNotFound(
                 extra_details=f"No photos were found for user {user_id}"
             )
 
-        photos_schema = []
-        keys = [photo.s3_key for photo in photos]
-        urls = await self.s3_client.bulk_get_file_presigned_url(keys)
+        # grids only need the thumbnails, signing every size would be wasted work
+        urls, rendition_urls = await self._sign_photos(
+            photos,
+            settings.listing_renditions if renditions is None else renditions,
+        )
 
-        # leverages asyncio.gather order preservation to assign urls
-        for i, photo in enumerate(photos):
-            photo_obj = {"url": urls[i], **photo.__dict__}
-            photo_read = PhotoRead.model_validate(photo_obj, from_attributes=True)
-            photos_schema.append(photo_read)
+        last = photos[-1]
+        next_cursor = encode_cursor(last.date_taken, last.id) if has_more else None
 
-        return UserPhotosResponse(
-            photos=photos_schema, total=total, skip=skip, limit=limit
-        )
+        # built straight from the rows in one pass; the route renders this
+        # without validating it again (see UserPhotosResponse for the shape)
+        return {
+            "photos": [
+                {
+                    "filename": photo.filename,
+                    "content_type": photo.content_type,
+                    "size": photo.size,
+                    "date_taken": photo.date_taken,
+                    "is_public": photo.is_public,
+                    "url": url,
+                    "renditions": rendition_urls.get(photo.id, {}),
+                    "content_hash": photo.content_hash,
+                }
+                for photo, url in zip(photos, urls)
+            ],
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
 
-    async def soft_delete_toggle(self, id: int, deleting: bool, user_id: int) -> None:
-        photo = await self._get_deleted_photo_model_by_id(id)
+    async def get_user_photo_stats(self, user_id: int) -> UserPhotoStatsRead:
+        stats = await self.photo_repository.get_user_photo_stats(user_id)
+        if not stats:
+            return UserPhotoStatsRead(live_count=0, deleted_count=0, total_bytes=0)
 
-        if photo.is_deleted == deleting:
-            return
+        return UserPhotoStatsRead.model_validate(stats, from_attributes=True)
 
-        await self._check_user_photo(id, user_id)
-        await self.photo_repository.soft_delete_toggle(id=id, deleting=deleting)
+    async def soft_delete_toggle(self, id: int, deleting: bool, user_id: int) -> None:
+        photo = await self.photo_repository.soft_delete_toggle(
+            id=id, deleting=deleting, user_id=user_id
+        )
+
+        if not photo:
+            raise PhotoNotFound()
+        # a photo already in the requested state is left as is, whoever asks
+        if not photo.owned and photo.is_deleted != deleting:
+            raise PhotoNotOwned()
 
     async def hard_delete_photo(self, id: int, user_id: int) -> None:
-        await self._get_deleted_photo_model_by_id(id)
-        await self._check_user_photo(id, user_id)
-        await self.photo_repository.hard_delete_photo(id)
+        photo = await self.photo_repository.hard_delete_photo(id=id, user_id=user_id)
+
+        if not photo:
+            raise PhotoNotFound()
+        if not photo.owned:
+            raise PhotoNotOwned()
+
+    def _check_bulk_ids(self, ids: list[int]) -> None:
+        if len(ids) > settings.photo_bulk_max_ids:
+            raise BadRequestError(
+                detail=f"At most {settings.photo_bulk_max_ids} photos can be changed at once"
+            )
+
+    def _to_bulk_response(
+        self, ids: list[int], outcomes: dict[int, PhotoBulkOutcome]
+    ) -> PhotoBulkResponse:
+        results = [
+            PhotoBulkItemResult(
+                id=id, outcome=outcomes.get(id, PhotoBulkOutcome.NOT_FOUND)
+            )
+            for id in ids
+        ]
+        return PhotoBulkResponse(
+            changed=sum(r.outcome == PhotoBulkOutcome.CHANGED for r in results),
+            failed=sum(
+                r.outcome in (PhotoBulkOutcome.NOT_FOUND, PhotoBulkOutcome.FORBIDDEN)
+                for r in results
+            ),
+            results=results,
+        )
+
+    async def bulk_soft_delete_toggle(
+        self, ids: list[int], deleting: bool, user_id: int
+    ) -> PhotoBulkResponse:
+        # repeated ids are reported once
+        ids = list(dict.fromkeys(ids))
+        self._check_bulk_ids(ids)
+        photos = await self.photo_repository.bulk_soft_delete_toggle(
+            ids=ids, deleting=deleting, user_id=user_id
+        )
+
+        # same rules as soft_delete_toggle, reported per id instead of raised
+        outcomes = {
+            id: (
+                PhotoBulkOutcome.UNCHANGED
+                if photo.is_deleted == deleting
+                else (
+                    PhotoBulkOutcome.CHANGED
+                    if photo.owned
+                    else PhotoBulkOutcome.FORBIDDEN
+                )
+            )
+            for id, photo in photos.items()
+        }
+        return self._to_bulk_response(ids, outcomes)
+
+    async def bulk_hard_delete_photos(
+        self, ids: list[int], user_id: int
+    ) -> PhotoBulkResponse:
+        # repeated ids are reported once
+        ids = list(dict.fromkeys(ids))
+        self._check_bulk_ids(ids)
+        photos = await self.photo_repository.bulk_hard_delete_photos(
+            ids=ids, user_id=user_id
+        )
+
+        outcomes = {
+            id: PhotoBulkOutcome.CHANGED if photo.owned else PhotoBulkOutcome.FORBIDDEN
+            for id, photo in photos.items()
+        }
+        return self._to_bulk_response(ids, outcomes)
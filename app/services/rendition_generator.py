@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import Executor
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.clients.s3_client import AwsS3ClientInterface
+from app.config import settings
+from app.models.photo_rendition import PhotoRendition
+from app.renditions import CONTENT_TYPES, render_renditions, rendition_key
+from app.repositories.photo_repository import PhotoRepository
+
+logger = settings.logger
+
+
+class RenditionGenerator:
+    """Renders the configured renditions of photos off the event loop and stores them.
+
+    Runs as the render_renditions job, see app.services.job_runner.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        s3_client: AwsS3ClientInterface,
+        executor: Executor,
+        sizes: dict[str, int] = settings.rendition_sizes,
+        image_format: str = settings.rendition_format,
+        quality: int = settings.rendition_quality,
+    ):
+        if image_format not in CONTENT_TYPES:
+            raise ValueError(f"Unsupported rendition format: {image_format}")
+
+        self._session_factory = session_factory
+        self._s3_client = s3_client
+        self._executor = executor
+        self._sizes = sizes
+        self._format = image_format
+        self._quality = quality
+
+    async def generate(self, photo_id: int, s3_key: str) -> int:
+        """Renders and stores every rendition of a photo, returns how many were stored"""
+        async with self._session_factory() as session:
+            repo = PhotoRepository(session=session)
+            if not await repo.get_deleted_photo_by_id(photo_id):
+                # hard deleted since the job was queued, nothing to render
+                return 0
+
+        data = await self._s3_client.get_file(s3_key)
+        loop = asyncio.get_running_loop()
+        rendered = await loop.run_in_executor(
+            self._executor,
+            render_renditions,
+            data,
+            self._sizes,
+            self._format,
+            self._quality,
+        )
+
+        content_type = CONTENT_TYPES[self._format]
+        renditions = [
+            PhotoRendition(
+                photo_id=photo_id,
+                name=image.name,
+                s3_key=rendition_key(s3_key, image.name, self._format),
+                content_type=content_type,
+                width=image.width,
+                height=image.height,
+                size=len(image.body),
+            )
+            for image in rendered
+        ]
+        await asyncio.gather(
+            *(
+                self._s3_client.put_file(rendition.s3_key, image.body, content_type)
+                for rendition, image in zip(renditions, rendered)
+            )
+        )
+
+        async with self._session_factory() as session:
+            repo = PhotoRepository(session=session)
+            await repo.upsert_photo_renditions(renditions)
+            await session.commit()
+
+        return len(renditions)
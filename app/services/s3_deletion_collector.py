@@ -0,0 +1,71 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.clients.s3_client import AwsS3ClientInterface
+from app.config import settings
+from app.repositories.s3_deletion_repository import S3DeletionRepository
+from app.services.periodic_task import PeriodicTask
+
+logger = settings.logger
+
+
+class S3DeletionCollector(PeriodicTask):
+    """Deletes the queued S3 objects of deleted photos in DeleteObjects batches"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        s3_client: AwsS3ClientInterface,
+        batch_size: int = 1000,
+        lease: int = settings.s3_deletion_lease,
+    ):
+        super().__init__()
+        self._session_factory = session_factory
+        self._s3_client = s3_client
+        # DeleteObjects accepts at most 1000 keys
+        self._batch_size = min(batch_size, 1000)
+        self._lease = lease
+
+    async def run_once(self) -> int:
+        """Drains the queue, returns how many objects were deleted"""
+        deleted = 0
+        while True:
+            # the claim is committed before calling S3, no lock is held while
+            # waiting on it; the lease keeps other collectors off the keys
+            async with self._session_factory() as session:
+                repo = S3DeletionRepository(session=session)
+                queued = await repo.claim(self._batch_size, self._lease)
+                if not queued:
+                    break
+
+                # a key can be shared, only delete what nothing points to
+                # anymore; the locks wait for uploads that are sharing one of
+                # them to commit, and keep new ones off until this commits
+                keys = [item.s3_key for item in queued]
+                await repo.lock_keys(keys)
+                referenced = await repo.get_referenced_keys(keys)
+                await repo.remove(
+                    [item.id for item in queued if item.s3_key in referenced]
+                )
+                await session.commit()
+
+            keys = [item.s3_key for item in queued if item.s3_key not in referenced]
+            failed = set(await self._s3_client.bulk_delete_file(keys))
+
+            async with self._session_factory() as session:
+                await S3DeletionRepository(session=session).remove(
+                    [
+                        item.id
+                        for item in queued
+                        if item.s3_key not in referenced and item.s3_key not in failed
+                    ]
+                )
+                await session.commit()
+
+            deleted += len(keys) - len(failed)
+            # failed keys stay claimed, they are retried once the lease expires
+            if failed or len(queued) < self._batch_size:
+                break
+
+        if deleted:
+            logger.info(f"Deleted {deleted} S3 object(s) of deleted photos")
+        return deleted
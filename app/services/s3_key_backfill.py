@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.clients.s3_client import AwsS3ClientInterface
+from app.config import settings
+from app.repositories.cached_photo_repository import CachedPhotoRepository
+from app.repositories.photo_cache import PhotoCache
+from app.repositories.photo_repository import (
+    PhotoRepository,
+    PhotoRepositoryInterface,
+)
+from app.s3_keys import build_photo_key
+
+logger = settings.logger
+
+
+class S3KeyBackfill:
+    """Moves photos uploaded before app.s3_keys to the sharded key layout.
+
+    Each batch of keys is copied with bounded concurrency, then its photos are
+    repointed and the old objects queued for the S3 deletion collector in one
+    transaction. A failed copy leaves its photos on the old key, so the
+    backfill can simply be run again. With a photo_cache, the cached photos
+    and listings of the moved photos are invalidated.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        s3_client: AwsS3ClientInterface,
+        batch_size: int = 500,
+        concurrency: int = settings.s3_key_backfill_concurrency,
+        photo_cache: PhotoCache | None = None,
+    ):
+        self._session_factory = session_factory
+        self._s3_client = s3_client
+        self._batch_size = batch_size
+        self._concurrency = concurrency
+        self._photo_cache = photo_cache
+
+    def _repository(self, session: AsyncSession) -> PhotoRepositoryInterface:
+        repository = PhotoRepository(session=session)
+        if self._photo_cache is None:
+            return repository
+        return CachedPhotoRepository(repository, self._photo_cache, read_through=False)
+
+    async def _copy(self, legacy: list[tuple[str, int, datetime]]) -> dict[str, str]:
+        """Copies every key to a new one, returns old -> new for the copies that succeeded"""
+        slots = asyncio.Semaphore(self._concurrency)
+
+        async def copy(old_key: str, user_id: int, created_at: datetime):
+            new_key = build_photo_key(user_id, old_key, created_at)
+            async with slots:
+                try:
+                    await self._s3_client.copy_file(old_key, new_key)
+                except Exception as e:
+                    logger.error(f"Unable to copy {old_key} to {new_key}: {e}")
+                    return None
+            return old_key, new_key
+
+        copies = await asyncio.gather(*(copy(*row) for row in legacy))
+        return dict(copy for copy in copies if copy)
+
+    async def run(self) -> tuple[int, int]:
+        """Moves every legacy key, returns how many were moved and how many failed"""
+        moved = failed = 0
+        after = ""
+        while True:
+            async with self._session_factory() as session:
+                repo = self._repository(session)
+                legacy = await repo.get_legacy_s3_keys(after, self._batch_size)
+            if not legacy:
+                break
+            # failed keys keep sorting before `after` and are not retried
+            after = legacy[-1][0]
+
+            moves = await self._copy(legacy)
+            async with self._session_factory() as session:
+                repo = self._repository(session)
+                photos = await repo.move_s3_keys(moves)
+                await session.commit()
+            moved += len({photo.old_key for photo in photos})
+            failed += len(legacy) - len(moves)
+
+        return moved, failed
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.clients.s3_client import AwsS3ClientInterface
+from app.config import settings
+from app.repositories.s3_deletion_repository import S3DeletionRepository
+
+
+class S3OrphanScanner:
+    """Finds bucket objects that no photo or rendition points to.
+
+    The bucket is listed one page at a time and each page is checked against
+    the database on its own, so memory stays flat however large the bucket is.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        s3_client: AwsS3ClientInterface,
+        min_age: int = settings.s3_orphan_min_age,
+    ):
+        self._session_factory = session_factory
+        self._s3_client = s3_client
+        self._min_age = min_age
+
+    async def iter_orphans(self, prefix: str = "") -> AsyncIterator[list[str]]:
+        """Yields the orphaned keys of each listing page"""
+        # streamed uploads only get their row once the object is complete
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self._min_age)
+
+        async for page in self._s3_client.iter_file_pages(prefix):
+            keys = [item["Key"] for item in page if item["LastModified"] < cutoff]
+            if not keys:
+                continue
+
+            async with self._session_factory() as session:
+                repo = S3DeletionRepository(session=session)
+                referenced = await repo.get_referenced_keys(keys)
+
+            orphans = [key for key in keys if key not in referenced]
+            if orphans:
+                yield orphans
+
+    async def enqueue_orphans(self, prefix: str = "") -> int:
+        """Queues every orphan for the S3 deletion collector, returns how many"""
+        queued = 0
+        async for orphans in self.iter_orphans(prefix):
+            async with self._session_factory() as session:
+                await S3DeletionRepository(session=session).enqueue(orphans)
+                await session.commit()
+            queued += len(orphans)
+        return queued
@@ -0,0 +1,42 @@
+"""Background job worker, run with ``python -m app.worker``
+
+The API runs the same jobs in-process unless JOB_WORKER_CONCURRENCY is 0;
+a separate worker lets that work scale independently of the web processes.
+"""
+
+import argparse
+import asyncio
+import signal
+
+from app.clients.s3_pool import S3ClientPool
+from app.config import settings
+from app.services.job_runner import job_runner
+
+
+async def run_worker(concurrency: int) -> None:
+    s3_pool = S3ClientPool()
+    await s3_pool.start()
+    try:
+        async with job_runner(s3_pool, concurrency) as runner:
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, runner.stop)
+            await runner.run()
+    finally:
+        await s3_pool.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=max(settings.job_worker_concurrency, 1),
+        help="Jobs run at the same time",
+    )
+    args = parser.parse_args(argv)
+    asyncio.run(run_worker(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
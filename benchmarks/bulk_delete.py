@@ -0,0 +1,108 @@
+"""Latency of deleting many photos one id at a time vs with the bulk routes.
+
+"single" calls PhotoRepository.soft_delete_toggle / hard_delete_photo once
+per photo, which is what clearing an album took before PATCH /photos/soft
+and DELETE /photos/hard (each call was also its own HTTP request and
+transaction, not counted here). "bulk" is one bulk_soft_delete_toggle /
+bulk_hard_delete_photos call for all of them. Seeds a scratch user with
+photos in a transaction that is rolled back afterwards, and every run starts
+from the same data; needs a migrated Postgres at DATABASE_URL:
+
+    python -m benchmarks.bulk_delete --photos 500
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import engine
+from app.repositories.photo_repository import PhotoRepository
+
+SEED = [
+    """
+    INSERT INTO "user" (username, email, hash, salt)
+    VALUES ('bench', 'bench@example.com', '', '') RETURNING id
+    """,
+    """
+    INSERT INTO photo (filename, s3_key, content_type, size, date_taken, is_public)
+    SELECT 'photo-' || i || '.jpg', 'photos/bench/' || i || '.jpg', 'image/jpeg',
+           100000 + i, timestamp '2020-01-01' + i * interval '1 minute', true
+    FROM generate_series(1, :photos) AS i
+    RETURNING id
+    """,
+]
+
+
+async def _single_soft(repo: PhotoRepository, ids: list[int], user_id: int) -> None:
+    for id in ids:
+        await repo.soft_delete_toggle(id, True, user_id)
+
+
+async def _bulk_soft(repo: PhotoRepository, ids: list[int], user_id: int) -> None:
+    await repo.bulk_soft_delete_toggle(ids, True, user_id)
+
+
+async def _single_hard(repo: PhotoRepository, ids: list[int], user_id: int) -> None:
+    for id in ids:
+        await repo.hard_delete_photo(id, user_id)
+
+
+async def _bulk_hard(repo: PhotoRepository, ids: list[int], user_id: int) -> None:
+    await repo.bulk_hard_delete_photos(ids, user_id)
+
+
+async def _run(session: AsyncSession, call, ids: list[int], user_id: int) -> float:
+    # in a savepoint, so the next run sees the same photos
+    savepoint = await session.begin_nested()
+    start = time.perf_counter()
+    await call(PhotoRepository(session=session), ids, user_id)
+    elapsed = time.perf_counter() - start
+    await savepoint.rollback()
+    return elapsed
+
+
+async def main(photos: int) -> None:
+    async with AsyncSession(engine) as session:
+        try:
+            user_id = (await session.execute(text(SEED[0]))).scalar_one()
+            ids = list(
+                (await session.execute(text(SEED[1]), {"photos": photos}))
+                .scalars()
+                .all()
+            )
+            await session.execute(
+                text(
+                    "INSERT INTO user_photo (user_id, photo_id, date_taken) "
+                    "SELECT :user_id, id, date_taken FROM photo "
+                    "WHERE id = ANY(CAST(:ids AS integer[]))"
+                ),
+                {"user_id": user_id, "ids": ids},
+            )
+
+            for label, single, bulk in (
+                ("soft delete", _single_soft, _bulk_soft),
+                ("hard delete", _single_hard, _bulk_hard),
+            ):
+                # warms the statement caches
+                await _run(session, single, ids[:10], user_id)
+                await _run(session, bulk, ids[:10], user_id)
+
+                before = await _run(session, single, ids, user_id)
+                after = await _run(session, bulk, ids, user_id)
+                print(
+                    f"{label}  {photos} photos  single {before * 1e3:8.1f}ms  "
+                    f"bulk {after * 1e3:7.1f}ms  ({before / after:.0f}x faster)"
+                )
+        finally:
+            await session.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.photos))
@@ -0,0 +1,102 @@
+"""Where the engine's connection pool saturates as concurrency grows.
+
+Every simulated request checks a connection out and holds it for --hold ms
+(pg_sleep), like a request's transaction would. Each concurrency level gets a
+fresh engine configured like app.db, and the pool gauges show when requests
+start queueing for a connection instead of running. Needs Postgres at
+DATABASE_URL:
+
+    python -m benchmarks.db_pool --pool-size 10 --max-overflow 10 --hold 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.db_pool import InstrumentedQueuePool
+
+LEVELS = [1, 5, 10, 20, 40, 80, 160]
+
+
+async def _run_level(
+    concurrency: int, total: int, hold: float, pool_size: int, max_overflow: int
+) -> None:
+    engine = create_async_engine(
+        settings.database_url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+    )
+    pool = engine.pool
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    peak = 0
+
+    async def one() -> None:
+        nonlocal peak
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with engine.connect() as conn:
+                    peak = max(peak, pool.checkedout())
+                    await conn.execute(text("SELECT pg_sleep(:s)"), {"s": hold})
+            except exc.TimeoutError:
+                return
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await engine.dispose()
+
+    stats = pool.stats()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    print(
+        f"{concurrency:>11} {total / elapsed:9.1f} "
+        f"{statistics.median(latencies) * 1000:9.1f} {p99 * 1000:9.1f} "
+        f"{stats['wait_seconds'] / stats['checkouts'] * 1000:12.1f} "
+        f"{stats['max_wait_seconds'] * 1000:12.1f} {peak:8} {stats['timeouts']:8}"
+    )
+
+
+async def main(
+    total: int, hold: float, pool_size: int, max_overflow: int, levels: list[int]
+) -> None:
+    print(
+        f"pool_size={pool_size} max_overflow={max_overflow} "
+        f"hold={hold * 1000:.0f}ms requests/level={total}"
+    )
+    print(
+        f"{'concurrency':>11} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} "
+        f"{'avg wait ms':>12} {'max wait ms':>12} {'peak out':>8} {'timeouts':>8}"
+    )
+    for concurrency in levels:
+        await _run_level(concurrency, total, hold, pool_size, max_overflow)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--hold", type=float, default=20, help="ms per request")
+    parser.add_argument("--pool-size", type=int, default=settings.db_pool_size)
+    parser.add_argument("--max-overflow", type=int, default=settings.db_max_overflow)
+    parser.add_argument("--levels", type=int, nargs="+", default=LEVELS)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.requests,
+            args.hold / 1000,
+            args.pool_size,
+            args.max_overflow,
+            args.levels,
+        )
+    )
@@ -0,0 +1,132 @@
+"""Per-request cost of building the photo client through dependencies.
+
+"per-layer" is the chain routes used before app.container: a dependency for
+each repository, the S3 client, the service and the client. "container" is
+the current PhotoClientDep, which builds them in one call on top of the
+request's session. "session only" resolves just the session and is the
+floor both are compared with. The session is a stand-in, so no database (or
+S3) is needed and only FastAPI's dependency resolution and the allocations
+are measured:
+
+    python -m benchmarks.dependency_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Annotated
+
+import httpx
+from fastapi import Depends, FastAPI, Request
+
+from app.clients.photo_client import PhotoClient, PhotoClientInterface
+from app.clients.s3_client import AwsS3Client, AwsS3ClientInterface
+from app.clients.s3_pool import S3ClientPool
+from app.config import settings
+from app.container import AppContainer
+from app.db import get_session
+from app.dependencies import PhotoClientDep, TransactionDep
+from app.repositories.job_repository import JobRepository, JobRepositoryInterface
+from app.repositories.photo_repository import PhotoRepository, PhotoRepositoryInterface
+from app.services.photo_service import PhotoService
+
+
+class FakeSession:
+    async def commit(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+async def fake_session():
+    yield FakeSession()
+
+
+# The dependency chain before app.container, kept here for comparison
+async def get_photo_repository(session: TransactionDep) -> PhotoRepositoryInterface:
+    return PhotoRepository(session=session)
+
+
+async def get_job_repository(session: TransactionDep) -> JobRepositoryInterface:
+    return JobRepository(session=session)
+
+
+async def get_s3_client(request: Request) -> AwsS3ClientInterface:
+    container = request.app.state.container
+    return AwsS3Client(
+        container.s3_pool,
+        settings.bucket_name,
+        presigner=container.s3_presigner,
+        url_cache=container.presigned_url_cache,
+    )
+
+
+async def get_photo_service(
+    repo: Annotated[PhotoRepositoryInterface, Depends(get_photo_repository)],
+    s3_client: Annotated[AwsS3ClientInterface, Depends(get_s3_client)],
+    job_repo: Annotated[JobRepositoryInterface, Depends(get_job_repository)],
+) -> PhotoService:
+    return PhotoService(
+        photo_repository=repo, s3_client=s3_client, job_repository=job_repo
+    )
+
+
+async def get_photo_client(
+    service: Annotated[PhotoService, Depends(get_photo_service)],
+) -> PhotoClientInterface:
+    return PhotoClient(photo_service=service)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.state.container = AppContainer(S3ClientPool(), None, None)
+    app.dependency_overrides[get_session] = fake_session
+
+    @app.get("/session-only")
+    async def session_only(session: TransactionDep):
+        return {}
+
+    @app.get("/per-layer")
+    async def per_layer(
+        photo_client: Annotated[PhotoClientInterface, Depends(get_photo_client)],
+    ):
+        return {}
+
+    @app.get("/container")
+    async def container(photo_client: PhotoClientDep):
+        return {}
+
+    return app
+
+
+async def _run(client: httpx.AsyncClient, path: str, total: int) -> float:
+    for _ in range(200):
+        await client.get(path)
+
+    start = time.perf_counter()
+    for _ in range(total):
+        await client.get(path)
+    return (time.perf_counter() - start) / total
+
+
+async def main(total: int) -> None:
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        floor = await _run(client, "/session-only", total)
+        print(f"{'session only':<13} {floor * 1e6:8.1f}us/request")
+        for label, path in (("per-layer", "/per-layer"), ("container", "/container")):
+            elapsed = await _run(client, path, total)
+            print(
+                f"{label:<13} {elapsed * 1e6:8.1f}us/request  "
+                f"(+{(elapsed - floor) * 1e6:6.1f}us for the photo client)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,125 @@
+"""Latency of photo reads with and without the photo metadata cache.
+
+"uncached" is PhotoRepository, one query per read. "local" is
+CachedPhotoRepository served from the per-process tier. "shared" empties that
+tier before every read, so reads are served from the shared tier; the
+in-memory stand-in is used for it, which leaves out the network round trip a
+Redis server adds. "burst" fires concurrent reads of a cold page and reports
+how many of them reached the database. Seeds a scratch user with photos in a
+transaction that is rolled back afterwards; needs a migrated Postgres at
+DATABASE_URL:
+
+    python -m benchmarks.photo_cache --photos 1000 --page 100 --passes 500
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import engine
+from app.repositories.cached_photo_repository import CachedPhotoRepository
+from app.repositories.photo_cache import InMemoryPhotoCacheBackend, PhotoCache
+from app.repositories.photo_repository import PhotoRepository
+from app.pagination import TotalMode
+
+SEED = [
+    """
+    INSERT INTO "user" (username, email, hash, salt)
+    VALUES ('bench', 'bench@example.com', '', '') RETURNING id
+    """,
+    """
+    INSERT INTO photo (filename, s3_key, content_type, size, date_taken, is_public)
+    SELECT 'photo-' || i || '.jpg', 'photos/bench/' || i || '.jpg', 'image/jpeg',
+           100000 + i, timestamp '2020-01-01' + i * interval '1 minute', i % 2 = 0
+    FROM generate_series(1, :photos) AS i
+    RETURNING id
+    """,
+]
+
+
+async def _measure(read, passes: int, before=None) -> float:
+    for _ in range(5):
+        await read()
+
+    elapsed = 0.0
+    for _ in range(passes):
+        if before is not None:
+            await before()
+        start = time.perf_counter()
+        await read()
+        elapsed += time.perf_counter() - start
+    return elapsed / passes
+
+
+async def main(photos: int, page: int, passes: int, burst: int) -> None:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            user_id = (await conn.execute(text(SEED[0]))).scalar_one()
+            photo_ids = (
+                (await conn.execute(text(SEED[1]), {"photos": photos})).scalars().all()
+            )
+            await conn.execute(
+                text(
+                    "INSERT INTO user_photo (user_id, photo_id, date_taken) "
+                    "SELECT :user_id, id, date_taken FROM photo "
+                    "WHERE id = ANY(CAST(:ids AS integer[]))"
+                ),
+                {"user_id": user_id, "ids": list(photo_ids)},
+            )
+
+            session = AsyncSession(bind=conn, expire_on_commit=False)
+            repository = PhotoRepository(session=session)
+            local = InMemoryPhotoCacheBackend(10_000)
+            cache = PhotoCache(local, shared=InMemoryPhotoCacheBackend(10_000))
+            cached = CachedPhotoRepository(repository, cache)
+
+            async def clear_local():
+                local._entries.clear()
+
+            reads = {
+                f"page of {page}": lambda repo: repo.get_user_photos(
+                    user_id, limit=page, total_mode=TotalMode.EXACT
+                ),
+                # every other seeded photo is public, the first one is not
+                "photo by id": lambda repo: repo.get_photo_by_id(photo_ids[1]),
+            }
+            for name, read in reads.items():
+                uncached = await _measure(lambda: read(repository), passes)
+                local_hit = await _measure(lambda: read(cached), passes)
+                shared_hit = await _measure(lambda: read(cached), passes, clear_local)
+                print(
+                    f"{name:>12}  uncached {uncached * 1e3:7.3f}ms"
+                    f"  local {local_hit * 1e3:7.3f}ms ({uncached / local_hit:5.1f}x)"
+                    f"  shared {shared_hit * 1e3:7.3f}ms ({uncached / shared_hit:5.1f}x)"
+                )
+
+            # a cold page read by many requests at once, as after an invalidation
+            await cache.invalidate([f"user:{user_id}"])
+            misses = cache.misses
+            await asyncio.gather(
+                *[cached.get_user_photos(user_id, limit=page) for _ in range(burst)]
+            )
+            print(
+                f"{burst} concurrent reads of a cold page: "
+                f"{cache.misses - misses} database load(s)"
+            )
+            await session.close()
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=1000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--passes", type=int, default=500)
+    parser.add_argument("--burst", type=int, default=50)
+    args = parser.parse_args()
+    if args.page > args.photos:
+        parser.error("--page cannot be larger than --photos")
+    asyncio.run(main(args.photos, args.page, args.passes, args.burst))
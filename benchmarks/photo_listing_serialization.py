@@ -0,0 +1,145 @@
+"""CPU spent per photo listing response, before and after the orjson path.
+
+"pydantic" is how GET /photos/ used to answer: ORM Photo entities turned
+into PhotoRead models, wrapped in a UserPhotosResponse and validated again
+against the route's response_model before being encoded. "orjson" is the
+current path: PhotoRecord rows turned into plain dicts in one pass and rendered
+by OrjsonResponse. Photos are built in memory and urls are fixed strings, so
+no database or S3 is needed and only the response building and encoding are
+measured (process CPU time, not wall time):
+
+    python -m benchmarks.photo_listing_serialization --sizes 10 100 1000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.responses import OrjsonResponse
+from app.models.photo import Photo
+from app.repositories.photo_repository import PhotoRecord
+from app.schemas.photo import PhotoRead, UserPhotosResponse
+
+RENDITIONS = ("thumbnail",)
+
+
+def build_photos(count: int) -> tuple[list[Photo], list[PhotoRecord]]:
+    start = datetime(2024, 1, 1)
+    rows = [
+        PhotoRecord(
+            id=i,
+            filename=f"photo-{i}.jpg",
+            content_type="image/jpeg",
+            size=1_000_000 + i,
+            date_taken=start - timedelta(minutes=i),
+            is_public=bool(i % 2),
+            is_deleted=False,
+            s3_key=f"photos/0a/1/2024/01/{i:032x}.jpg",
+            content_hash=f"{i:064x}",
+        )
+        for i in range(count)
+    ]
+    return [Photo(**row._asdict()) for row in rows], rows
+
+
+def fake_url(key: str) -> str:
+    return f"https://bucket.s3.amazonaws.com/{key}?X-Amz-Signature={'0' * 64}"
+
+
+def build_app(photos: list[Photo], rows: list[PhotoRecord]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/pydantic", response_model=UserPhotosResponse)
+    async def pydantic_listing():
+        photos_schema = [
+            PhotoRead.model_validate(
+                {
+                    "url": fake_url(photo.s3_key),
+                    "renditions": {
+                        name: fake_url(f"{photo.s3_key}.{name}") for name in RENDITIONS
+                    },
+                    **photo.__dict__,
+                },
+                from_attributes=True,
+            )
+            for photo in photos
+        ]
+        return UserPhotosResponse(
+            photos=photos_schema, total=len(photos), skip=0, limit=len(photos)
+        )
+
+    @app.get("/orjson", response_model=UserPhotosResponse)
+    async def orjson_listing():
+        return OrjsonResponse(
+            {
+                "photos": [
+                    {
+                        "filename": row.filename,
+                        "content_type": row.content_type,
+                        "size": row.size,
+                        "date_taken": row.date_taken,
+                        "is_public": row.is_public,
+                        "url": fake_url(row.s3_key),
+                        "renditions": {
+                            name: fake_url(f"{row.s3_key}.{name}")
+                            for name in RENDITIONS
+                        },
+                        "content_hash": row.content_hash,
+                    }
+                    for row in rows
+                ],
+                "total": len(rows),
+                "skip": 0,
+                "limit": len(rows),
+                "next_cursor": None,
+            }
+        )
+
+    return app
+
+
+async def _run(client: httpx.AsyncClient, path: str, total: int) -> float:
+    for _ in range(max(total // 10, 5)):
+        await client.get(path)
+
+    start = time.process_time()
+    for _ in range(total):
+        await client.get(path)
+    return (time.process_time() - start) / total
+
+
+async def main(sizes: list[int], total: int) -> None:
+    for size in sizes:
+        app = build_app(*build_photos(size))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            before, after = await client.get("/pydantic"), await client.get("/orjson")
+            assert before.json() == after.json(), "responses differ"
+
+            # keep the number of photos encoded per size roughly constant
+            requests = max(total * 10 // size, 20)
+            old = await _run(client, "/pydantic", requests)
+            new = await _run(client, "/orjson", requests)
+        print(
+            f"{size:>5} photos  pydantic {old * 1e3:8.3f}ms  orjson {new * 1e3:8.3f}ms"
+            f"  ({(1 - new / old) * 100:5.1f}% less CPU)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=500,
+        help="requests per size at 10 photos, scaled down for larger pages",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.requests))
@@ -0,0 +1,122 @@
+"""CPU and memory per page when photos are read as ORM entities vs records.
+
+"entities" is how the read paths used to load photos, select(Photo): an
+identity-mapped Photo with instance state per row. "records" is what
+PhotoRepository.get_user_photos and get_photo_by_id return now: PhotoRecord
+named tuples of the needed columns. Each pass uses a fresh session, like a
+request does. Seeds a scratch user with photos in a transaction that is
+rolled back afterwards; needs a migrated Postgres at DATABASE_URL:
+
+    python -m benchmarks.photo_read_records --photos 1000 --sizes 10 100 1000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import engine
+from app.models.photo import Photo
+from app.models.user_photo import UserPhoto
+from app.repositories.photo_repository import PhotoRepository
+from app.pagination import TotalMode
+
+SEED = [
+    """
+    INSERT INTO "user" (username, email, hash, salt)
+    VALUES ('bench', 'bench@example.com', '', '') RETURNING id
+    """,
+    """
+    INSERT INTO photo (filename, s3_key, content_type, size, date_taken, is_public)
+    SELECT 'photo-' || i || '.jpg', 'photos/bench/' || i || '.jpg', 'image/jpeg',
+           100000 + i, timestamp '2020-01-01' + i * interval '1 minute', i % 2 = 0
+    FROM generate_series(1, :photos) AS i
+    RETURNING id
+    """,
+]
+
+
+async def _entities(session: AsyncSession, user_id: int, size: int) -> list:
+    repo = PhotoRepository(session=session)
+    stmt = (
+        repo._user_photos_stmt(user_id, Photo)
+        .order_by(UserPhoto.date_taken.desc(), UserPhoto.photo_id.desc())
+        .limit(size)
+    )
+    return list((await session.execute(stmt)).scalars().all())
+
+
+async def _records(session: AsyncSession, user_id: int, size: int) -> list:
+    photos, _ = await PhotoRepository(session=session).get_user_photos(
+        user_id, limit=size, total_mode=TotalMode.NONE
+    )
+    return photos
+
+
+async def _measure(conn, call, user_id: int, size: int, passes: int):
+    async def one_pass():
+        # a fresh session per pass, so the identity map starts empty
+        async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+            return await call(session, user_id, size)
+
+    for _ in range(5):
+        await one_pass()
+
+    start = time.process_time()
+    for _ in range(passes):
+        await one_pass()
+    cpu = (time.process_time() - start) / passes
+
+    tracemalloc.start()
+    async with AsyncSession(bind=conn) as session:
+        page = await call(session, user_id, size)
+        held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(page) == size
+    return cpu, held
+
+
+async def main(photos: int, sizes: list[int], passes: int) -> None:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            user_id = (await conn.execute(text(SEED[0]))).scalar_one()
+            photo_ids = (
+                (await conn.execute(text(SEED[1]), {"photos": photos})).scalars().all()
+            )
+            await conn.execute(
+                text(
+                    "INSERT INTO user_photo (user_id, photo_id, date_taken) "
+                    "SELECT :user_id, id, date_taken FROM photo "
+                    "WHERE id = ANY(CAST(:ids AS integer[]))"
+                ),
+                {"user_id": user_id, "ids": list(photo_ids)},
+            )
+
+            for size in sizes:
+                old_cpu, old_mem = await _measure(
+                    conn, _entities, user_id, size, passes
+                )
+                new_cpu, new_mem = await _measure(conn, _records, user_id, size, passes)
+                print(
+                    f"{size:>5} photos  entities {old_cpu * 1e3:7.3f}ms {old_mem / 1024:8.1f}KiB"
+                    f"  records {new_cpu * 1e3:7.3f}ms {new_mem / 1024:8.1f}KiB"
+                    f"  ({1 - new_cpu / old_cpu:.0%} less CPU, {1 - new_mem / old_mem:.0%} less memory)"
+                )
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=1000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--passes", type=int, default=200)
+    args = parser.parse_args()
+    if max(args.sizes) > args.photos:
+        parser.error("--sizes cannot be larger than --photos")
+    asyncio.run(main(args.photos, args.sizes, args.passes))
@@ -0,0 +1,74 @@
+"""Per-request latency of a read (GET /photos/{id}) with and without a commit.
+
+"transaction" is what read routes used to do through get_db_transaction:
+BEGIN, the query, COMMIT. "read-only" is the autocommit session they use now
+(app.db.read_only_session): the query alone. Requests run one at a time, so
+the numbers are latencies. Needs a migrated Postgres at DATABASE_URL:
+
+    python -m benchmarks.read_only_sessions --requests 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import func, select
+
+from app.db import async_session, engine, read_engine, read_only_session
+from app.models.photo import Photo
+from app.repositories.photo_repository import PhotoRepository
+
+
+async def _transaction(photo_id: int) -> None:
+    async with async_session() as session:
+        await PhotoRepository(session=session).get_photo_by_id(photo_id)
+        await session.commit()
+
+
+async def _read_only(photo_id: int) -> None:
+    async with read_only_session() as session:
+        await PhotoRepository(session=session).get_photo_by_id(photo_id)
+
+
+async def _run(label: str, call, photo_id: int, total: int) -> float:
+    # warms the pool and the statement caches
+    for _ in range(50):
+        await call(photo_id)
+
+    latencies = []
+    for _ in range(total):
+        start = time.perf_counter()
+        await call(photo_id)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    mean = statistics.fmean(latencies)
+    print(
+        f"{label:<12} mean {mean * 1e6:8.1f}us  p50 {statistics.median(latencies) * 1e6:8.1f}us  "
+        f"p99 {latencies[int(total * 0.99) - 1] * 1e6:8.1f}us"
+    )
+    return mean
+
+
+async def main(total: int) -> None:
+    async with read_only_session() as session:
+        photo_id = (await session.execute(select(func.min(Photo.id)))).scalar() or 1
+
+    try:
+        before = await _run("transaction", _transaction, photo_id, total)
+        after = await _run("read-only", _read_only, photo_id, total)
+    finally:
+        await engine.dispose()
+        await read_engine.dispose()
+
+    print(
+        f"saved        {(before - after) * 1e6:8.1f}us per request ({1 - after / before:.0%})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
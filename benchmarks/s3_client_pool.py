@@ -0,0 +1,93 @@
+"""Compares uploads/sec of the pooled S3 client against a client per request.
+
+Runs against the local S3 stand-in in benchmarks/s3_stub.py, so it measures
+client setup and connection reuse rather than network or S3 latency:
+
+    python -m benchmarks.s3_client_pool --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import time
+
+from aioboto3 import Session
+from fastapi import UploadFile
+
+from app.clients.s3_client import AwsS3Client
+from app.clients.s3_pool import S3ClientPool
+from app.config import settings
+from benchmarks.s3_stub import run_s3_stub
+
+BUCKET = "benchmark-bucket"
+
+
+async def _per_request_upload(payload: bytes, i: int) -> None:
+    """What every request used to do: a new session and client per call"""
+    session = Session()
+    async with session.client(
+        "s3", endpoint_url=settings.aws_endpoint_url, region_name=settings.aws_region
+    ) as client:
+        await client.upload_fileobj(
+            Fileobj=io.BytesIO(payload), Bucket=BUCKET, Key=f"bench/{i}.jpg"
+        )
+
+
+async def _pooled_upload(s3_client: AwsS3Client, payload: bytes, i: int) -> None:
+    file = UploadFile(file=io.BytesIO(payload), filename=f"{i}.jpg")
+    await s3_client.upload_file(f"bench/{i}.jpg", file)
+
+
+async def _run(label: str, call, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await call(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {total / elapsed:10.1f} req/s  ({elapsed:.2f}s)")
+    return total / elapsed
+
+
+async def main(total: int, concurrency: int, size: int) -> None:
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+    payload = os.urandom(size)
+
+    async with run_s3_stub() as (_, endpoint_url):
+        settings.aws_endpoint_url = endpoint_url
+
+        per_request = await _run(
+            "per-request",
+            lambda i: _per_request_upload(payload, i),
+            total,
+            concurrency,
+        )
+
+        pool = S3ClientPool()
+        await pool.start()
+        try:
+            s3_client = AwsS3Client(pool, BUCKET)
+            pooled = await _run(
+                "pooled",
+                lambda i: _pooled_upload(s3_client, payload, i),
+                total,
+                concurrency,
+            )
+        finally:
+            await pool.close()
+
+    print(f"speedup      {pooled / per_request:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--size", type=int, default=64 * 1024)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.size))
@@ -0,0 +1,76 @@
+"""Presigned URL generation: botocore per key vs. the local S3Presigner batch.
+
+Checks that both produce identical URLs, then times a page of 10/100/1000 keys:
+
+    python -m benchmarks.s3_presigner --rounds 20
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+from app.clients.s3_client import AwsS3Client
+from app.clients.s3_pool import S3ClientPool
+from app.clients.s3_presigner import S3Presigner
+
+BUCKET = "benchmark-bucket"
+PAGE_SIZES = (10, 100, 1000)
+
+
+async def _check_parity(botocore_client: AwsS3Client, presigner: S3Presigner) -> None:
+    keys = ["mocked/path/a b+ü~=&?#%.jpg", "/leading//slashes", "plain.jpg"]
+    now = datetime(2025, 12, 18, 1, 38, 55, tzinfo=timezone.utc)
+    with mock.patch("botocore.auth.get_current_datetime", return_value=now):
+        expected = await botocore_client.bulk_get_file_presigned_url(keys)
+
+    credentials = await presigner._credentials()
+    actual = presigner.sign(
+        keys,
+        access_key=credentials.access_key,
+        secret_key=credentials.secret_key,
+        token=credentials.token,
+        now=now,
+    )
+    for want, got in zip(expected, actual):
+        assert want == got, f"mismatch:\n  botocore:  {want}\n  presigner: {got}"
+    print(f"parity ok ({len(keys)} keys)")
+
+
+async def _time(call, keys: list[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await call(keys)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+async def main(rounds: int) -> None:
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+
+    pool = S3ClientPool()
+    await pool.start()
+    try:
+        presigner = await S3Presigner.from_pool(pool, BUCKET)
+        botocore_client = AwsS3Client(pool, BUCKET)
+        await _check_parity(botocore_client, presigner)
+
+        print(f"{'keys':>6} {'botocore ms':>12} {'presigner ms':>13} {'speedup':>8}")
+        for size in PAGE_SIZES:
+            keys = [f"mocked/path/photo-{i}.jpg" for i in range(size)]
+            baseline = await _time(
+                botocore_client.bulk_get_file_presigned_url, keys, rounds
+            )
+            local = await _time(presigner.bulk_presign_get, keys, rounds)
+            print(f"{size:>6} {baseline:>12.2f} {local:>13.2f} {baseline / local:>7.1f}x")
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds))
@@ -0,0 +1,190 @@
+"""Minimal in-memory S3 stand-in used by the benchmarks.
+
+It only implements what the benchmarks exercise (object PUT/GET/HEAD/DELETE,
+CopyObject, DeleteObjects, ListObjectsV2 and multipart uploads, including
+UploadPartCopy) and does not validate signatures.
+"""
+
+import hashlib
+import re
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from urllib.parse import unquote
+from xml.sax.saxutils import escape as xml_escape, unescape as xml_unescape
+
+from aiohttp import web
+
+
+class S3Stub:
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.content_types: dict[str, str] = {}
+        self.last_modified: dict[str, datetime] = {}
+        self._uploads: dict[str, dict[int, bytes]] = {}
+        self.requests = 0
+
+    def _object_key(self, request: web.Request) -> str:
+        return request.match_info["key"]
+
+    def _copy_source(self, request: web.Request) -> bytes | None:
+        source = request.headers.get("x-amz-copy-source")
+        if source is None:
+            return None
+        # "bucket/key" (or "/bucket/key"), URL-encoded
+        key = unquote(source).lstrip("/").split("/", 1)[1]
+        data = self.objects[key]
+        byte_range = request.headers.get("x-amz-copy-source-range")
+        if byte_range:
+            start, end = byte_range.removeprefix("bytes=").split("-")
+            data = data[int(start) : int(end) + 1]
+        return data
+
+    async def handle_bucket(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if request.method == "POST" and "delete" in request.query:
+            body = await request.text()
+            for key in re.findall(r"<Key>(.*?)</Key>", body):
+                self.objects.pop(xml_unescape(key), None)
+            return web.Response(
+                text="<DeleteResult></DeleteResult>", content_type="application/xml"
+            )
+
+        if request.method == "GET" and request.query.get("list-type") == "2":
+            return self._list_objects(request)
+
+        return web.Response(status=405)
+
+    def _list_objects(self, request: web.Request) -> web.Response:
+        prefix = request.query.get("prefix", "")
+        start = request.query.get("continuation-token", "")
+        max_keys = int(request.query.get("max-keys", 1000))
+        keys = sorted(k for k in self.objects if k.startswith(prefix) and k > start)
+        page, truncated = keys[:max_keys], len(keys) > max_keys
+
+        contents = "".join(
+            f"<Contents><Key>{xml_escape(key)}</Key>"
+            f"<LastModified>{self.last_modified[key].strftime('%Y-%m-%dT%H:%M:%S.000Z')}</LastModified>"
+            f'<ETag>"stub"</ETag><Size>{len(self.objects[key])}</Size>'
+            "<StorageClass>STANDARD</StorageClass></Contents>"
+            for key in page
+        )
+        token = (
+            f"<NextContinuationToken>{xml_escape(page[-1])}</NextContinuationToken>"
+            if truncated
+            else ""
+        )
+        body = (
+            "<ListBucketResult>"
+            f"<Name>{request.match_info['bucket']}</Name><Prefix>{xml_escape(prefix)}</Prefix>"
+            f"<KeyCount>{len(page)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>"
+            f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>"
+            f"{token}{contents}</ListBucketResult>"
+        )
+        return web.Response(text=body, content_type="application/xml")
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        key = self._object_key(request)
+        query = request.query
+
+        if request.method == "POST" and "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            self._uploads[upload_id] = {}
+            body = (
+                "<InitiateMultipartUploadResult>"
+                f"<Key>{key}</Key><UploadId>{upload_id}</UploadId>"
+                "</InitiateMultipartUploadResult>"
+            )
+            return web.Response(text=body, content_type="application/xml")
+
+        if request.method == "PUT" and "uploadId" in query:
+            copied = self._copy_source(request)
+            data = await request.read() if copied is None else copied
+            self._uploads[query["uploadId"]][int(query["partNumber"])] = data
+            etag = f'"{hashlib.md5(data).hexdigest()}"'
+            if copied is not None:
+                body = (
+                    f"<CopyPartResult><ETag>{xml_escape(etag)}</ETag></CopyPartResult>"
+                )
+                return web.Response(text=body, content_type="application/xml")
+            return web.Response(headers={"ETag": etag})
+
+        if request.method == "POST" and "uploadId" in query:
+            parts = self._uploads.pop(query["uploadId"])
+            self.objects[key] = b"".join(parts[n] for n in sorted(parts))
+            self.last_modified[key] = datetime.now(timezone.utc)
+            body = (
+                "<CompleteMultipartUploadResult>"
+                f"<Key>{key}</Key><ETag>\"stub\"</ETag>"
+                "</CompleteMultipartUploadResult>"
+            )
+            return web.Response(text=body, content_type="application/xml")
+
+        if request.method == "DELETE" and "uploadId" in query:
+            self._uploads.pop(query["uploadId"], None)
+            return web.Response(status=204)
+
+        if request.method == "PUT" and "x-amz-copy-source" in request.headers:
+            source = unquote(request.headers["x-amz-copy-source"]).lstrip("/")
+            source_key = source.split("/", 1)[1]
+            data = self._copy_source(request)
+            self.objects[key] = data
+            self.last_modified[key] = datetime.now(timezone.utc)
+            self.content_types[key] = self.content_types.get(
+                source_key, "binary/octet-stream"
+            )
+            etag = f'"{hashlib.md5(data).hexdigest()}"'
+            body = (
+                f"<CopyObjectResult><ETag>{xml_escape(etag)}</ETag>"
+                f"<LastModified>{self.last_modified[key].strftime('%Y-%m-%dT%H:%M:%S.000Z')}</LastModified>"
+                "</CopyObjectResult>"
+            )
+            return web.Response(text=body, content_type="application/xml")
+
+        if request.method == "PUT":
+            data = await request.read()
+            self.objects[key] = data
+            self.last_modified[key] = datetime.now(timezone.utc)
+            self.content_types[key] = request.headers.get(
+                "Content-Type", "binary/octet-stream"
+            )
+            return web.Response(headers={"ETag": f'"{hashlib.md5(data).hexdigest()}"'})
+
+        if request.method in ("GET", "HEAD"):
+            if key not in self.objects:
+                return web.Response(status=404)
+            data = self.objects[key]
+            headers = {
+                "Content-Length": str(len(data)),
+                "Content-Type": self.content_types.get(key, "binary/octet-stream"),
+                "ETag": '"stub"',
+            }
+            if request.method == "HEAD":
+                return web.Response(headers=headers)
+            return web.Response(body=data, headers=headers)
+
+        if request.method == "DELETE":
+            self.objects.pop(key, None)
+            return web.Response(status=204)
+
+        return web.Response(status=405)
+
+
+@asynccontextmanager
+async def run_s3_stub(host: str = "127.0.0.1", port: int = 0):
+    """Serves an S3Stub and yields (stub, endpoint_url)"""
+    stub = S3Stub()
+    app = web.Application(client_max_size=1024**3)
+    app.router.add_route("*", "/{bucket}", stub.handle_bucket)
+    app.router.add_route("*", "/{bucket}/", stub.handle_bucket)
+    app.router.add_route("*", "/{bucket}/{key:.+}", stub.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield stub, f"http://{host}:{bound_port}"
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,130 @@
+"""Query plans and timings of the user_photo hot path before/after its indexes.
+
+Seeds a scratch schema (dropped afterwards unless --keep) with copies of the
+photo and user_photo tables, runs the repository's hot queries with
+EXPLAIN ANALYZE, adds the indexes from migrations 5d0f8e3a2c71 and
+699012e1d011 and runs them again. Needs Postgres at DATABASE_URL:
+
+    python -m benchmarks.user_photo_indexes --rows 1000000 --users 1000
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+
+SCHEMA = "bench_user_photo_indexes"
+
+SEED = [
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    f"SET search_path TO {SCHEMA}",
+    "CREATE TABLE photo (LIKE public.photo INCLUDING DEFAULTS)",
+    "CREATE TABLE user_photo (LIKE public.user_photo INCLUDING DEFAULTS)",
+    """
+    INSERT INTO photo (id, filename, s3_key, content_type, size, date_taken, is_public, is_deleted)
+    SELECT i, 'photo-' || i || '.jpg', 'photos/' || i || '.jpg', 'image/jpeg',
+           100000 + i % 5000000, timestamp '2020-01-01' + i * interval '1 minute',
+           i % 3 = 0, i % 20 = 0
+    FROM generate_series(1, :rows) AS i
+    """,
+    """
+    INSERT INTO user_photo (id, user_id, photo_id, date_taken)
+    SELECT i, 1 + i % :users, i, timestamp '2020-01-01' + i * interval '1 minute'
+    FROM generate_series(1, :rows) AS i
+    """,
+    "ALTER TABLE photo ADD PRIMARY KEY (id)",
+    "ALTER TABLE user_photo ADD PRIMARY KEY (id)",
+]
+
+INDEXES = [
+    "CREATE UNIQUE INDEX ux_user_photo_user_id_photo_id ON user_photo (user_id, photo_id)",
+    "CREATE INDEX ix_user_photo_photo_id ON user_photo (photo_id)",
+    "CREATE INDEX ix_photo_id_not_deleted ON photo (id) WHERE NOT is_deleted",
+    "CREATE INDEX ix_user_photo_user_id_date_taken_photo_id "
+    "ON user_photo (user_id, date_taken DESC, photo_id DESC)",
+]
+
+QUERIES = {
+    "get_user_photos (page)": """
+        SELECT photo.* FROM photo JOIN user_photo ON user_photo.photo_id = photo.id
+        WHERE user_photo.user_id = :user_id AND NOT photo.is_deleted
+        ORDER BY user_photo.date_taken DESC, user_photo.photo_id DESC LIMIT 20
+    """,
+    "get_user_photos (count)": """
+        SELECT count(*) FROM photo JOIN user_photo ON user_photo.photo_id = photo.id
+        WHERE user_photo.user_id = :user_id AND NOT photo.is_deleted
+    """,
+    "get_user_photo_relation": """
+        SELECT * FROM user_photo WHERE photo_id = :photo_id AND user_id = :user_id
+    """,
+    "hard_delete_photo (links)": """
+        DELETE FROM user_photo WHERE photo_id = :photo_id
+    """,
+}
+
+
+async def _explain(conn, sql: str, params: dict, show_plans: bool) -> float:
+    # DELETEs run inside a savepoint so every pass sees the same data
+    savepoint = await conn.begin_nested()
+    result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params)
+    plan = [row[0] for row in result]
+    await savepoint.rollback()
+
+    if show_plans:
+        print("\n".join(f"    {line}" for line in plan))
+    execution = next(line for line in plan if line.startswith("Execution Time"))
+    return float(execution.split(":")[1].split()[0])
+
+
+async def _run_queries(conn, label: str, params: dict, show_plans: bool) -> dict:
+    print(f"\n== {label}")
+    timings = {}
+    for name, sql in QUERIES.items():
+        print(f"  -- {name}")
+        timings[name] = await _explain(conn, sql, params, show_plans)
+        print(f"     {timings[name]:.3f} ms")
+    return timings
+
+
+async def main(rows: int, users: int, keep: bool, show_plans: bool) -> None:
+    engine = create_async_engine(settings.database_url)
+    params = {"user_id": users // 2, "photo_id": rows // 2}
+    try:
+        async with engine.begin() as conn:
+            start = time.perf_counter()
+            for sql in SEED:
+                await conn.execute(text(sql), {"rows": rows, "users": users})
+            await conn.execute(text("ANALYZE photo"))
+            await conn.execute(text("ANALYZE user_photo"))
+            print(f"seeded {rows} rows in {time.perf_counter() - start:.1f}s")
+
+            before = await _run_queries(conn, "without indexes", params, show_plans)
+            for sql in INDEXES:
+                await conn.execute(text(sql))
+            await conn.execute(text("ANALYZE photo"))
+            await conn.execute(text("ANALYZE user_photo"))
+            after = await _run_queries(conn, "with indexes", params, show_plans)
+
+            print(f"\n{'query':<28} {'before ms':>10} {'after ms':>10}")
+            for name in QUERIES:
+                print(f"{name:<28} {before[name]:>10.3f} {after[name]:>10.3f}")
+
+            if not keep:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema")
+    parser.add_argument("--plans", action="store_true", help="print full plans")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.users, args.keep, args.plans))